@@ -0,0 +1,43 @@
+# Document -> API mapping shared by the JSON routes and the Socket.IO events. ObjectId and
+# datetime values are passed through as they are, the app's JSON provider encodes them.
+
+# Fields sent with task_created and task_shared events
+TASK_EVENT_FIELDS = ['title', 'description', 'status', 'deadline', 'created_at']
+NOTIFICATION_FIELDS = ['_id', 'message', 'type', 'is_read', 'created_at', 'related_task']
+# Notifications read with this projection are already in their API shape
+NOTIFICATION_PROJECTION = dict.fromkeys(NOTIFICATION_FIELDS, 1)
+
+
+def task_to_api(task):
+    data = {
+        '_id': task['_id'],
+        'title': task.get('title', ''),
+        'status': task.get('status', ''),
+        'created_at': task.get('created_at', ''),
+        'deadline': task.get('deadline', '')
+    }
+    # Listings are fetched without the description
+    if 'description' in task:
+        data['description'] = task['description']
+    return data
+
+
+def shared_task_to_api(task, owner):
+    """A row of another user's shared list, identified by 'id' and carrying the owner's username"""
+    data = task_to_api(task)
+    data['id'] = data.pop('_id')
+    data['user_id'] = task['user_id']
+    data['owner'] = owner
+    return data
+
+
+def task_event_fields(task, *fields):
+    """The task's id and owner plus the given fields, the payload of a task delta event"""
+    data = {'_id': task['_id'], 'user_id': task['user_id']}
+    for field in fields:
+        data[field] = task.get(field)
+    return data
+
+
+def notification_to_api(notification):
+    return {field: notification.get(field) for field in NOTIFICATION_FIELDS}
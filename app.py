@@ -1,31 +1,205 @@
-from flask import Flask, render_template, request, redirect, session, url_for, jsonify, flash, send_file
-from pymongo import MongoClient
+from flask import Flask, Response, render_template, request, redirect, session, url_for, jsonify, flash, send_file
+from flask import json as flask_json, g
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from pymongo.write_concern import WriteConcern
 from datetime import datetime
 from bson.objectid import ObjectId
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import timedelta
 from flask_wtf.csrf import CSRFProtect
 from dotenv import load_dotenv
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room
 import os
+import re
+import json
+import base64
+import hashlib
+import csv
+import io
+import time
+import threading
+import atexit
+import click
+import mimetypes
+from collections import OrderedDict
+from functools import wraps
 from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
+from indexes import ensure_indexes, find_collscans
+from notification_queue import NotificationQueue
+from attachment_store import AttachmentStore
+from response_cache import DataVersions, ResponseCache
+from password_hashing import PasswordHasher, HasherBusy
+from assets import available_encodings, build_precompressed, compress, file_digest, precompressed_variant
+from json_provider import MongoJSONProvider
+from metrics import COUNT_BUCKETS, MetricsRegistry, MongoCommandListener, MongoPoolListener
+from query_tracking import QueryTracker
+from database import MongoConnection
+from api_mapping import (TASK_EVENT_FIELDS, NOTIFICATION_PROJECTION, notification_to_api, shared_task_to_api,
+                         task_event_fields, task_to_api)
 
 
 # Load environment variables
 load_dotenv('Pass.env')
 app = Flask(__name__)
+# Encodes ObjectId and datetime values itself, so documents are returned without conversion
+app.json = MongoJSONProvider(app)
 app.secret_key = os.getenv('SECRET_KEY')
 csrf = CSRFProtect(app)
 app.permanent_session_lifetime = timedelta(hours=1)  # Session expires after 1 hour
 
-client = MongoClient(os.getenv('MONGO_URI'))
-db = client['task_manager']
+# Prometheus metrics served at /metrics: request timing per route, MongoDB commands and
+# Socket.IO emits. Values are per process.
+app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', '1') == '1'
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN') or None  # Required as a Bearer token when set
+metrics = MetricsRegistry()
+request_seconds = metrics.histogram('flask_request_duration_seconds', 'Request duration by route',
+                                    ['method', 'route', 'status'])
+request_mongo_commands = metrics.histogram('flask_request_mongo_commands', 'MongoDB round trips per request',
+                                           ['route'], buckets=COUNT_BUCKETS)
+request_mongo_seconds = metrics.histogram('flask_request_mongo_seconds', 'Time spent in MongoDB per request',
+                                          ['route'])
+socketio_emits = metrics.counter('socketio_emits_total', 'Socket.IO events emitted', ['event'])
+mongo_listener = MongoCommandListener(metrics)
+
+# Registered first, so the timing covers the other request hooks too
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    mongo_listener.begin_request()
+
+@app.after_request
+def keep_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+@app.teardown_request
+def record_request_metrics(exc):
+    if 'request_started' not in g:
+        return
+    # Unhandled exceptions skip after_request
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    request_seconds.observe(time.perf_counter() - g.request_started,
+                            request.method, route, str(g.get('response_status', 500)))
+    commands, seconds = mongo_listener.end_request()
+    request_mongo_commands.observe(commands, route)
+    request_mongo_seconds.observe(seconds, route)
+
+# Development and tests: QUERY_TRACKING=warn logs repeated query shapes within a request (N+1
+# suspects) and requests over their budget, QUERY_TRACKING=strict raises QueryBudgetExceeded instead
+app.config['QUERY_TRACKING'] = os.getenv('QUERY_TRACKING', 'off')
+app.config['QUERY_N_PLUS_ONE_THRESHOLD'] = int(os.getenv('QUERY_N_PLUS_ONE_THRESHOLD', 3))
+# Endpoint -> most MongoDB commands one request may run, e.g. {'get_shared_tasks': 3}
+app.config['QUERY_BUDGETS'] = {}
+# Built with the MongoDB client by configure_mongo(), it listens to the client's commands
+query_tracker = None
+
+def build_query_tracker():
+    tracking = app.config['QUERY_TRACKING']
+    if tracking not in ('off', 'warn', 'strict'):
+        raise ValueError(f"QUERY_TRACKING must be off, warn or strict, not {tracking!r}")
+    if tracking == 'off':
+        return None
+    return QueryTracker(app.config['QUERY_N_PLUS_ONE_THRESHOLD'], strict=tracking == 'strict')
+
+@app.before_request
+def start_query_tracking():
+    if query_tracker:
+        query_tracker.begin_request()
+
+@app.after_request
+def check_query_budget(response):
+    if query_tracker:
+        endpoint = request.endpoint or 'unmatched'
+        query_tracker.check(endpoint, query_tracker.end_request(), app.config['QUERY_BUDGETS'].get(endpoint))
+    return response
+
+# MongoDB connection pool, one per worker process. Keep workers x MONGO_MAX_POOL_SIZE below
+# the cluster's connection limit; a request waits up to MONGO_WAIT_QUEUE_TIMEOUT_MS for a free
+# connection before failing.
+app.config['MONGO_URI'] = os.getenv('MONGO_URI')
+app.config['MONGO_MAX_POOL_SIZE'] = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))
+app.config['MONGO_MIN_POOL_SIZE'] = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+app.config['MONGO_WAIT_QUEUE_TIMEOUT_MS'] = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+app.config['MONGO_SERVER_SELECTION_TIMEOUT_MS'] = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000))
+# Wire compression, e.g. zstd,snappy,zlib (zstd and snappy need the zstandard / python-snappy packages)
+app.config['MONGO_COMPRESSORS'] = os.getenv('MONGO_COMPRESSORS', '')
+mongo_pool_listener = MongoPoolListener(metrics)
+metrics.callback('mongo_pool_max_size', 'Configured maximum connections per server', 'gauge',
+                 lambda: app.config['MONGO_MAX_POOL_SIZE'])
+
+def configure_mongo():
+    global query_tracker
+    query_tracker = build_query_tracker()
+    options = {
+        'maxPoolSize': app.config['MONGO_MAX_POOL_SIZE'],
+        'minPoolSize': app.config['MONGO_MIN_POOL_SIZE'],
+        'waitQueueTimeoutMS': app.config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+        'serverSelectionTimeoutMS': app.config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+        'event_listeners': [mongo_listener, mongo_pool_listener] + ([query_tracker] if query_tracker else []),
+    }
+    if app.config['MONGO_COMPRESSORS']:
+        options['compressors'] = app.config['MONGO_COMPRESSORS']
+    mongo.configure(app.config['MONGO_URI'], **options)
+
+# Nothing connects at import: the client is created by each process on its first query, after
+# gunicorn has forked the workers. db and the collections below resolve against it.
+mongo = MongoConnection()
+configure_mongo()
+db = mongo.database('task_manager')
 # Create notifications collection
 notifications_collection = db['notifications']
+# Old notifications moved out of the hot collection when archiving is enabled
+notifications_archive_collection = db['notifications_archive']
 
 tasks_collection = db['tasks']
 users_collection = db['users']
-socketio = SocketIO(app, cors_allowed_origins="*")
+# One document per attachment, looked up by (task_id, filename)
+attachments_collection = db['attachments']
+# Per-user task counters, keyed by user_id and maintained with $inc
+user_stats_collection = db['user_stats']
+# Per-user per-day task activity for analytics trends, keyed by "<user_id>:<YYYY-MM-DD>"
+task_rollups_collection = db['task_rollups']
+# Socket.IO server. With several workers or nodes, set SOCKETIO_MESSAGE_QUEUE (e.g. redis://host:6379/0)
+# so an emit from any process reaches clients connected to every other one.
+app.config['SOCKETIO_ASYNC_MODE'] = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
+app.config['SOCKETIO_MESSAGE_QUEUE'] = os.getenv('SOCKETIO_MESSAGE_QUEUE') or None
+app.config['SOCKETIO_CHANNEL'] = os.getenv('SOCKETIO_CHANNEL', 'flask-socketio')
+socketio = SocketIO(app,
+                   cors_allowed_origins="*",
+                   async_mode=app.config['SOCKETIO_ASYNC_MODE'],
+                   message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'],
+                   channel=app.config['SOCKETIO_CHANNEL'],
+                   json=flask_json,  # Events are encoded by app.json like the HTTP responses
+                   logger=True,
+                   engineio_logger=False)
+
+def emit_to_user(event, data, user_id):
+    """Emit to every connection of a user, on any worker when a message queue is configured"""
+    socketio_emits.inc(event)
+    socketio.emit(event, data, to=user_id)
+
+# Create indexes once per process, set AUTO_ENSURE_INDEXES=0 to manage them with the CLI only
+app.config['AUTO_ENSURE_INDEXES'] = os.getenv('AUTO_ENSURE_INDEXES', '1') == '1'
+INDEX_RETRY_SECONDS = 300
+_indexes_ensured = False
+_indexes_retry_at = 0.0
+
+@app.before_request
+def ensure_indexes_once():
+    global _indexes_ensured, _indexes_retry_at
+    if not app.config['AUTO_ENSURE_INDEXES'] or _indexes_ensured or time.monotonic() < _indexes_retry_at:
+        return
+    # Set first so concurrent requests don't start the same build
+    _indexes_ensured = True
+    try:
+        ensure_indexes(db)
+    except PyMongoError:
+        # e.g. duplicate usernames for the unique index, the request is served without it
+        # and the build is tried again later (or run `flask ensure-indexes` after fixing the data)
+        app.logger.exception('Creating indexes failed, retrying in %d seconds', INDEX_RETRY_SECONDS)
+        _indexes_ensured = False
+        _indexes_retry_at = time.monotonic() + INDEX_RETRY_SECONDS
 
 # Socket.IO connection handler
 @socketio.on('connect')
@@ -33,12 +207,71 @@ def handle_connect():
     if 'user_id' in session:
         user_id = session['user_id']
         # Join a room specific to this user
-        from flask_socketio import join_room
         join_room(user_id)
         print(f"User {user_id} connected to Socket.IO")
+        socketio_emits.inc('connected')
         emit('connected', {'message': 'Connected to real-time updates'}, room=user_id)
 
 
+# Static assets are linked with a content hash (?v=) so browsers can cache them for a year.
+# `flask build-assets` writes precompressed .br/.gz variants, served to clients that accept them.
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+@app.template_global()
+def asset_url(filename):
+    return url_for('static', filename=filename, v=file_digest(os.path.join(app.static_folder, filename)))
+
+def send_static_asset(filename):
+    """Static view that prefers an up-to-date precompressed variant of the file"""
+    path = safe_join(app.static_folder, filename)
+    encoding = None
+    if path is not None and os.path.isfile(path):
+        encoding, variant = precompressed_variant(path, request.accept_encodings)
+    if encoding is None:
+        response = app.send_static_file(filename)
+    else:
+        response = send_file(variant, mimetype=mimetypes.guess_type(filename)[0], conditional=True)
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    if request.args.get('v'):
+        # Fingerprinted URL, a new version of the file gets a new URL
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+app.view_functions['static'] = send_static_asset
+
+# Large JSON responses are compressed on the fly, static files are precompressed instead.
+# HTML is left alone: pages carry the CSRF token next to reflected input such as ?search=,
+# and compressing both lets an attacker recover the token from response sizes (BREACH).
+app.config['COMPRESS_RESPONSES'] = os.getenv('COMPRESS_RESPONSES', '1') == '1'
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # bytes
+COMPRESS_MIMETYPES = {'application/json'}
+
+@app.after_request
+def compress_response(response):
+    if (not app.config['COMPRESS_RESPONSES'] or response.status_code != 200
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESS_MIMETYPES):
+        return response
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    for encoding, _ in available_encodings():
+        if request.accept_encodings[encoding]:
+            # Fast levels, this runs on every large response
+            response.set_data(compress(data, encoding, level=5 if encoding == 'br' else 6))
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            # Same content, different bytes
+            etag, weak = response.get_etag()
+            if etag and not weak:
+                response.set_etag(etag, weak=True)
+            break
+    return response
+
 # Configure file uploads
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'zip'}
@@ -47,13 +280,415 @@ MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
-# Create uploads directory if it doesn't exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Uploaded files are stored once per content under uploads/blobs, attachment records point at them
+def build_attachment_store():
+    # Create uploads directory if it doesn't exist
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    return AttachmentStore(os.path.join(app.config['UPLOAD_FOLDER'], 'blobs'), db['attachment_blobs'])
+
+attachment_store = build_attachment_store()
+
+def delete_attachments(query):
+    """Delete attachment records matching query and release their blobs"""
+    for attachment in attachments_collection.find(query, {'blob': 1}):
+        if attachment.get('blob'):
+            attachment_store.release(attachment['blob'])
+    attachments_collection.delete_many(query)
+
+def attachment_path(owner_id, attachment):
+    if attachment.get('blob'):
+        return attachment_store.path(attachment['blob'])
+    # Attachments uploaded before the blob store live in the owner's directory
+    return os.path.join(app.config['UPLOAD_FOLDER'], owner_id, attachment['filename'])
+
+# Let a front proxy send attachment bytes: "x-accel-redirect" (nginx) or "x-sendfile" (Apache, lighttpd)
+app.config['ATTACHMENT_OFFLOAD'] = os.getenv('ATTACHMENT_OFFLOAD', '').lower()
+# nginx internal location that maps onto UPLOAD_FOLDER
+app.config['ATTACHMENT_ACCEL_PREFIX'] = os.getenv('ATTACHMENT_ACCEL_PREFIX', '/protected-uploads')
+
+def attachment_etag(attachment):
+    """Strong ETag from stored metadata, the content hash when there is one"""
+    if attachment.get('blob'):
+        return attachment['blob']
+    # Legacy files are never rewritten, their upload metadata identifies the content
+    fingerprint = f"{attachment['filename']}:{attachment.get('size')}:{attachment.get('uploaded_at')}"
+    return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+def send_attachment(owner_id, attachment):
+    """Send an attachment with ETag/304 and Range support, or hand it to the front proxy"""
+    file_path = attachment_path(owner_id, attachment)
+
+    # Check if file exists
+    if not os.path.isfile(file_path):
+        return jsonify({'error': 'File not found on server'}), 404
+
+    etag = attachment_etag(attachment)
+    offload = app.config['ATTACHMENT_OFFLOAD']
+    if not offload:
+        response = send_file(
+            file_path,
+            as_attachment=True,
+            download_name=attachment['original_name'],
+            etag=etag,
+            conditional=True  # handles If-None-Match and Range requests
+        )
+        response.cache_control.private = True
+        return response
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    response = Response(mimetype=attachment.get('mimetype') or 'application/octet-stream')
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.headers.set('Content-Disposition', 'attachment', filename=attachment['original_name'])
+    if offload == 'x-sendfile':
+        response.headers['X-Sendfile'] = os.path.abspath(file_path)
+    else:
+        relative_path = os.path.relpath(file_path, app.config['UPLOAD_FOLDER']).replace(os.sep, '/')
+        response.headers['X-Accel-Redirect'] = f"{app.config['ATTACHMENT_ACCEL_PREFIX']}/{relative_path}"
+    return response
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+TASK_STATUSES = ['Pending', 'In Progress', 'Completed']
+
+class UsernameCache:
+    """Small in-process user_id -> username cache with TTL and LRU eviction"""
+
+    def __init__(self, max_size=1024, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            username, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return username
+
+    def set(self, user_id, username):
+        with self._lock:
+            self._entries[user_id] = (username, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+app.config['USERNAME_CACHE_SIZE'] = int(os.getenv('USERNAME_CACHE_SIZE', 1024))
+app.config['USERNAME_CACHE_TTL'] = int(os.getenv('USERNAME_CACHE_TTL', 300))  # seconds
+
+def build_username_cache():
+    return UsernameCache(app.config['USERNAME_CACHE_SIZE'], app.config['USERNAME_CACHE_TTL'])
+
+username_cache = build_username_cache()
+
+def get_usernames(user_ids):
+    """Resolve user ids to usernames from the cache, fetching all misses in one $in query"""
+    usernames = {}
+    missing = []
+    for user_id in set(user_ids):
+        username = username_cache.get(user_id)
+        if username is None:
+            missing.append(user_id)
+        else:
+            usernames[user_id] = username
+
+    object_ids = [ObjectId(user_id) for user_id in missing if ObjectId.is_valid(user_id)]
+    if object_ids:
+        for user in users_collection.find({'_id': {'$in': object_ids}}, {'username': 1}):
+            usernames[str(user['_id'])] = user['username']
+            username_cache.set(str(user['_id']), user['username'])
+    return usernames
+
+# Read endpoints answer with 304 or a cached body while the user's data version is unchanged.
+# Versions are kept in user_stats ("mongo") so that every worker sees a write made by another;
+# "memory" saves that read per request but is only correct with a single worker process.
+app.config['DATA_VERSION_STORE'] = os.getenv('DATA_VERSION_STORE', 'mongo')
+app.config['RESPONSE_CACHE_SIZE'] = int(os.getenv('RESPONSE_CACHE_SIZE', 2048))
+
+def build_data_versions():
+    store = app.config['DATA_VERSION_STORE']
+    if store not in ('mongo', 'memory'):
+        raise ValueError(f"DATA_VERSION_STORE must be mongo or memory, not {store!r}")
+    return DataVersions(user_stats_collection if store == 'mongo' else None)
+
+def build_response_cache():
+    return ResponseCache(app.config['RESPONSE_CACHE_SIZE'])
+
+data_versions = build_data_versions()
+response_cache = build_response_cache()
+
+def cached_per_user(*scopes):
+    """Serve a GET endpoint from its ETag or the response cache until one of scopes is bumped"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if 'user_id' not in session:
+                return view(*args, **kwargs)
+
+            user_id = session['user_id']
+            # Read before the view runs so a concurrent write can only make the ETag older, never newer.
+            # Versions are per user and start at 0, the user hash keeps two users' ETags apart.
+            # The date is included because overdue counts and trend ranges move at midnight.
+            user_hash = hashlib.sha256(user_id.encode()).hexdigest()[:12]
+            etag = f"{user_hash}-{data_versions.get(user_id, scopes)}-{datetime.utcnow():%Y%m%d}"
+            # Weak comparison, compressed responses carry a weak ETag
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                key = (user_id, request.full_path)
+                cached = response_cache.get(key, etag)
+                if cached is not None:
+                    response = Response(cached[0], headers=cached[1])
+                else:
+                    response = app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    response_cache.set(key, etag, response.get_data(), list(response.headers.items()))
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+# Search: title words are stored with all their prefixes, description words only whole,
+# which keeps long descriptions from adding a dozen index keys per word
+SEARCH_TOKEN_MAX_LENGTH = 15
+SEARCH_RESULT_LIMIT = 200
+
+def tokenize(text):
+    return re.findall(r'\w+', (text or '').lower())
+
+def search_fields(title, description):
+    """The indexed search_tokens of a task and the title_words its matches are ranked by"""
+    title_words = sorted({word[:SEARCH_TOKEN_MAX_LENGTH] for word in tokenize(title)})
+    tokens = {word[:SEARCH_TOKEN_MAX_LENGTH] for word in tokenize(description)}
+    for word in title_words:
+        tokens.update(word[:i] for i in range(1, len(word) + 1))
+    return {'search_tokens': sorted(tokens), 'title_words': title_words}
+
+def search_score(terms):
+    """Aggregation expression ranking whole title words above title prefixes above description words"""
+    title_words = {'$ifNull': ['$title_words', []]}
+    score = []
+    for term in terms:
+        starts_with_term = {'$regexMatch': {'input': '$$word', 'regex': '^' + re.escape(term)}}
+        title_prefix = {'$in': [True, {'$map': {'input': title_words, 'as': 'word', 'in': starts_with_term}}]}
+        score.append({'$cond': [{'$in': [term, title_words]}, 4, {'$cond': [title_prefix, 3, 2]}]})
+    return {'$add': score}
+
+def search_tasks(query, search_query, projection=None, sort_by_deadline=False):
+    """Find tasks matching every search word, best matches (or earliest deadlines) first.
+
+    Tasks are ranked and sorted by MongoDB, only the first SEARCH_RESULT_LIMIT are returned.
+    """
+    terms = list(dict.fromkeys(word[:SEARCH_TOKEN_MAX_LENGTH] for word in tokenize(search_query)))
+    if not terms:
+        return []
+    query = {**query, 'search_tokens': {'$all': terms}}
+    projection = projection or TASK_LIST_PROJECTION
+    if sort_by_deadline:
+        pipeline = [{'$match': query}, {'$sort': {'deadline': 1, '_id': 1}}]
+    else:
+        pipeline = [
+            {'$match': query},
+            {'$addFields': {'search_score': search_score(terms)}},
+            {'$sort': {'search_score': -1, '_id': 1}}
+        ]
+    pipeline += [{'$limit': SEARCH_RESULT_LIMIT}, {'$project': projection}]
+    return list(tasks_collection.aggregate(pipeline))
+
+# Listings only carry what the task rows show, the full task comes from get_task()
+TASK_LIST_PROJECTION = {'title': 1, 'status': 1, 'deadline': 1, 'created_at': 1, 'user_id': 1}
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def get_page_size():
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def encode_cursor(task, sort_by_deadline=False):
+    """Opaque cursor pointing just after the given task"""
+    position = {'id': str(task['_id'])}
+    if sort_by_deadline:
+        position['deadline'] = task.get('deadline')
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def decode_cursor(cursor):
+    """Raises ValueError for cursors that were not produced by encode_cursor()"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        position['id'] = ObjectId(position['id'])
+    except Exception:
+        raise ValueError('Invalid cursor')
+    return position
+
+def paginate_tasks(query, cursor=None, limit=DEFAULT_PAGE_SIZE, sort_by_deadline=False,
+                   projection=None):
+    """Return one page of tasks ordered by _id (or deadline, _id) and the next cursor"""
+    query = dict(query)
+    if cursor:
+        position = decode_cursor(cursor)
+        if not sort_by_deadline:
+            query['_id'] = {'$gt': position['id']}
+        elif position.get('deadline') is None:
+            # Tasks without a deadline sort before every dated task
+            query['$or'] = [
+                {'deadline': None, '_id': {'$gt': position['id']}},
+                {'deadline': {'$type': 'string'}}
+            ]
+        else:
+            query['$or'] = [
+                {'deadline': position['deadline'], '_id': {'$gt': position['id']}},
+                {'deadline': {'$gt': position['deadline']}}
+            ]
+
+    sort = [('deadline', 1), ('_id', 1)] if sort_by_deadline else [('_id', 1)]
+    # Fetch one extra task to know whether there is a next page
+    tasks = list(tasks_collection.find(query, projection or TASK_LIST_PROJECTION)
+                 .sort(sort).limit(limit + 1))
+
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_cursor = encode_cursor(tasks[-1], sort_by_deadline)
+    return tasks, next_cursor
+
+def valid_deadline(deadline):
+    """True for a YYYY-MM-DD deadline, the only ones used as keys of the stats document"""
+    try:
+        datetime.strptime(deadline, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return False
+    return True
+
+def task_stats_delta(task, sign=1):
+    """Return the $inc fields a single task contributes to its owner's stats"""
+    inc = {'total': sign, f"status_counts.{task.get('status')}": sign}
+    # Open tasks are bucketed by deadline so overdue can be summed at read time
+    if task.get('status') != 'Completed' and valid_deadline(task.get('deadline')):
+        inc[f"open_deadlines.{task['deadline']}"] = sign
+    return inc
+
+def update_task_stats(user_id, removed=(), added=()):
+    """Atomically apply removed/added task states to the user's stats document"""
+    inc = {}
+    for task, sign in [(t, -1) for t in removed] + [(t, 1) for t in added]:
+        for field, value in task_stats_delta(task, sign).items():
+            inc[field] = inc.get(field, 0) + value
+    inc = {field: value for field, value in inc.items() if value}
+    if not inc:
+        return
+    # Without a built document there is nothing to adjust, get_status_summary() builds it
+    # from the tasks, which already include this change
+    emptied = [field for field, value in inc.items() if value < 0 and field.startswith('open_deadlines.')]
+    stats = user_stats_collection.find_one_and_update(
+        {'_id': user_id, 'total': {'$exists': True}},
+        {'$inc': inc},
+        projection=dict.fromkeys(emptied, 1) or {'_id': 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not stats:
+        return
+    # Deadlines without open tasks are removed, unless another write has refilled them since
+    open_deadlines = stats.get('open_deadlines', {})
+    zero = {field: 0 for field in emptied if open_deadlines.get(field.split('.', 1)[1]) == 0}
+    if zero:
+        user_stats_collection.update_one({'_id': user_id, **zero}, {'$unset': dict.fromkeys(zero, '')})
+
+def reconcile_task_stats(user_id):
+    """Rebuild a user's stats document from tasks_collection to repair drift"""
+    pipeline = [
+        {'$match': {'user_id': user_id}},
+        {'$group': {
+            '_id': {'status': '$status', 'deadline': '$deadline'},
+            'count': {'$sum': 1}
+        }}
+    ]
+    stats = {'total': 0, 'status_counts': {}, 'open_deadlines': {}}
+    for data in tasks_collection.aggregate(pipeline):
+        status = str(data['_id'].get('status'))
+        deadline = data['_id'].get('deadline')
+        stats['total'] += data['count']
+        stats['status_counts'][status] = stats['status_counts'].get(status, 0) + data['count']
+        if status != 'Completed' and valid_deadline(deadline):
+            stats['open_deadlines'][deadline] = stats['open_deadlines'].get(deadline, 0) + data['count']
+
+    user_stats_collection.update_one({'_id': user_id}, {'$set': stats}, upsert=True)
+    return stats
+
+def get_status_summary(user_id):
+    """Read a user's status counts and overdue count from their stats document"""
+    stats = user_stats_collection.find_one({'_id': user_id})
+    if stats is None or 'total' not in stats:
+        # First read for this user, build the document from their tasks
+        stats = reconcile_task_stats(user_id)
+
+    status_counts = stats.get('status_counts', {})
+    today = datetime.utcnow().date().isoformat()
+
+    summary = {status: status_counts.get(status, 0) for status in TASK_STATUSES}
+    summary['by_status'] = {status: count for status, count in status_counts.items() if count > 0}
+    summary['total'] = stats.get('total', 0)
+    # Deadline passed but not completed
+    summary['overdue'] = sum(count for deadline, count in stats.get('open_deadlines', {}).items()
+                             if deadline < today)
+    summary['completion_rate'] = 0
+    if summary['total'] > 0:
+        summary['completion_rate'] = round((summary['Completed'] / summary['total']) * 100, 2)
+    return summary
+
+def completed_at_update(status):
+    """Update that records when a task moved to Completed, or clears it when it left"""
+    if status == 'Completed':
+        return {'$set': {'completed_at': datetime.utcnow()}}
+    return {'$unset': {'completed_at': ''}}
+
+def completed_at_expression(status):
+    """completed_at for a pipeline update setting status, from the status stored before it"""
+    if status == 'Completed':
+        return {'$cond': [{'$eq': ['$status', 'Completed']}, '$completed_at', datetime.utcnow()]}
+    return '$$REMOVE'
+
+def record_task_activity(user_id, created=0, transitions=()):
+    """$inc today's rollup for the user with created tasks and (old, new) status transitions"""
+    inc = {}
+    if created:
+        inc['created'] = created
+    for old_status, new_status in transitions:
+        if old_status == new_status:
+            continue
+        if new_status == 'Completed':
+            inc['completed'] = inc.get('completed', 0) + 1
+        if old_status in TASK_STATUSES and new_status in TASK_STATUSES:
+            field = f'transitions.{old_status}>{new_status}'
+            inc[field] = inc.get(field, 0) + 1
+    if not inc:
+        return
+
+    day = datetime.utcnow().strftime('%Y-%m-%d')
+    task_rollups_collection.update_one(
+        {'_id': f'{user_id}:{day}'},
+        {'$inc': inc, '$setOnInsert': {'user_id': user_id, 'date': day}},
+        upsert=True
+    )
+
 @app.route('/')
 def index():
     if 'username' not in session:
@@ -65,6 +700,8 @@ def index():
     status_filter = request.args.get('status')
     search_query = request.args.get('search')
     sort_by_deadline = request.args.get('sort') == 'deadline'
+    cursor = request.args.get('cursor')
+    next_cursor = None
 
     # Store the current filter in session for persistence
     if status_filter:
@@ -75,10 +712,11 @@ def index():
         status_filter = None
 
     # Get counts for ALL tasks (always calculate these)
-    total_count = tasks_collection.count_documents({'user_id': user_id})
-    Pending_count = tasks_collection.count_documents({'user_id': user_id, 'status': 'Pending'})
-    In_Progress_count = tasks_collection.count_documents({'user_id': user_id, 'status': 'In Progress'})
-    Completed_count = tasks_collection.count_documents({'user_id': user_id, 'status': 'Completed'})
+    summary = get_status_summary(user_id)
+    total_count = summary['total']
+    Pending_count = summary['Pending']
+    In_Progress_count = summary['In Progress']
+    Completed_count = summary['Completed']
 
     tasks = []
     # Show components if either a filter or search is selected OR if we have a stored filter
@@ -90,12 +728,15 @@ def index():
         query['status'] = status_filter
 
     if search_query:
-        query['title'] = {'$regex': search_query, '$options': 'i'}  # Case-insensitive regex search
-
-    if sort_by_deadline:
-        tasks_cursor = tasks_collection.find(query).sort('deadline', 1)
+        # Ranked results are capped at SEARCH_RESULT_LIMIT instead of paginated
+        tasks_cursor = search_tasks(query, search_query, sort_by_deadline=sort_by_deadline)
     else:
-        tasks_cursor = tasks_collection.find(query)
+        try:
+            tasks_cursor, next_cursor = paginate_tasks(query, cursor, get_page_size(), sort_by_deadline)
+        except ValueError:
+            # Stale or tampered cursor, start from the first page
+            cursor = None
+            tasks_cursor, next_cursor = paginate_tasks(query, None, get_page_size(), sort_by_deadline)
 
     for task in tasks_cursor:
         task['id'] = str(task['_id'])
@@ -117,20 +758,163 @@ def index():
                            overall_completed_percentage=overall_completed_percentage,
                            username=session.get('username'),
                            show_components=show_components,
-                           search_query=search_query)  # Pass search_query to template
-    # Helper function to convert MongoDB documents to JSON-safe format
-def serialize_task(task):
-    return {
-        "_id": str(task["_id"]),
-        "title": task.get("title", ""),
-        "description": task.get("description", ""),
-        "status": task.get("status", ""),
-        "created_at": task.get("created_at", ""),
-        "deadline": task.get("deadline", "")
-    }
+                           search_query=search_query,  # Pass search_query to template
+                           cursor=cursor,
+                           next_cursor=next_cursor)
+
+def emit_task_event(event, user_id, changes):
+    """Send task deltas to their owner and to the users each task is shared with
+
+    changes is a list of (task, fields) pairs, task only needs its sharedWith list.
+    Called after the write, it also bumps the task data version of every recipient.
+    """
+    recipients = {user_id: []}
+    for task, fields in changes:
+        recipients[user_id].append(fields)
+        for shared_user_id in task.get('sharedWith', []):
+            recipients.setdefault(shared_user_id, []).append(fields)
+    data_versions.bump('tasks', recipients)
+    for recipient, tasks in recipients.items():
+        emit_to_user(event, {'tasks': tasks}, recipient)
+
+# Notifications are written behind the request by a background worker in batches
+app.config['NOTIFICATION_QUEUE_ENABLED'] = os.getenv('NOTIFICATION_QUEUE_ENABLED', '1') == '1'
+app.config['NOTIFICATION_QUEUE_SIZE'] = int(os.getenv('NOTIFICATION_QUEUE_SIZE', 10000))
+app.config['NOTIFICATION_BATCH_SIZE'] = int(os.getenv('NOTIFICATION_BATCH_SIZE', 500))
+app.config['NOTIFICATION_FLUSH_INTERVAL'] = float(os.getenv('NOTIFICATION_FLUSH_INTERVAL', 0.05))  # seconds
+# "majority", "1" or "0" (unacknowledged)
+app.config['NOTIFICATION_WRITE_CONCERN'] = os.getenv('NOTIFICATION_WRITE_CONCERN', '1')
+
+def _write_concern(value):
+    return WriteConcern(w=int(value) if value.isdigit() else value)
+
+# Retention: read notifications expire (TTL index on expire_at) and every user keeps at most
+# NOTIFICATION_MAX_PER_USER. With archiving enabled both are moved to notifications_archive instead.
+app.config['NOTIFICATION_READ_TTL_DAYS'] = int(os.getenv('NOTIFICATION_READ_TTL_DAYS', 30))
+app.config['NOTIFICATION_MAX_PER_USER'] = int(os.getenv('NOTIFICATION_MAX_PER_USER', 200))
+app.config['NOTIFICATION_ARCHIVE_ENABLED'] = os.getenv('NOTIFICATION_ARCHIVE_ENABLED', '0') == '1'
+NOTIFICATION_ARCHIVE_BATCH_SIZE = 1000
+
+def read_notification_fields():
+    """Fields to $set when a notification is marked as read"""
+    now = datetime.utcnow()
+    fields = {'is_read': True, 'read_at': now}
+    if not app.config['NOTIFICATION_ARCHIVE_ENABLED']:
+        # Picked up by the TTL index, archived notifications are pruned by the CLI instead
+        fields['expire_at'] = now + timedelta(days=app.config['NOTIFICATION_READ_TTL_DAYS'])
+    return fields
+
+def remove_notifications(query):
+    """Delete notifications matching query, or move them to the archive collection"""
+    if not app.config['NOTIFICATION_ARCHIVE_ENABLED']:
+        return notifications_collection.delete_many(query).deleted_count
+
+    removed = 0
+    while True:
+        batch = list(notifications_collection.find(query).limit(NOTIFICATION_ARCHIVE_BATCH_SIZE))
+        if not batch:
+            return removed
+        try:
+            notifications_archive_collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Already archived by an earlier interrupted run
+            if any(error['code'] != 11000 for error in e.details['writeErrors']):
+                raise
+        removed += notifications_collection.delete_many(
+            {'_id': {'$in': [note['_id'] for note in batch]}}
+        ).deleted_count
+
+def enforce_notification_cap(user_ids):
+    """Remove each user's oldest notifications beyond NOTIFICATION_MAX_PER_USER"""
+    max_per_user = app.config['NOTIFICATION_MAX_PER_USER']
+    removed = 0
+    for user_id in set(user_ids):
+        oldest_kept = list(notifications_collection.find({'user_id': user_id}, {'created_at': 1})
+                           .sort('created_at', -1).skip(max_per_user - 1).limit(2))
+        if len(oldest_kept) < 2:
+            continue
+        query = {'user_id': user_id, 'created_at': {'$lt': oldest_kept[0]['created_at']}}
+        unread = notifications_collection.count_documents({**query, 'is_read': False})
+        removed += remove_notifications(query)
+        if unread:
+            update_unread_count(user_id, -unread)
+    return removed
+
+# Unread notifications are counted in the user's stats document so the badge is one indexed read
+def reconcile_unread_count(user_id):
+    """Recount a user's unread notifications into their stats document"""
+    count = notifications_collection.count_documents({'user_id': user_id, 'is_read': False})
+    user_stats_collection.update_one({'_id': user_id}, {'$set': {'unread_notifications': count}}, upsert=True)
+    return count
+
+def get_unread_count(user_id):
+    stats = user_stats_collection.find_one({'_id': user_id}, {'unread_notifications': 1})
+    if stats is None or 'unread_notifications' not in stats:
+        # Counter not started yet for this user
+        return reconcile_unread_count(user_id)
+    return stats['unread_notifications']
+
+def update_unread_count(user_id, delta):
+    """Apply delta to the unread counter after the write and push the new count to the user"""
+    stats = user_stats_collection.find_one_and_update(
+        {'_id': user_id, 'unread_notifications': {'$exists': True}},
+        {'$inc': {'unread_notifications': delta}},
+        projection={'unread_notifications': 1},
+        return_document=ReturnDocument.AFTER
+    )
+    # The recount already includes the change
+    count = stats['unread_notifications'] if stats else reconcile_unread_count(user_id)
+    emit_to_user('unread_count', {'count': count}, user_id)
+    return count
+
+def on_notifications_written(notifications):
+    written = {}
+    for note in notifications:
+        written[note['user_id']] = written.get(note['user_id'], 0) + 1
+    for user_id, count in written.items():
+        update_unread_count(user_id, count)
+    enforce_notification_cap(written)
+    data_versions.bump('notifications', written)
+
+def build_notification_queue():
+    return NotificationQueue(
+        notifications_collection.with_options(write_concern=_write_concern(app.config['NOTIFICATION_WRITE_CONCERN'])),
+        max_size=app.config['NOTIFICATION_QUEUE_SIZE'],
+        batch_size=app.config['NOTIFICATION_BATCH_SIZE'],
+        flush_interval=app.config['NOTIFICATION_FLUSH_INTERVAL'],
+        on_flush=on_notifications_written
+    )
+
+notification_queue = build_notification_queue()
+# Looked up at exit, create_app() may have replaced the queue
+atexit.register(lambda: notification_queue.stop())
+
+# Notification queue stats, read when /metrics is scraped
+for name, key, metric_type, documentation in [
+    ('notification_queue_depth', 'depth', 'gauge', 'Notifications waiting to be written'),
+    ('notification_queue_enqueued_total', 'enqueued', 'counter', 'Notifications queued'),
+    ('notification_queue_written_total', 'written', 'counter', 'Notifications written'),
+    ('notification_queue_overflow_writes_total', 'overflow_writes', 'counter',
+     'Notifications written synchronously because the queue was full'),
+    ('notification_queue_failed_total', 'failed', 'counter', 'Notifications that could not be written'),
+    ('notification_queue_flushes_total', 'flushes', 'counter', 'Batches written'),
+    ('notification_queue_flush_seconds_total', 'flush_seconds_total', 'counter', 'Time spent writing batches'),
+    ('notification_queue_flush_seconds_max', 'flush_seconds_max', 'gauge', 'Slowest batch write'),
+]:
+    metrics.callback(name, documentation, metric_type, lambda key=key: notification_queue.metrics()[key])
+
+@app.route('/metrics')
+def prometheus_metrics():
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'Not found'}), 404
+    if app.config['METRICS_TOKEN'] and request.headers.get('Authorization') != f"Bearer {app.config['METRICS_TOKEN']}":
+        return jsonify({'error': 'Not authenticated'}), 401
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 def create_notification(user_id, message, notification_type='info', related_task=None):
-    """Create a notification and save to database"""
+    """Create a notification, queue it to be saved to database and push it to the user"""
     notification = {
+        '_id': ObjectId(),
         'user_id': user_id,
         'message': message,
         'type': notification_type,  # info, success, warning, danger
@@ -138,10 +922,16 @@ def create_notification(user_id, message, notification_type='info', related_task
         'created_at': datetime.utcnow(),
         'related_task': related_task  # Optional: task ID if related to a task
     }
-    return notifications_collection.insert_one(notification)
+    if app.config['NOTIFICATION_QUEUE_ENABLED']:
+        notification_queue.put(notification)
+    else:
+        notification_queue.write([notification])
+    emit_to_user('notification_created', notification_to_api(notification), user_id)
+    return notification
 
 # Route to fetch all tasks, with optional status filter
 @app.route('/api/tasks')
+@cached_per_user('tasks')
 def get_all_tasks():
     if 'user_id' not in session:
         return redirect(url_for('login'))
@@ -152,18 +942,92 @@ def get_all_tasks():
     if status:
         query["status"] = status
 
-    tasks_cursor = tasks_collection.find(query)
-    tasks = [serialize_task(task) for task in tasks_cursor]
-    return jsonify(tasks)
+    try:
+        tasks_cursor, next_cursor = paginate_tasks(query, request.args.get('cursor'), get_page_size(),
+                                                   request.args.get('sort') == 'deadline')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    tasks = [task_to_api(task) for task in tasks_cursor]
+    response = jsonify(tasks)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+# Streaming export of all of a user's tasks
+EXPORT_FIELDS = ['_id', 'title', 'description', 'status', 'deadline', 'created_at']
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 64 * 1024  # bytes buffered before a chunk is sent
+
+def export_row(task):
+    row = {}
+    for field in EXPORT_FIELDS:
+        value = task.get(field, '')
+        if isinstance(value, ObjectId):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        row[field] = value
+    return row
+
+def export_lines(tasks_cursor, export_format):
+    """Yield the export in chunks of about EXPORT_CHUNK_SIZE, one line per task"""
+    buffer = io.StringIO()
+    writer = None
+    if export_format == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+
+    for task in tasks_cursor:
+        if writer:
+            writer.writerow(export_row(task))
+        else:
+            buffer.write(json.dumps(export_row(task)) + '\n')
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@app.route('/api/tasks/export')
+def export_tasks():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'Format must be ndjson or csv'}), 400
 
-def convert_objectid(data):
-    if isinstance(data, list):
-        return [{**item, '_id': str(item['_id'])} for item in data]
-    elif isinstance(data, dict):
-        data['_id'] = str(data['_id'])
-        return data
-    return data
+    query = {'user_id': session['user_id']}
+    if request.args.get('status'):
+        query['status'] = request.args.get('status')
 
+    projection = {field: 1 for field in EXPORT_FIELDS}
+    tasks_cursor = tasks_collection.find(query, projection).sort('_id', 1).batch_size(EXPORT_BATCH_SIZE)
+
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    return Response(export_lines(tasks_cursor, export_format), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=tasks.{export_format}'
+    })
+
+# Full task details, only fetched when a task is opened
+@app.route('/api/tasks/<task_id>')
+@cached_per_user('tasks')
+def get_task(task_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    user_id = session['user_id']
+    if not ObjectId.is_valid(task_id):
+        return jsonify({'error': 'Task not found or unauthorized'}), 404
+    task = tasks_collection.find_one(
+        {'_id': ObjectId(task_id), '$or': [{'user_id': user_id}, {'sharedWith': user_id}]},
+        {'search_tokens': 0, 'title_words': 0, 'attachments': 0}
+    )
+    if not task:
+        return jsonify({'error': 'Task not found or unauthorized'}), 404
+
+    return jsonify(task_to_api(task))
 
 @app.route('/delete_task/<task_id>', methods=['POST'])  # ← ADD methods=['POST']
 def delete_task(task_id):
@@ -171,13 +1035,20 @@ def delete_task(task_id):
         return redirect(url_for('login'))
 
     user_id = session['user_id']
-    result = tasks_collection.delete_one({'_id': ObjectId(task_id), 'user_id': user_id})
+    task = tasks_collection.find_one_and_delete(
+        {'_id': ObjectId(task_id), 'user_id': user_id},
+        projection={'status': 1, 'deadline': 1, 'user_id': 1, 'sharedWith': 1}
+    )
+    if task:
+        update_task_stats(user_id, removed=[task])
+        delete_attachments({'task_id': task_id})
+        emit_task_event('task_deleted', user_id, [(task, task_event_fields(task))])
     create_notification(
         user_id=user_id,
         message=f"Task deleted successfully!",
         notification_type='warning'
     )
-    if result.deleted_count == 0:
+    if not task:
         return "Unauthorized or task not found", 403
     if 'last_filter' in session:
         return redirect(url_for('index', status=session['last_filter']))
@@ -191,25 +1062,42 @@ def update_task():
     user_id = session['user_id']
     task_id = request.form.get("task_id")
 
-    # Check if task belongs to current user
-    task = tasks_collection.find_one({"_id": ObjectId(task_id), "user_id": user_id})
-    if not task:
-        return "Unauthorized or task not found", 403
-
     title = request.form.get("title")
     description = request.form.get("description")
     deadline = request.form.get("deadline")
     status = request.form.get("status")
-
-    tasks_collection.update_one(
+    # Status and deadline become field names in the user's stats document
+    if status not in TASK_STATUSES:
+        return "Invalid status", 400
+    if deadline and not valid_deadline(deadline):
+        return "Invalid date format", 400
+
+    fields = {
+        "title": title,
+        "description": description,
+        "deadline": deadline,
+        "status": status,
+        **search_fields(title, description)
+    }
+    # Only matches if the task belongs to current user. A pipeline update sees the stored
+    # status, so completed_at is set in the same write; $literal keeps "$..." text as text
+    task = tasks_collection.find_one_and_update(
         {"_id": ObjectId(task_id), "user_id": user_id},
-        {"$set": {
-            "title": title,
-            "description": description,
-            "deadline": deadline,
-            "status": status
-        }}
+        [{"$set": {
+            **{name: {'$literal': value} for name, value in fields.items()},
+            "completed_at": completed_at_expression(status)
+        }}],
+        projection={'status': 1, 'deadline': 1, 'user_id': 1, 'sharedWith': 1},
+        return_document=ReturnDocument.BEFORE
     )
+    if not task:
+        return "Unauthorized or task not found", 403
+
+    update_task_stats(user_id, removed=[task], added=[{'status': status, 'deadline': deadline}])
+    record_task_activity(user_id, transitions=[(task.get('status'), status)])
+    changes = {'title': title, 'description': description, 'deadline': deadline, 'status': status}
+    emit_task_event('task_updated', user_id,
+                    [(task, task_event_fields({**task, **changes}, *changes))])
     create_notification(
         user_id=user_id,
         message=f"Task '{title}' updated successfully!",
@@ -230,26 +1118,20 @@ def filter_tasks():
     if status_filter:
         query['status'] = status_filter
 
-    tasks = list(tasks_collection.find(query))
+    try:
+        tasks, next_cursor = paginate_tasks(query, request.args.get('cursor'), get_page_size())
+    except ValueError:
+        return "Invalid cursor", 400
 
     for task in tasks:
         task['_id'] = str(task['_id'])
 
-    return render_template('index.html', tasks=tasks, active_filter=status_filter or 'all')
+    return render_template('index.html', tasks=tasks, active_filter=status_filter or 'all',
+                           next_cursor=next_cursor)
 
 
-@app.route('/add_task', methods=['POST'])
-def add_task():
-    if 'user_id' not in session:
-        return redirect(url_for('login'))
-
-    # Get form data
-    title = request.form.get('title', '').strip()
-    description = request.form.get('description', '').strip()
-    deadline = request.form.get('deadline')
-    user_id = session['user_id']
-
-    # Server-side validation
+def validate_task(title, description, deadline):
+    """Return the validation errors for a new task, shared by add_task and the bulk API"""
     errors = []
 
     if not title:
@@ -264,24 +1146,46 @@ def add_task():
                 errors.append('Deadline cannot be in the past')
         except ValueError:
             errors.append('Invalid date format')
+    return errors
 
-    if errors:
-        for error in errors:
-            flash(error, 'error')
-        return redirect(url_for('index'))
-
-    # Only proceed if validation passes
-    task = {
+def new_task(user_id, title, description, deadline):
+    return {
         'title': title,
         'description': description,
         'deadline': deadline,
         'status': 'Pending',
         'created_at': datetime.utcnow(),
         'user_id': user_id,
-        'sharedWith': []  # ← ADD THIS: Array of user IDs who can access this task
+        'sharedWith': [],  # ← ADD THIS: Array of user IDs who can access this task
+        **search_fields(title, description)
     }
 
+@app.route('/add_task', methods=['POST'])
+def add_task():
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+
+    # Get form data
+    title = request.form.get('title', '').strip()
+    description = request.form.get('description', '').strip()
+    deadline = request.form.get('deadline')
+    user_id = session['user_id']
+
+    # Server-side validation
+    errors = validate_task(title, description, deadline)
+
+    if errors:
+        for error in errors:
+            flash(error, 'error')
+        return redirect(url_for('index'))
+
+    # Only proceed if validation passes
+    task = new_task(user_id, title, description, deadline)
+
     tasks_collection.insert_one(task)
+    update_task_stats(user_id, added=[task])
+    record_task_activity(user_id, created=1)
+    emit_task_event('task_created', user_id, [(task, task_event_fields(task, *TASK_EVENT_FIELDS))])
     create_notification(
         user_id=user_id,
         message=f"Task '{title}' created successfully!",
@@ -292,6 +1196,170 @@ def add_task():
         return redirect(url_for('index', status=session['last_filter']))
     return redirect(url_for('index'))  # No filter
 
+# Bulk task API, one request and one notification for many tasks
+MAX_BULK_ITEMS = 1000
+
+def bulk_items(key):
+    """Return the list under key in the JSON body, or an error response"""
+    data = request.get_json(silent=True) or {}
+    items = data.get(key)
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({'error': f"'{key}' must be a non-empty list"}), 400)
+    if len(items) > MAX_BULK_ITEMS:
+        return None, (jsonify({'error': f'At most {MAX_BULK_ITEMS} items per request'}), 400)
+    return items, None
+
+def owned_tasks_by_id(user_id, task_ids):
+    """Fetch the user's tasks among task_ids, invalid ids are ignored"""
+    object_ids = [ObjectId(task_id) for task_id in task_ids
+                  if isinstance(task_id, str) and ObjectId.is_valid(task_id)]
+    tasks = tasks_collection.find({'_id': {'$in': object_ids}, 'user_id': user_id},
+                                  {'status': 1, 'deadline': 1, 'title': 1, 'user_id': 1, 'sharedWith': 1})
+    return {str(task['_id']): task for task in tasks}
+
+@app.route('/api/tasks/bulk', methods=['POST'])
+def bulk_create_tasks():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    user_id = session['user_id']
+    items, error = bulk_items('tasks')
+    if error:
+        return error
+
+    results = []
+    tasks = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({'index': index, 'status': 'error', 'errors': ['Task must be an object']})
+            continue
+        title = str(item.get('title') or '').strip()
+        description = str(item.get('description') or '').strip()
+        deadline = str(item.get('deadline') or '') or None
+        errors = validate_task(title, description, deadline)
+        if errors:
+            results.append({'index': index, 'status': 'error', 'errors': errors})
+            continue
+        task = new_task(user_id, title, description, deadline)
+        task['_id'] = ObjectId()
+        tasks.append(task)
+        results.append({'index': index, 'status': 'created', 'id': str(task['_id'])})
+
+    if tasks:
+        tasks_collection.insert_many(tasks, ordered=False)
+        update_task_stats(user_id, added=tasks)
+        record_task_activity(user_id, created=len(tasks))
+        emit_task_event('task_created', user_id,
+                        [(task, task_event_fields(task, *TASK_EVENT_FIELDS)) for task in tasks])
+        create_notification(
+            user_id=user_id,
+            message=f"{len(tasks)} task(s) created successfully!",
+            notification_type='success'
+        )
+
+    return jsonify({'created': len(tasks), 'results': results})
+
+@app.route('/api/tasks/bulk/status', methods=['POST'])
+def bulk_update_status():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    user_id = session['user_id']
+    task_ids, error = bulk_items('task_ids')
+    if error:
+        return error
+    status = (request.get_json(silent=True) or {}).get('status')
+    if status not in TASK_STATUSES:
+        return jsonify({'error': f"Status must be one of {', '.join(TASK_STATUSES)}"}), 400
+
+    tasks = owned_tasks_by_id(user_id, task_ids)
+    results = []
+    operations = []
+    changed = []
+    for task_id in task_ids:
+        # Lists or objects in the body are not ids, and not hashable either
+        task = tasks.get(task_id) if isinstance(task_id, str) else None
+        if task is None:
+            results.append({'id': task_id, 'status': 'not_found'})
+        elif task.get('status') == status:
+            results.append({'id': task_id, 'status': 'unchanged'})
+        else:
+            # Matching the old status keeps the stats delta exact
+            update = completed_at_update(status)
+            update.setdefault('$set', {})['status'] = status
+            operations.append(UpdateOne({'_id': task['_id'], 'user_id': user_id, 'status': task.get('status')},
+                                        update))
+            changed.append(task)
+            results.append({'id': task_id, 'status': 'updated'})
+
+    if operations:
+        result = tasks_collection.bulk_write(operations, ordered=False)
+        if result.matched_count == len(operations):
+            update_task_stats(user_id, removed=changed,
+                              added=[{**task, 'status': status} for task in changed])
+        else:
+            # Some tasks changed concurrently, recount instead of guessing
+            reconcile_task_stats(user_id)
+        record_task_activity(user_id, transitions=[(task.get('status'), status) for task in changed])
+        emit_task_event('task_updated', user_id,
+                        [(task, task_event_fields({**task, 'status': status}, 'status')) for task in changed])
+        create_notification(
+            user_id=user_id,
+            message=f"{result.modified_count} task(s) moved to {status}",
+            notification_type='success'
+        )
+
+    return jsonify({'updated': len(operations), 'results': results})
+
+@app.route('/api/tasks/bulk/delete', methods=['POST'])
+def bulk_delete_tasks():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    user_id = session['user_id']
+    task_ids, error = bulk_items('task_ids')
+    if error:
+        return error
+
+    tasks = owned_tasks_by_id(user_id, task_ids)
+    results = [{'id': task_id, 'status': 'deleted' if isinstance(task_id, str) and task_id in tasks else 'not_found'}
+               for task_id in task_ids]
+
+    if tasks:
+        result = tasks_collection.delete_many({'_id': {'$in': [task['_id'] for task in tasks.values()]},
+                                               'user_id': user_id})
+        if result.deleted_count == len(tasks):
+            update_task_stats(user_id, removed=tasks.values())
+        else:
+            reconcile_task_stats(user_id)
+        delete_attachments({'task_id': {'$in': list(tasks)}})
+        emit_task_event('task_deleted', user_id,
+                        [(task, task_event_fields(task)) for task in tasks.values()])
+        create_notification(
+            user_id=user_id,
+            message=f"{result.deleted_count} task(s) deleted successfully!",
+            notification_type='warning'
+        )
+
+    return jsonify({'deleted': len(tasks), 'results': results})
+
+# Password hashes are computed in a process pool so a burst of logins does not stall the worker.
+# PASSWORD_HASH_METHOD is any Werkzeug method, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000";
+# hashes made with other parameters are replaced on the user's next login.
+app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', 2))  # 0 hashes inline
+app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64))
+
+def build_password_hasher():
+    return PasswordHasher(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING']
+    )
+
+password_hasher = build_password_hasher()
+atexit.register(lambda: password_hasher.shutdown())
+
 @app.route('/register', methods=['GET', 'POST'])
 def register():
     if 'username' in session:
@@ -314,7 +1382,11 @@ def register():
             flash('Password must be at least 8 characters', 'error')
             return redirect(url_for('register'))
 
-        hashed_pw = generate_password_hash(password)
+        try:
+            hashed_pw = password_hasher.hash(password)
+        except HasherBusy:
+            flash('Server is busy, please try again in a moment', 'error')
+            return redirect(url_for('register'))
         result = users_collection.insert_one({
             'username': username,
             'password': hashed_pw
@@ -322,6 +1394,7 @@ def register():
 
         session['username'] = username
         session['user_id'] = str(result.inserted_id)
+        username_cache.set(session['user_id'], username)
         return redirect(url_for('index'))
 
     return render_template('register.html')
@@ -337,9 +1410,22 @@ def login():
         password = request.form.get('password')
 
         user = users_collection.find_one({'username': username})
-        if user and check_password_hash(user['password'], password):
+        try:
+            valid = user is not None and password_hasher.check(user['password'], password)
+        except HasherBusy:
+            flash('Server is busy, please try again in a moment', 'error')
+            return render_template('login.html'), 503
+        if valid:
+            try:
+                if password_hasher.needs_rehash(user['password']):
+                    # Only replaces the hash that was just checked
+                    users_collection.update_one({'_id': user['_id'], 'password': user['password']},
+                                                {'$set': {'password': password_hasher.hash(password)}})
+            except HasherBusy:
+                pass  # Upgraded on a later login
             session['username'] = username
             session['user_id'] = str(user['_id'])
+            username_cache.set(session['user_id'], username)
             return redirect(url_for('index'))
         else:
             flash('Invalid username or password', 'error')  # Error toast
@@ -366,9 +1452,10 @@ def share_task(task_id):
             return jsonify({'error': 'Username is required'}), 400
 
         # Find target user
-        target_user = users_collection.find_one({'username': target_username})
+        target_user = users_collection.find_one({'username': target_username}, {'username': 1})
         if not target_user:
             return jsonify({'error': 'User not found'}), 404
+        username_cache.set(str(target_user['_id']), target_user['username'])
 
         # Verify current user owns the task
         task = tasks_collection.find_one({'_id': ObjectId(task_id), 'user_id': session['user_id']})
@@ -395,11 +1482,16 @@ def share_task(task_id):
             notification_type='success'
         )
 
-        # In your share_task function, replace the socketio.emit call with:
-        socketio.emit('notification', {
+        emit_to_user('notification', {
             'message': f'{session["username"]} shared a task with you: {task["title"]}',
             'type': 'info'
-        }, room=str(target_user['_id']))  # Send to specific user's room
+        }, str(target_user['_id']))  # Send to specific user's room
+        if result.modified_count:
+            # The owner's cached views of the task change along with the recipient's shared list
+            data_versions.bump('tasks', [str(target_user['_id']), session['user_id']])
+            # Same shape as a /tasks/shared row
+            emit_to_user('task_shared', {'tasks': [shared_task_to_api(task, session['username'])]},
+                         str(target_user['_id']))
 
         return jsonify({'message': f'Task shared with {target_username}'})
 
@@ -408,41 +1500,38 @@ def share_task(task_id):
 
 # Get tasks shared with current user
 @app.route('/tasks/shared')
+@cached_per_user('tasks')
 def get_shared_tasks():
     if 'user_id' not in session:
         return redirect(url_for('login'))
 
     # Find tasks where current user is in sharedWith array
-    shared_tasks = tasks_collection.find({
-        'sharedWith': session['user_id']
-    })
+    try:
+        shared_tasks, next_cursor = paginate_tasks({'sharedWith': session['user_id']},
+                                                   request.args.get('cursor'), get_page_size())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    tasks = []
-    for task in shared_tasks:
-        task['id'] = str(task['_id'])
-        # Get owner's username
-        owner = users_collection.find_one({'_id': ObjectId(task['user_id'])})
-        task['owner'] = owner['username'] if owner else 'Unknown'
-        del task['_id']
-        tasks.append(task)
+    # Get all owners' usernames at once
+    owners = get_usernames(task['user_id'] for task in shared_tasks)
 
-    return jsonify(tasks)
+    tasks = [shared_task_to_api(task, owners.get(task['user_id'], 'Unknown')) for task in shared_tasks]
+    response = jsonify(tasks)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 
 # Get user notifications
 @app.route('/notifications')
+@cached_per_user('notifications')
 def get_notifications():
     if 'user_id' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
 
     notifications = list(notifications_collection.find({
         'user_id': session['user_id']
-    }).sort('created_at', -1).limit(20))  # Last 20 notifications
-
-    # Convert ObjectId to string
-    for note in notifications:
-        note['_id'] = str(note['_id'])
-        note['created_at'] = note['created_at'].strftime('%Y-%m-%d %H:%M')
+    }, NOTIFICATION_PROJECTION).sort('created_at', -1).limit(20))  # Last 20 notifications
 
     return jsonify(notifications)
 
@@ -455,9 +1544,13 @@ def mark_notification_read(note_id):
 
     try:
         result = notifications_collection.update_one(
-            {'_id': ObjectId(note_id), 'user_id': session['user_id']},
-            {'$set': {'is_read': True}}
+            {'_id': ObjectId(note_id), 'user_id': session['user_id'], 'is_read': False},
+            {'$set': read_notification_fields()}
         )
+        if result.modified_count:
+            update_unread_count(session['user_id'], -1)
+            data_versions.bump('notifications', [session['user_id']])
+            emit_to_user('notification_read', {'_id': note_id}, session['user_id'])
 
         return jsonify({'success': result.modified_count > 0})
     except Exception as e:
@@ -465,63 +1558,51 @@ def mark_notification_read(note_id):
 
 # Add this new endpoint for getting all notifications
 @app.route('/notifications/all')
+@cached_per_user('notifications')
 def get_all_notifications():
     if 'user_id' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
 
     notifications = list(notifications_collection.find({
         'user_id': session['user_id']
-    }).sort('created_at', -1).limit(50))  # Increased to 50
-
-    # Convert ObjectId to string and format date
-    for note in notifications:
-        note['_id'] = str(note['_id'])
-        if isinstance(note['created_at'], datetime):
-            note['created_at'] = note['created_at'].strftime('%Y-%m-%d %H:%M')
+    }, NOTIFICATION_PROJECTION).sort('created_at', -1).limit(50))  # Increased to 50
 
     return jsonify(notifications)
+
+# Badge count, kept up to date with $inc instead of counting notifications
+@app.route('/notifications/unread_count')
+@cached_per_user('notifications')
+def unread_notification_count():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    return jsonify({'count': get_unread_count(session['user_id'])})
 @socketio.on('join')
 def handle_join(data):
     if 'user_id' in session and data.get('userId') == session['user_id']:
         join_room(session['user_id'])
+        socketio_emits.inc('joined')
         emit('joined', {'message': f'Joined room for user {session["user_id"]}'})
 
 
 # Analytics routes
 @app.route('/analytics/overview')
+@cached_per_user('tasks')
 def analytics_overview():
     if 'user_id' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
 
     user_id = session['user_id']
 
-    # Get basic stats with proper date comparison for overdue tasks
-    total_tasks = tasks_collection.count_documents({'user_id': user_id})
-    completed_tasks = tasks_collection.count_documents({
-        'user_id': user_id,
-        'status': 'Completed'
-    })
-    pending_tasks = tasks_collection.count_documents({
-        'user_id': user_id,
-        'status': 'Pending'
-    })
-    in_progress_tasks = tasks_collection.count_documents({
-        'user_id': user_id,
-        'status': 'In Progress'
-    })
-
-    # Calculate overdue tasks (deadline passed but not completed) - FIXED
-    today = datetime.utcnow().date()
-    overdue_tasks = tasks_collection.count_documents({
-        'user_id': user_id,
-        'deadline': {'$lt': today.isoformat()},
-        'status': {'$nin': ['Completed']}  # Exclude completed tasks
-    })
+    # Get basic stats and overdue tasks from the user's stats document
+    summary = get_status_summary(user_id)
+    total_tasks = summary['total']
+    completed_tasks = summary['Completed']
+    pending_tasks = summary['Pending']
+    in_progress_tasks = summary['In Progress']
+    overdue_tasks = summary['overdue']
 
-    # Calculate completion rate
-    completion_rate = 0
-    if total_tasks > 0:
-        completion_rate = round((completed_tasks / total_tasks) * 100, 2)
+    completion_rate = summary['completion_rate']
 
     return jsonify({
         'total_tasks': total_tasks,
@@ -532,92 +1613,78 @@ def analytics_overview():
         'completion_rate': completion_rate
     })
 
+# Named ranges for the trends chart, in days; ?start=&end= (YYYY-MM-DD) select any other range
+TREND_TIMEFRAMES = {'weekly': 7, 'monthly': 30, 'quarterly': 90, 'yearly': 365}
+MAX_TREND_DAYS = 731
+
+def trend_range():
+    """Return the (start, end) dates requested for trends, raises ValueError"""
+    today = datetime.utcnow().date()
+    end = request.args.get('end')
+    end_date = datetime.strptime(end, '%Y-%m-%d').date() if end else today
+    start = request.args.get('start')
+    if start:
+        start_date = datetime.strptime(start, '%Y-%m-%d').date()
+    else:
+        days = TREND_TIMEFRAMES.get(request.args.get('timeframe', 'weekly'), TREND_TIMEFRAMES['monthly'])
+        start_date = end_date - timedelta(days=days - 1)
+    if start_date > end_date:
+        raise ValueError('start must not be after end')
+    if (end_date - start_date).days >= MAX_TREND_DAYS:
+        raise ValueError(f'At most {MAX_TREND_DAYS} days per request')
+    return start_date, end_date
+
 @app.route('/analytics/trends')
+@cached_per_user('tasks')
 def analytics_trends():
     if 'user_id' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
 
     user_id = session['user_id']
     timeframe = request.args.get('timeframe', 'weekly')
+    try:
+        start_date, end_date = trend_range()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    # Calculate start date based on timeframe
-    if timeframe == 'weekly':
-        start_date = datetime.utcnow() - timedelta(days=7)
-    else:  # monthly
-        start_date = datetime.utcnow() - timedelta(days=30)
-
-    # Get completion trends - FIXED aggregation
-    pipeline = [
-        {
-            '$match': {
-                'user_id': user_id,
-                'created_at': {'$gte': start_date}
-            }
-        },
-        {
-            '$group': {
-                '_id': {
-                    'year': {'$year': '$created_at'},
-                    'month': {'$month': '$created_at'},
-                    'day': {'$dayOfMonth': '$created_at'}
-                },
-                'date': {'$first': '$created_at'},
-                'tasks_created': {'$sum': 1},
-                'tasks_completed': {
-                    '$sum': {
-                        '$cond': [
-                            {'$eq': ['$status', 'Completed']},
-                            1,
-                            0
-                        ]
-                    }
-                }
-            }
-        },
-        {'$sort': {'date': 1}}  # Sort by date for proper ordering
-    ]
-
-    trends_data = list(tasks_collection.aggregate(pipeline))
+    # One small rollup document per active day, read as a range of the _id index
+    rollups = task_rollups_collection.find(
+        {'_id': {'$gte': f'{user_id}:{start_date.isoformat()}', '$lte': f'{user_id}:{end_date.isoformat()}'}},
+        {'date': 1, 'created': 1, 'completed': 1, 'transitions': 1}
+    ).sort('_id', 1)
 
-    # Format the response with proper date handling
     trends = []
-    for data in trends_data:
-        date_str = data['date'].strftime('%Y-%m-%d')
+    for data in rollups:
         trends.append({
-            'date': date_str,
-            'tasks_created': data['tasks_created'],
-            'tasks_completed': data['tasks_completed']
+            'date': data['date'],
+            'tasks_created': data.get('created', 0),
+            'tasks_completed': data.get('completed', 0),
+            'transitions': data.get('transitions', {})
         })
 
     return jsonify({
         'timeframe': timeframe,
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
         'trends': trends
     })
 @app.route('/analytics/status-distribution')
+@cached_per_user('tasks')
 def status_distribution():
     if 'user_id' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
 
     user_id = session['user_id']
 
-    pipeline = [
-        {'$match': {'user_id': user_id}},
-        {'$group': {
-            '_id': '$status',
-            'count': {'$sum': 1}
-        }}
-    ]
-
-    status_data = list(tasks_collection.aggregate(pipeline))
-
-    distribution = {}
-    for data in status_data:
-        distribution[data['_id']] = data['count']
+    distribution = get_status_summary(user_id)['by_status']
 
     return jsonify(distribution)
 
 
 # Attachment routes
+# API responses never include the internal ids of an attachment record
+ATTACHMENT_API_PROJECTION = {'_id': 0, 'task_id': 0, 'owner_id': 0}
+
 @app.route('/tasks/<task_id>/attachments', methods=['POST'])
 def upload_attachment(task_id):
     if 'user_id' not in session:
@@ -626,7 +1693,7 @@ def upload_attachment(task_id):
     user_id = session['user_id']
 
     # Check if task exists and belongs to user
-    task = tasks_collection.find_one({'_id': ObjectId(task_id), 'user_id': user_id})
+    task = tasks_collection.find_one({'_id': ObjectId(task_id), 'user_id': user_id}, {'title': 1})
     if not task:
         return jsonify({'error': 'Task not found or unauthorized'}), 404
 
@@ -645,32 +1712,25 @@ def upload_attachment(task_id):
         try:
             filename = secure_filename(file.filename)
 
-            # Create user-specific directory
-            user_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], user_id)
-            os.makedirs(user_upload_dir, exist_ok=True)
-
             # Generate unique filename to prevent overwrites
             base, ext = os.path.splitext(filename)
-            unique_filename = f"{base}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}{ext}"
-            filepath = os.path.join(user_upload_dir, unique_filename)
+            unique_filename = f"{base}_{ObjectId()}{ext}"
 
-            # Save file
-            file.save(filepath)
+            # Hash and store the file, identical files are only kept once
+            digest, size = attachment_store.save(file.stream)
 
             # Create attachment record
             attachment = {
+                'task_id': task_id,
+                'owner_id': user_id,
                 'filename': unique_filename,
                 'original_name': filename,
                 'uploaded_at': datetime.utcnow(),
-                'size': os.path.getsize(filepath),
-                'mimetype': file.mimetype
+                'size': size,
+                'mimetype': file.mimetype,
+                'blob': digest
             }
-
-            # Update task with attachment
-            tasks_collection.update_one(
-                {'_id': ObjectId(task_id)},
-                {'$push': {'attachments': attachment}}
-            )
+            attachments_collection.insert_one(attachment)
 
             # Create notification
             create_notification(
@@ -681,7 +1741,8 @@ def upload_attachment(task_id):
 
             return jsonify({
                 'message': 'File uploaded successfully',
-                'attachment': attachment
+                'attachment': {key: value for key, value in attachment.items()
+                               if key not in ATTACHMENT_API_PROJECTION}
             })
 
         except Exception as e:
@@ -697,13 +1758,10 @@ def get_task_attachments(task_id):
 
     user_id = session['user_id']
 
-    # Check if task exists and belongs to user
-    task = tasks_collection.find_one({'_id': ObjectId(task_id), 'user_id': user_id})
-    if not task:
-        return jsonify({'error': 'Task not found or unauthorized'}), 404
-
-    # Return attachments or empty array
-    attachments = task.get('attachments', [])
+    # Only the owner's attachment records match, so no separate task lookup is needed
+    attachments = list(attachments_collection.find(
+        {'task_id': task_id, 'owner_id': user_id}, ATTACHMENT_API_PROJECTION
+    ).sort('uploaded_at', 1))
     return jsonify(attachments)
 
 
@@ -714,34 +1772,13 @@ def download_attachment(task_id, filename):
 
     user_id = session['user_id']
 
-    # Check if task exists and belongs to user
-    task = tasks_collection.find_one({'_id': ObjectId(task_id), 'user_id': user_id})
-    if not task:
-        return jsonify({'error': 'Task not found or unauthorized'}), 404
-
-    # Check if attachment exists
-    attachment = None
-    for att in task.get('attachments', []):
-        if att['filename'] == filename:
-            attachment = att
-            break
-
+    # Check if attachment exists on a task that belongs to user
+    attachment = attachments_collection.find_one({'task_id': task_id, 'filename': filename, 'owner_id': user_id})
     if not attachment:
         return jsonify({'error': 'Attachment not found'}), 404
 
-    # Build file path
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], user_id, filename)
-
-    # Check if file exists
-    if not os.path.isfile(file_path):
-        return jsonify({'error': 'File not found on server'}), 404
-
     # Send file
-    return send_file(
-        file_path,
-        as_attachment=True,
-        download_name=attachment['original_name']
-    )
+    return send_attachment(user_id, attachment)
 
 
 @app.route('/shared/tasks/<task_id>/attachments', methods=['GET'])
@@ -755,13 +1792,14 @@ def get_shared_task_attachments(task_id):
     task = tasks_collection.find_one({
         '_id': ObjectId(task_id),
         'sharedWith': user_id
-    })
+    }, {'_id': 1})
 
     if not task:
         return jsonify({'error': 'Task not found or not shared with you'}), 404
 
-    # Return attachments or empty array
-    attachments = task.get('attachments', [])
+    attachments = list(attachments_collection.find(
+        {'task_id': task_id}, ATTACHMENT_API_PROJECTION
+    ).sort('uploaded_at', 1))
     return jsonify(attachments)
 
 
@@ -776,35 +1814,18 @@ def download_shared_attachment(task_id, filename):
     task = tasks_collection.find_one({
         '_id': ObjectId(task_id),
         'sharedWith': user_id
-    })
+    }, {'user_id': 1})
 
     if not task:
         return jsonify({'error': 'Task not found or not shared with you'}), 404
 
     # Check if attachment exists
-    attachment = None
-    for att in task.get('attachments', []):
-        if att['filename'] == filename:
-            attachment = att
-            break
-
+    attachment = attachments_collection.find_one({'task_id': task_id, 'filename': filename})
     if not attachment:
         return jsonify({'error': 'Attachment not found'}), 404
 
-    # Build file path (file is stored in owner's directory)
-    owner_id = task['user_id']
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], owner_id, filename)
-
-    # Check if file exists
-    if not os.path.isfile(file_path):
-        return jsonify({'error': 'File not found on server'}), 404
-
-    # Send file
-    return send_file(
-        file_path,
-        as_attachment=True,
-        download_name=attachment['original_name']
-    )
+    # Send file (legacy files are stored in owner's directory)
+    return send_attachment(task['user_id'], attachment)
 
 @app.route('/tasks/<task_id>/attachments/<filename>', methods=['DELETE'])
 def delete_attachment(task_id, filename):
@@ -813,29 +1834,26 @@ def delete_attachment(task_id, filename):
 
     user_id = session['user_id']
 
-    # Check if task exists and belongs to user
-    task = tasks_collection.find_one({'_id': ObjectId(task_id), 'user_id': user_id})
-    if not task:
-        return jsonify({'error': 'Task not found or unauthorized'}), 404
-
-    # Remove attachment from database
-    result = tasks_collection.update_one(
-        {'_id': ObjectId(task_id)},
-        {'$pull': {'attachments': {'filename': filename}}}
+    # Remove attachment from database, only if it is on one of the user's tasks
+    attachment = attachments_collection.find_one_and_delete(
+        {'task_id': task_id, 'filename': filename, 'owner_id': user_id}
     )
-
-    if result.modified_count == 0:
+    if not attachment:
         return jsonify({'error': 'Attachment not found'}), 404
 
-    # Delete physical file
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], user_id, filename)
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    # Delete physical file, shared blobs are only removed with their last reference
+    if attachment.get('blob'):
+        attachment_store.release(attachment['blob'])
+    else:
+        file_path = os.path.join(app.config['UPLOAD_FOLDER'], user_id, filename)
+        if os.path.exists(file_path):
+            os.remove(file_path)
 
     # Create notification
+    task = tasks_collection.find_one({'_id': ObjectId(task_id)}, {'title': 1})
     create_notification(
         user_id=user_id,
-        message=f"Attachment deleted from task '{task['title']}'",
+        message=f"Attachment deleted from task '{task['title'] if task else ''}'",
         notification_type='warning'
     )
 
@@ -851,10 +1869,13 @@ def mark_all_notifications_read():
         # Update all unread notifications for this user
         result = notifications_collection.update_many(
             {'user_id': session['user_id'], 'is_read': False},
-            {'$set': {'is_read': True}}
+            {'$set': read_notification_fields()}
         )
-        # Emit a real-time event to refresh the UI for this user
-        socketio.emit('notifications_updated', {'user_id': session['user_id']}, room=session['user_id'])
+        if result.modified_count:
+            update_unread_count(session['user_id'], -result.modified_count)
+            data_versions.bump('notifications', [session['user_id']])
+        # Other open tabs mark their copies as read
+        emit_to_user('notifications_read_all', {}, session['user_id'])
 
         return jsonify({'message': f'Marked {result.modified_count} notifications as read', 'modified_count': result.modified_count})
 
@@ -868,12 +1889,16 @@ def delete_all_notifications():
         return jsonify({'error': 'Not authenticated'}), 401
 
     try:
-        # Delete all notifications for this user
-        result = notifications_collection.delete_many({'user_id': session['user_id']})
-        # Emit a real-time event to refresh the UI for this user
-        socketio.emit('notifications_updated', {'user_id': session['user_id']}, room=session['user_id'])
+        # Delete all notifications for this user, unread ones first to keep the counter exact
+        unread = notifications_collection.delete_many({'user_id': session['user_id'], 'is_read': False}).deleted_count
+        deleted_count = unread + notifications_collection.delete_many({'user_id': session['user_id']}).deleted_count
+        if unread:
+            update_unread_count(session['user_id'], -unread)
+        # After the counter, a request between the two must not cache the old count under the new version
+        data_versions.bump('notifications', [session['user_id']])
+        emit_to_user('notifications_cleared', {}, session['user_id'])
 
-        return jsonify({'message': f'Deleted {result.deleted_count} notifications', 'deleted_count': result.deleted_count})
+        return jsonify({'message': f'Deleted {deleted_count} notifications', 'deleted_count': deleted_count})
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -886,12 +1911,17 @@ def delete_single_notification(note_id):
 
     try:
         # Delete the notification if it belongs to the current user
-        result = notifications_collection.delete_one({'_id': ObjectId(note_id), 'user_id': session['user_id']})
-        if result.deleted_count == 0:
+        note = notifications_collection.find_one_and_delete(
+            {'_id': ObjectId(note_id), 'user_id': session['user_id']},
+            projection={'is_read': 1}
+        )
+        if note is None:
             return jsonify({'error': 'Notification not found or unauthorized'}), 404
+        if not note.get('is_read'):
+            update_unread_count(session['user_id'], -1)
+        data_versions.bump('notifications', [session['user_id']])
 
-        # Emit a real-time event to refresh the UI for this user
-        socketio.emit('notifications_updated', {'user_id': session['user_id']}, room=session['user_id'])
+        emit_to_user('notification_deleted', {'_id': note_id}, session['user_id'])
 
         return jsonify({'message': 'Notification deleted successfully'})
 
@@ -906,23 +1936,25 @@ def remove_shared_task(task_id):
     user_id = session['user_id']
 
     try:
-        # Remove current user from the sharedWith array of the task
-        result = tasks_collection.update_one(
-            {'_id': ObjectId(task_id)},
-            {'$pull': {'sharedWith': user_id}}
+        # Remove current user from the sharedWith array of the task, returning what the
+        # owner's notification needs in the same round trip
+        task = tasks_collection.find_one_and_update(
+            {'_id': ObjectId(task_id), 'sharedWith': user_id},
+            {'$pull': {'sharedWith': user_id}},
+            projection={'user_id': 1, 'title': 1}
         )
 
-        if result.modified_count == 0:
+        if not task:
             return jsonify({'error': 'Task not found or not shared with you'}), 404
+        data_versions.bump('tasks', [user_id, task['user_id']])
+        emit_to_user('task_unshared', {'tasks': [{'_id': task_id}]}, user_id)
 
-        # Create notification for the task owner (optional)
-        task = tasks_collection.find_one({'_id': ObjectId(task_id)})
-        if task:
-            create_notification(
-                user_id=task['user_id'],
-                message=f"{session['username']} removed your shared task '{task['title']}' from their list",
-                notification_type='info'
-            )
+        # Notify the task owner
+        create_notification(
+            user_id=task['user_id'],
+            message=f"{session['username']} removed your shared task '{task['title']}' from their list",
+            notification_type='info'
+        )
 
         return jsonify({'message': 'Task removed from your shared list'})
 
@@ -937,20 +1969,188 @@ def delete_account():
     password = request.form['password']
 
     user = users_collection.find_one({'_id': ObjectId(user_id)})
+    try:
+        valid = user is not None and password_hasher.check(user['password'], password)
+    except HasherBusy:
+        return jsonify({'error': 'Server is busy, please try again in a moment'}), 503
 
-    if user and check_password_hash(user['password'], password):
+    if valid:
         users_collection.delete_one({'_id': ObjectId(user_id)})
+        delete_attachments({'owner_id': user_id})
+        # Users the tasks were shared with must see them go, like a deleted task
+        shared_tasks = list(tasks_collection.find({'user_id': user_id, 'sharedWith.0': {'$exists': True}},
+                                                  {'user_id': 1, 'sharedWith': 1}))
         tasks_collection.delete_many({'user_id': user_id})
+        if shared_tasks:
+            emit_task_event('task_deleted', user_id, [(task, task_event_fields(task)) for task in shared_tasks])
+        user_stats_collection.delete_one({'_id': user_id})
+        # Anchored prefix match, served by the _id index
+        task_rollups_collection.delete_many({'_id': {'$regex': f'^{user_id}:'}})
+        username_cache.discard(user_id)
         session.clear()
         return jsonify({'message': 'Your account has been permanently deleted'}), 200
     else:
         return jsonify({'error': 'Wrong password. Your account was not deleted'}), 400
 
-# Update your Socket.IO initialization
-socketio = SocketIO(app,
-                   cors_allowed_origins="*",
-                   async_mode='threading',
-                   logger=True,
-                   engineio_logger=False)
+@app.cli.command('reconcile-stats')
+@click.option('--user', 'user_id', default=None, help='Only rebuild stats for this user id')
+def reconcile_stats_command(user_id):
+    """Rebuild per-user task stats and unread notification counts"""
+    user_ids = [user_id] if user_id else [str(user['_id']) for user in users_collection.find({}, {'_id': 1})]
+    for uid in user_ids:
+        reconcile_task_stats(uid)
+        reconcile_unread_count(uid)
+    click.echo(f"Reconciled task stats and unread counts for {len(user_ids)} user(s)")
+
+@app.cli.command('backfill-rollups')
+@click.option('--user', 'user_id', default=None, help='Only backfill this user id')
+@click.option('--batch-size', default=1000, show_default=True)
+def backfill_rollups_command(user_id, batch_size):
+    """Rebuild the daily created and completed counts used by analytics trends
+
+    Completed tasks from before completed_at was recorded count on the day they were created.
+    Status transitions cannot be rebuilt and are left as they are.
+    """
+    match = {'user_id': user_id} if user_id else {}
+    counts = {}
+    for field, query, date_field in [
+        ('created', match, '$created_at'),
+        ('completed', {**match, 'status': 'Completed'}, {'$ifNull': ['$completed_at', '$created_at']}),
+    ]:
+        pipeline = [
+            {'$match': query},
+            {'$group': {
+                '_id': {'user_id': '$user_id',
+                        'date': {'$dateToString': {'format': '%Y-%m-%d', 'date': date_field}}},
+                'count': {'$sum': 1}
+            }}
+        ]
+        for data in tasks_collection.aggregate(pipeline):
+            if not data['_id'].get('date'):
+                continue
+            key = (data['_id']['user_id'], data['_id']['date'])
+            counts.setdefault(key, {'created': 0, 'completed': 0})[field] = data['count']
+
+    batch = []
+    written = 0
+    for (uid, day), day_counts in counts.items():
+        batch.append(UpdateOne({'_id': f'{uid}:{day}'},
+                               {'$set': {'user_id': uid, 'date': day, **day_counts}}, upsert=True))
+        if len(batch) >= batch_size:
+            task_rollups_collection.bulk_write(batch, ordered=False)
+            written += len(batch)
+            batch = []
+    if batch:
+        task_rollups_collection.bulk_write(batch, ordered=False)
+        written += len(batch)
+    click.echo(f"Backfilled {written} daily rollup(s)")
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Write precompressed variants of the static CSS and JS files"""
+    written = build_precompressed(app.static_folder)
+    encodings = ', '.join(encoding for encoding, _ in available_encodings())
+    click.echo(f"Wrote {len(written)} precompressed file(s) ({encodings})")
+
+@app.cli.command('reindex-search')
+@click.option('--batch-size', default=1000, show_default=True)
+def reindex_search_command(batch_size):
+    """Build search fields for tasks created before search indexing or indexed without title_words"""
+    updated = 0
+    batch = []
+    for task in tasks_collection.find({'title_words': {'$exists': False}},
+                                      {'title': 1, 'description': 1}).batch_size(batch_size):
+        batch.append(UpdateOne(
+            {'_id': task['_id']},
+            {'$set': search_fields(task.get('title'), task.get('description'))}
+        ))
+        if len(batch) >= batch_size:
+            updated += tasks_collection.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += tasks_collection.bulk_write(batch, ordered=False).modified_count
+    click.echo(f"Indexed {updated} task(s) for search")
+
+@app.cli.command('prune-notifications')
+def prune_notifications_command():
+    """Apply the notification retention policy to every user"""
+    removed = 0
+    if app.config['NOTIFICATION_ARCHIVE_ENABLED']:
+        # The TTL index only expires notifications when archiving is off
+        cutoff = datetime.utcnow() - timedelta(days=app.config['NOTIFICATION_READ_TTL_DAYS'])
+        removed += remove_notifications({'is_read': True, 'read_at': {'$lt': cutoff}})
+    removed += enforce_notification_cap(notifications_collection.distinct('user_id'))
+    action = 'Archived' if app.config['NOTIFICATION_ARCHIVE_ENABLED'] else 'Deleted'
+    click.echo(f"{action} {removed} notification(s)")
+
+@app.cli.command('migrate-attachments')
+@click.option('--batch-size', default=500, show_default=True)
+def migrate_attachments_command(batch_size):
+    """Move attachments embedded in tasks into the attachments collection"""
+    # The unique (task_id, filename) index makes re-running after an interruption safe
+    ensure_indexes(db)
+    moved = 0
+    while True:
+        tasks = list(tasks_collection.find({'attachments.0': {'$exists': True}},
+                                           {'user_id': 1, 'attachments': 1}).limit(batch_size))
+        if not tasks:
+            break
+        records = [{**attachment, 'task_id': str(task['_id']), 'owner_id': task['user_id']}
+                   for task in tasks for attachment in task['attachments']]
+        try:
+            moved += len(attachments_collection.insert_many(records, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            if any(error['code'] != 11000 for error in e.details['writeErrors']):
+                raise
+            moved += e.details['nInserted']
+        tasks_collection.update_many({'_id': {'$in': [task['_id'] for task in tasks]}},
+                                     {'$unset': {'attachments': ''}})
+    tasks_collection.update_many({'attachments': {'$size': 0}}, {'$unset': {'attachments': ''}})
+    click.echo(f"Moved {moved} attachment(s)")
+
+@app.cli.command('ensure-indexes')
+def ensure_indexes_command():
+    """Create the indexes declared in indexes.py"""
+    for collection_name, names in ensure_indexes(db).items():
+        click.echo(f"{collection_name}: {', '.join(names)}")
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Explain every query shape and fail if any of them uses a COLLSCAN"""
+    collscans = find_collscans(db)
+    for collection_name, query, sort in collscans:
+        click.echo(f"COLLSCAN on {collection_name}: filter={query} sort={sort}")
+    if collscans:
+        raise SystemExit(1)
+    click.echo("All query shapes use an index")
+
+# Socket.IO is set up when the module is imported, these can only come from the environment
+IMPORT_TIME_SETTINGS = ('SOCKETIO_ASYNC_MODE', 'SOCKETIO_MESSAGE_QUEUE', 'SOCKETIO_CHANNEL')
+
+def create_app(config=None):
+    """Application factory, e.g. gunicorn "app:create_app()"
+
+    Routes and extensions are registered on the module's app at import, configured from the
+    environment. config is applied over those settings and everything built from them is
+    rebuilt: the MongoDB client and query tracker, the caches, data versions, notification
+    queue, password hasher and attachment store. Socket.IO settings raise ValueError.
+    """
+    global username_cache, data_versions, response_cache, notification_queue, password_hasher, attachment_store
+    config = config or {}
+    fixed = [key for key in IMPORT_TIME_SETTINGS if key in config and config[key] != app.config.get(key)]
+    if fixed:
+        raise ValueError(f"{', '.join(fixed)} can only be set in the environment")
+    app.config.update(config)
+    configure_mongo()
+    username_cache = build_username_cache()
+    data_versions = build_data_versions()
+    response_cache = build_response_cache()
+    notification_queue.stop()
+    notification_queue = build_notification_queue()
+    password_hasher.shutdown()
+    password_hasher = build_password_hasher()
+    attachment_store = build_attachment_store()
+    return app
+
 if __name__ == '__main__':
-    socketio.run(app, debug=True, allow_unsafe_werkzeug=True)
+    socketio.run(create_app(), debug=True, allow_unsafe_werkzeug=True)
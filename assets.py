@@ -0,0 +1,63 @@
+import gzip
+import hashlib
+import os
+
+try:
+    import brotli
+except ImportError:  # Optional, without it only gzip is used
+    brotli = None
+
+
+# Encodings in order of preference, with the suffix of their precompressed files
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt')
+
+_digests = {}
+
+
+def file_digest(path):
+    """Short content hash of a file, recomputed only when its mtime changes"""
+    mtime = os.path.getmtime(path)
+    cached = _digests.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            cached = (mtime, hashlib.sha256(f.read()).hexdigest()[:12])
+        _digests[path] = cached
+    return cached[1]
+
+
+def compress(data, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if level is None else level)
+    return gzip.compress(data, compresslevel=9 if level is None else level)
+
+
+def available_encodings():
+    return [(encoding, suffix) for encoding, suffix in ENCODINGS if encoding != 'br' or brotli is not None]
+
+
+def precompressed_variant(path, accept_encodings):
+    """Return (encoding, path) of the best up-to-date precompressed file the client accepts"""
+    for encoding, suffix in available_encodings():
+        variant = path + suffix
+        if (accept_encodings[encoding] and os.path.isfile(variant)
+                and os.path.getmtime(variant) >= os.path.getmtime(path)):
+            return encoding, variant
+    return None, path
+
+
+def build_precompressed(root):
+    """Write .gz (and .br) next to every compressible file under root, returns the files written"""
+    written = []
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(directory, filename)
+            with open(path, 'rb') as f:
+                data = f.read()
+            for encoding, suffix in available_encodings():
+                with open(path + suffix, 'wb') as f:
+                    f.write(compress(data, encoding))
+                written.append(path + suffix)
+    return written
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import tempfile
+import uuid
+from datetime import datetime
+
+from pymongo import ReturnDocument
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class AttachmentStore:
+    """Content-addressed file store, each distinct file is kept once under its SHA-256.
+
+    Blob documents ({_id: sha256, size, refcount}) count how many attachment
+    records point at a file; the file is removed when the last one is released.
+    """
+
+    def __init__(self, root, blobs_collection):
+        self.root = root
+        self.blobs_collection = blobs_collection
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def save(self, stream):
+        """Write stream to the store while hashing it, returns (digest, size)"""
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        sha256 = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    sha256.update(chunk)
+                    tmp_file.write(chunk)
+                    size += len(chunk)
+            digest = sha256.hexdigest()
+
+            self.blobs_collection.update_one(
+                {'_id': digest},
+                {'$inc': {'refcount': 1}, '$setOnInsert': {'size': size, 'created_at': datetime.utcnow()}},
+                upsert=True
+            )
+            # Always put the file in place, even over an existing copy with the same content:
+            # a release() that saw the last reference go may be deleting that copy right now
+            path = self.path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest, size
+
+    def release(self, digest):
+        """Drop one reference to a blob and delete the file once nothing refers to it"""
+        blob = self.blobs_collection.find_one_and_update(
+            {'_id': digest},
+            {'$inc': {'refcount': -1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if blob is None or blob['refcount'] > 0:
+            return
+        if not self.blobs_collection.delete_one({'_id': digest, 'refcount': {'$lte': 0}}).deleted_count:
+            return
+        # Move the file aside before deleting it, and put it back if a save() of the same
+        # content recreated the blob meanwhile; a save() after the check writes its own copy
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        doomed = os.path.join(tmp_dir, f'{digest}.{uuid.uuid4().hex}.deleted')
+        try:
+            os.replace(self.path(digest), doomed)
+        except FileNotFoundError:
+            return
+        if self.blobs_collection.find_one({'_id': digest}, {'_id': 1}) is None:
+            os.remove(doomed)
+        else:
+            os.replace(doomed, self.path(digest))
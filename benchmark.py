@@ -0,0 +1,341 @@
+"""Seed a database and report throughput and latency percentiles per endpoint.
+
+Seeds users x tasks x notifications x shared tasks (plus one attachment per user), then
+drives the dashboard, task, notification, analytics and attachment routes either through
+the Flask test client or over HTTP against the app served on a local port, e.g.
+python benchmark.py --mongomock --users 20 --tasks 500 --driver http --concurrency 8
+Uses MONGO_URI like the app unless --mongomock is given. Seeded users are named
+bench_<n> and removed at the end unless --keep is given.
+"""
+import argparse
+import http.cookiejar
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import datetime, timedelta
+
+
+STATUSES = ['Pending', 'In Progress', 'Completed']
+WORDS = ['report', 'budget', 'review', 'deploy', 'invoice', 'meeting', 'design', 'release',
+         'customer', 'backup', 'migration', 'planning', 'audit', 'roadmap', 'hiring']
+PASSWORD = 'benchmark-password'
+
+# (name, method, path) in the order they run, paths are filled in per user
+ENDPOINTS = [
+    ('index', 'GET', '/'),
+    ('index_search', 'GET', '/?search={word}'),
+    ('api_tasks', 'GET', '/api/tasks'),
+    ('api_task', 'GET', '/api/tasks/{task_id}'),
+    ('tasks_shared', 'GET', '/tasks/shared'),
+    ('notifications', 'GET', '/notifications'),
+    ('notifications_all', 'GET', '/notifications/all'),
+    ('unread_count', 'GET', '/notifications/unread_count'),
+    ('analytics_overview', 'GET', '/analytics/overview'),
+    ('analytics_trends', 'GET', '/analytics/trends?timeframe=monthly'),
+    ('status_distribution', 'GET', '/analytics/status-distribution'),
+    ('attachment_upload', 'POST', '/tasks/{task_id}/attachments'),
+    ('attachment_download', 'GET', '/tasks/{task_id}/attachments/{filename}'),
+]
+
+
+def load_app(use_mongomock):
+    if use_mongomock:
+        import mongomock
+        import pymongo
+
+        class MongomockClient(mongomock.MongoClient):
+            # In memory whatever MONGO_URI and connection options the app passes
+            def __init__(self, *args, **kwargs):
+                super().__init__()
+
+        pymongo.MongoClient = MongomockClient
+
+        # mongomock edits the projection while it reads, the app's are shared between threads
+        find = mongomock.collection.Collection.find
+
+        def find_with_own_projection(self, filter=None, projection=None, *args, **kwargs):
+            if isinstance(projection, dict):
+                projection = dict(projection)
+            return find(self, filter, projection, *args, **kwargs)
+
+        mongomock.collection.Collection.find = find_with_own_projection
+    import app as appmod
+    appmod.app.config['WTF_CSRF_ENABLED'] = False
+    if not appmod.app.secret_key:
+        appmod.app.secret_key = os.urandom(16).hex()
+    return appmod
+
+
+def seed(appmod, args, rng):
+    """Insert the benchmark data, returns one dict per user with the ids the endpoints need"""
+    password_hash = appmod.password_hasher.hash(PASSWORD)
+    now = datetime.utcnow()
+    users = []
+    for n in range(args.users):
+        username = f'bench_{n}'
+        user_id = str(appmod.users_collection.insert_one(
+            {'username': username, 'password': password_hash}).inserted_id)
+        users.append({'username': username, 'user_id': user_id})
+
+    for user in users:
+        tasks = []
+        for i in range(args.tasks):
+            title = f'{rng.choice(WORDS)} {rng.choice(WORDS)} {i}'
+            description = ' '.join(rng.choice(WORDS) for _ in range(12))
+            task = appmod.new_task(user['user_id'], title, description,
+                                   (now + timedelta(days=rng.randint(-30, 60))).strftime('%Y-%m-%d'))
+            task['created_at'] = now - timedelta(days=rng.randint(0, 120), minutes=rng.randint(0, 1440))
+            task['status'] = rng.choice(STATUSES)
+            if task['status'] == 'Completed':
+                task['completed_at'] = task['created_at'] + timedelta(days=rng.randint(0, 10))
+            tasks.append(task)
+        if tasks:
+            appmod.tasks_collection.insert_many(tasks)
+        user['task_ids'] = [str(task['_id']) for task in tasks]
+
+        notifications = [{
+            'user_id': user['user_id'],
+            'message': f'Notification {i}',
+            'type': rng.choice(['info', 'success', 'warning', 'danger']),
+            'is_read': rng.random() < 0.7,
+            'created_at': now - timedelta(minutes=i),
+            'related_task': None
+        } for i in range(args.notifications)]
+        if notifications:
+            appmod.notifications_collection.insert_many(notifications)
+
+    # Each user shares some of their tasks with the next user
+    for n, user in enumerate(users):
+        if len(users) > 1 and user['task_ids']:
+            shared_ids = [appmod.ObjectId(task_id) for task_id in user['task_ids'][:args.shared]]
+            appmod.tasks_collection.update_many({'_id': {'$in': shared_ids}},
+                                                {'$addToSet': {'sharedWith': users[(n + 1) % len(users)]['user_id']}})
+
+    for user in users:
+        user['filename'] = None
+        if user['task_ids']:
+            digest, size = appmod.attachment_store.save(io.BytesIO(attachment_content(rng, args.attachment_size)))
+            user['filename'] = f'seed_{uuid.uuid4().hex}.txt'
+            appmod.attachments_collection.insert_one({
+                'task_id': user['task_ids'][0], 'owner_id': user['user_id'], 'filename': user['filename'],
+                'original_name': 'seed.txt', 'uploaded_at': now, 'size': size, 'mimetype': 'text/plain',
+                'blob': digest
+            })
+        appmod.reconcile_task_stats(user['user_id'])
+        appmod.reconcile_unread_count(user['user_id'])
+    appmod.app.test_cli_runner().invoke(args=['backfill-rollups'])
+    return users
+
+
+def cleanup(appmod, users):
+    user_ids = [user['user_id'] for user in users]
+    appmod.users_collection.delete_many({'_id': {'$in': [appmod.ObjectId(user_id) for user_id in user_ids]}})
+    appmod.delete_attachments({'owner_id': {'$in': user_ids}})
+    appmod.tasks_collection.delete_many({'user_id': {'$in': user_ids}})
+    appmod.notifications_collection.delete_many({'user_id': {'$in': user_ids}})
+    appmod.user_stats_collection.delete_many({'_id': {'$in': user_ids}})
+    for user_id in user_ids:
+        appmod.task_rollups_collection.delete_many({'_id': {'$regex': f'^{user_id}:'}})
+
+
+def attachment_content(rng, size):
+    # Distinct contents, identical uploads would only be stored once
+    return rng.randbytes(size // 2).hex().encode()
+
+
+class TestClientSession:
+    """Requests through the Flask test client, in process"""
+
+    def __init__(self, appmod, username):
+        self.client = appmod.app.test_client()
+        self.client.post('/login', data={'username': username, 'password': PASSWORD})
+
+    def request(self, method, path, upload=None):
+        data = {'file': (io.BytesIO(upload), 'upload.txt')} if upload is not None else None
+        response = self.client.open(path, method=method, data=data)
+        response.get_data()
+        return response.status_code
+
+
+class HTTPSession:
+    """Requests over HTTP with a cookie jar per user"""
+
+    def __init__(self, base_url, username):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        self.opener.open(f'{base_url}/login', urllib.parse.urlencode(
+            {'username': username, 'password': PASSWORD}).encode()).read()
+
+    def request(self, method, path, upload=None):
+        body = None
+        headers = {}
+        if upload is not None:
+            boundary = uuid.uuid4().hex
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+            body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="upload.txt"\r\n'
+                    f'Content-Type: text/plain\r\n\r\n').encode() + upload + f'\r\n--{boundary}--\r\n'.encode()
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def serve(appmod):
+    """Serve the app on a free local port from a background thread, returns its URL"""
+    from werkzeug.serving import make_server
+    server = make_server('127.0.0.1', 0, appmod.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_endpoint(sessions, users, method, path, args, rng):
+    """Send args.requests requests from args.concurrency threads, rotating through the users"""
+    # Paths and upload bodies are drawn up front so every run sends the same requests
+    jobs = []
+    for i in range(args.requests):
+        n = i % len(users)
+        user = users[n]
+        task_id = rng.choice(user['task_ids']) if user['task_ids'] else 'none'
+        if '{filename}' in path:
+            task_id = user['task_ids'][0] if user['task_ids'] else 'none'
+        upload = attachment_content(rng, args.attachment_size) if method == 'POST' else None
+        jobs.append((n, path.format(task_id=task_id, filename=user['filename'], word=rng.choice(WORDS)), upload))
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    position = iter(range(len(jobs)))
+
+    def worker():
+        while True:
+            with lock:
+                index = next(position, None)
+            if index is None:
+                return
+            n, job_path, upload = jobs[index]
+            started = time.perf_counter()
+            try:
+                status = sessions[n].request(method, job_path, upload)
+            except Exception:
+                status = None
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                # Redirects are failures too, e.g. to the login page
+                if status not in (200, 304):
+                    errors.append(status)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput': len(latencies) / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p95': percentile(latencies, 0.95) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'max': max(latencies) * 1000,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return the endpoints whose p95 is more than tolerance slower than in baseline"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before and result['p95'] > before['p95'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95']:.1f} ms -> {result['p95']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mongomock', action='store_true', help='Use an in-memory mongomock database')
+    parser.add_argument('--driver', choices=['test-client', 'http'], default='test-client')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=200, help='Tasks per user')
+    parser.add_argument('--notifications', type=int, default=100, help='Notifications per user')
+    parser.add_argument('--shared', type=int, default=20, help='Tasks each user shares with the next user')
+    parser.add_argument('--attachment-size', type=int, default=16 * 1024, help='Bytes per uploaded file')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--endpoints', default=None, help='Comma separated endpoint names, all by default')
+    parser.add_argument('--no-response-cache', action='store_true',
+                        help='Measure the read endpoints without the in-process response cache')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed, the same seed sends the same requests')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run, exit with 1 when p95 regressed')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed p95 slowdown against --baseline')
+    parser.add_argument('--keep', action='store_true', help='Keep the seeded data')
+    args = parser.parse_args()
+
+    endpoints = ENDPOINTS
+    if args.endpoints:
+        names = args.endpoints.split(',')
+        endpoints = [endpoint for endpoint in ENDPOINTS if endpoint[0] in names]
+
+    appmod = load_app(args.mongomock)
+    if args.no_response_cache:
+        appmod.response_cache.max_size = 0
+    rng = random.Random(args.seed)
+
+    started = time.perf_counter()
+    users = seed(appmod, args, rng)
+    print(f'seeded {args.users} users x {args.tasks} tasks x {args.notifications} notifications '
+          f'in {time.perf_counter() - started:.1f} s')
+
+    try:
+        if args.driver == 'http':
+            base_url = serve(appmod)
+            sessions = [HTTPSession(base_url, user['username']) for user in users]
+        else:
+            sessions = [TestClientSession(appmod, user['username']) for user in users]
+
+        results = {}
+        print(f"{'endpoint':<22}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+        for name, method, path in endpoints:
+            result = run_endpoint(sessions, users, method, path, args, rng)
+            results[name] = result
+            print(f"{name:<22}{result['throughput']:>9.1f}{result['p50']:>9.1f}{result['p95']:>9.1f}"
+                  f"{result['p99']:>9.1f}{result['max']:>9.1f}{result['errors']:>8}")
+        appmod.notification_queue.flush()
+    finally:
+        if not args.keep:
+            cleanup(appmod, users)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f'regression: {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Measure JSON serialization throughput of task list payloads.
+
+Compares the old per-task conversion (str(ObjectId), strftime) with Flask's default
+provider against MongoJSONProvider, with and without orjson, e.g.
+python benchmark_json.py --tasks 10000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+from api_mapping import task_to_api
+from json_provider import MongoJSONProvider
+
+
+def make_tasks(count):
+    """Documents as /api/tasks reads them with TASK_LIST_PROJECTION"""
+    user_id = str(ObjectId())
+    now = datetime.utcnow()
+    return [{
+        '_id': ObjectId(),
+        'user_id': user_id,
+        'title': f'Task {i}',
+        'status': random.choice(['Pending', 'In Progress', 'Completed']),
+        'deadline': (now + timedelta(days=random.randint(0, 60))).strftime('%Y-%m-%d'),
+        'created_at': now - timedelta(minutes=i)
+    } for i in range(count)]
+
+
+def legacy_to_api(task):
+    return {
+        '_id': str(task['_id']),
+        'title': task.get('title', ''),
+        'status': task.get('status', ''),
+        'created_at': task['created_at'].strftime('%Y-%m-%d %H:%M'),
+        'deadline': task.get('deadline', '')
+    }
+
+
+def measure(app, to_api, tasks, repeat):
+    """Best time of repeat runs of mapping the tasks and building the jsonify response"""
+    best = None
+    with app.app_context():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = app.json.response([to_api(task) for task in tasks]).get_data()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.tasks)
+    default_app = Flask('default')
+    default_app.json = DefaultJSONProvider(default_app)
+    mongo_app = Flask('mongo')
+    mongo_app.json = MongoJSONProvider(mongo_app)
+
+    runs = [('flask default, converted per task', default_app, legacy_to_api)]
+    orjson = json_provider.orjson
+    if orjson is not None:
+        runs.append(('MongoJSONProvider, orjson', mongo_app, task_to_api))
+    runs.append(('MongoJSONProvider, json', mongo_app, task_to_api))
+
+    for name, app, to_api in runs:
+        # The standard library fallback is measured by hiding orjson from the provider
+        json_provider.orjson = orjson if name.endswith('orjson') else None
+        seconds, size = measure(app, to_api, tasks, args.repeat)
+        print(f'{name}: {seconds * 1000:.1f} ms per {args.tasks} tasks, '
+              f'{args.tasks / seconds:,.0f} tasks/s, {size / 1024:.0f} KiB')
+    json_provider.orjson = orjson
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Measure login throughput and the latency of other requests served during a login burst.
+
+Run against a started app, e.g. python benchmark_login.py --url http://127.0.0.1:5000
+Compare PASSWORD_HASH_WORKERS=0 (inline hashing) with the default process pool.
+"""
+import argparse
+import http.cookiejar
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+CSRF_PATTERN = re.compile(r'name="csrf_token" value="([^"]+)"')
+
+
+def new_opener():
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+
+def post_form(opener, url, page, fields):
+    """GET page for its CSRF token, then POST fields to url"""
+    html = opener.open(page).read().decode()
+    fields = dict(fields, csrf_token=CSRF_PATTERN.search(html).group(1))
+    return opener.open(url, urllib.parse.urlencode(fields).encode())
+
+
+def login(base_url, username, password):
+    opener = new_opener()
+    response = post_form(opener, f'{base_url}/login', f'{base_url}/login',
+                         {'username': username, 'password': password})
+    # A successful login redirects to the dashboard
+    return opener, not response.geturl().endswith('/login')
+
+
+def ensure_user(base_url, username, password):
+    opener, ok = login(base_url, username, password)
+    if not ok:
+        post_form(new_opener(), f'{base_url}/register', f'{base_url}/register',
+                  {'username': username, 'password': password, 'confirm_password': password})
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=8, help='Threads logging in')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds')
+    parser.add_argument('--password', default='benchmark-password')
+    args = parser.parse_args()
+
+    usernames = [f'benchmark_{i}' for i in range(args.users)]
+    for username in usernames:
+        ensure_user(args.url, username, args.password)
+    # Logged in once, used for the non-login probe requests
+    probe, _ = login(args.url, usernames[0], args.password)
+
+    deadline = time.monotonic() + args.duration
+    logins = []
+    failures = []
+    probe_latencies = []
+    lock = threading.Lock()
+
+    def login_loop(index):
+        while time.monotonic() < deadline:
+            username = usernames[index % len(usernames)]
+            index += args.concurrency
+            try:
+                _, ok = login(args.url, username, args.password)
+            except urllib.error.URLError:
+                ok = False
+            with lock:
+                (logins if ok else failures).append(1)
+
+    def probe_loop():
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            probe.open(f'{args.url}/notifications/unread_count').read()
+            probe_latencies.append(time.monotonic() - started)
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=login_loop, args=(i,)) for i in range(args.concurrency)]
+    threads.append(threading.Thread(target=probe_loop))
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    print(f'logins: {len(logins)} ok, {len(failures)} failed, {len(logins) / elapsed:.1f}/s')
+    if probe_latencies:
+        print('other requests during the burst: '
+              f'p50 {statistics.median(probe_latencies) * 1000:.1f} ms, '
+              f'p95 {percentile(probe_latencies, 0.95) * 1000:.1f} ms, '
+              f'p99 {percentile(probe_latencies, 0.99) * 1000:.1f} ms, '
+              f'max {max(probe_latencies) * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Count MongoDB round trips and time per request of the dashboard and analytics routes.
+
+Runs the queries the routes used to make (one count_documents per status, an aggregate
+for the distribution) next to the routes as they are now, which read the user_stats
+document, e.g. python benchmark_round_trips.py --tasks 5000
+Round trips are counted with pymongo's command monitoring, so this needs the MongoDB at
+MONGO_URI; mongomock does not report commands. Route times include Flask and template
+rendering, the old queries are timed on their own. The seeded user is removed at the end.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import monitoring
+
+
+STATUSES = ['Pending', 'In Progress', 'Completed']
+PASSWORD = 'benchmark-password'
+
+
+class RoundTripCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def legacy_index(appmod, user_id):
+    tasks_collection = appmod.tasks_collection
+    tasks_collection.count_documents({'user_id': user_id})
+    for status in STATUSES:
+        tasks_collection.count_documents({'user_id': user_id, 'status': status})
+    return list(tasks_collection.find({'user_id': user_id}))
+
+
+def legacy_analytics_overview(appmod, user_id):
+    tasks_collection = appmod.tasks_collection
+    tasks_collection.count_documents({'user_id': user_id})
+    for status in ['Completed', 'Pending', 'In Progress']:
+        tasks_collection.count_documents({'user_id': user_id, 'status': status})
+    today = datetime.utcnow().date()
+    tasks_collection.count_documents({
+        'user_id': user_id,
+        'deadline': {'$lt': today.isoformat()},
+        'status': {'$nin': ['Completed']}
+    })
+
+
+def legacy_status_distribution(appmod, user_id):
+    pipeline = [
+        {'$match': {'user_id': user_id}},
+        {'$group': {'_id': '$status', 'count': {'$sum': 1}}}
+    ]
+    return list(appmod.tasks_collection.aggregate(pipeline))
+
+
+# (name, queries the route used to run, path of the route now)
+ROUTES = [
+    ('index', legacy_index, '/'),
+    ('analytics_overview', legacy_analytics_overview, '/analytics/overview'),
+    ('status_distribution', legacy_status_distribution, '/analytics/status-distribution'),
+]
+
+
+def measure(counter, fn, repeat):
+    """Round trips of one call and the median seconds over repeat calls"""
+    fn()  # warm up connections and the first-read stats rebuild
+    counter.count = 0
+    fn()
+    round_trips = counter.count
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return round_trips, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    import app as appmod
+    appmod.app.config['WTF_CSRF_ENABLED'] = False
+    if not appmod.app.secret_key:
+        appmod.app.secret_key = os.urandom(16).hex()
+    # Every request should reach MongoDB, not the response cache
+    appmod.response_cache.max_size = 0
+    counter = RoundTripCounter()
+    options = dict(appmod.mongo.options)
+    options['event_listeners'] = list(options.get('event_listeners', [])) + [counter]
+    appmod.mongo.configure(appmod.mongo.uri, **options)
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    username = f'bench_round_trips_{uuid.uuid4().hex[:8]}'
+    user_id = str(appmod.users_collection.insert_one(
+        {'username': username, 'password': appmod.password_hasher.hash(PASSWORD)}).inserted_id)
+    try:
+        tasks = []
+        for i in range(args.tasks):
+            deadline = (now + timedelta(days=rng.randint(-30, 60))).strftime('%Y-%m-%d')
+            task = appmod.new_task(user_id, f'Task {i}', 'Round trip benchmark task', deadline)
+            task['status'] = rng.choice(STATUSES)
+            tasks.append(task)
+        if tasks:
+            appmod.tasks_collection.insert_many(tasks)
+        appmod.reconcile_task_stats(user_id)
+
+        client = appmod.app.test_client()
+        client.post('/login', data={'username': username, 'password': PASSWORD})
+
+        print(f'{args.tasks} tasks, median of {args.repeat} requests')
+        print(f"{'route':<22}{'round trips':>18}{'ms':>22}")
+        for name, legacy, path in ROUTES:
+            before = measure(counter, lambda: legacy(appmod, user_id), args.repeat)
+
+            def request():
+                response = client.get(path)
+                assert response.status_code == 200, f'{path} answered {response.status_code}'
+
+            after = measure(counter, request, args.repeat)
+            print(f'{name:<22}{before[0]:>8} -> {after[0]:<7}{before[1] * 1000:>12.2f} -> {after[1] * 1000:.2f}')
+    finally:
+        appmod.tasks_collection.delete_many({'user_id': user_id})
+        appmod.user_stats_collection.delete_one({'_id': user_id})
+        appmod.task_rollups_collection.delete_many({'user_id': user_id})
+        appmod.users_collection.delete_one({'_id': appmod.ObjectId(user_id)})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Compare dashboard search over search_tokens with the case-insensitive title regex it replaced.
+
+Seeds one user with --tasks tasks (100k by default), builds the indexes and runs the same
+search terms both ways, reporting the median and p95 latency and the number of results, e.g.
+python benchmark_search.py --tasks 100000 --repeat 20
+Uses MONGO_URI like the app; --mongomock only checks that it runs, mongomock has no indexes.
+The seeded user is removed at the end.
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from benchmark import STATUSES, WORDS, load_app, percentile
+from indexes import ensure_indexes
+
+
+TERMS = ['report', 'rep', 'budget review', 'mig', 'customer backup', 'nomatch']
+INSERT_BATCH_SIZE = 5000
+
+
+def seed(appmod, user_id, count, rng):
+    now = datetime.utcnow()
+    batch = []
+    for i in range(count):
+        title = f'{rng.choice(WORDS)} {rng.choice(WORDS)} {i}'
+        description = ' '.join(rng.choice(WORDS) for _ in range(20))
+        task = appmod.new_task(user_id, title, description,
+                               (now + timedelta(days=rng.randint(-30, 60))).strftime('%Y-%m-%d'))
+        task['status'] = rng.choice(STATUSES)
+        batch.append(task)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            appmod.tasks_collection.insert_many(batch)
+            batch = []
+    if batch:
+        appmod.tasks_collection.insert_many(batch)
+
+
+def regex_search(appmod, user_id, term):
+    """The dashboard search before search_tokens: every matching task, unranked"""
+    query = {'user_id': user_id, 'title': {'$regex': term, '$options': 'i'}}
+    return list(appmod.tasks_collection.find(query, appmod.TASK_LIST_PROJECTION))
+
+
+def token_search(appmod, user_id, term):
+    return appmod.search_tasks({'user_id': user_id}, term)
+
+
+def measure(fn, repeat):
+    results = fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return len(results), statistics.median(timings), percentile(timings, 0.95)
+
+
+def print_index_sizes(appmod):
+    try:
+        stats = appmod.db.command('collStats', 'tasks')
+    except Exception:
+        # mongomock has no collStats
+        return
+    for name, size in sorted(stats.get('indexSizes', {}).items()):
+        print(f'index {name}: {size / 1024 / 1024:.1f} MiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--mongomock', action='store_true', help='run against an in-memory mongomock database')
+    args = parser.parse_args()
+
+    appmod = load_app(args.mongomock)
+    ensure_indexes(appmod.db)
+    user_id = str(appmod.users_collection.insert_one(
+        {'username': f'bench_search_{uuid.uuid4().hex[:8]}', 'password': ''}).inserted_id)
+    try:
+        started = time.perf_counter()
+        seed(appmod, user_id, args.tasks, random.Random(args.seed))
+        print(f'Seeded {args.tasks} tasks in {time.perf_counter() - started:.1f}s')
+        print_index_sizes(appmod)
+
+        print(f"{'term':<18}{'path':<8}{'results':>9}{'p50 ms':>10}{'p95 ms':>10}")
+        for term in TERMS:
+            for name, search in [('regex', regex_search), ('tokens', token_search)]:
+                count, p50, p95 = measure(lambda: search(appmod, user_id, term), args.repeat)
+                print(f'{term:<18}{name:<8}{count:>9}{p50 * 1000:>10.2f}{p95 * 1000:>10.2f}')
+        print(f'Token search returns the best {appmod.SEARCH_RESULT_LIMIT} matches, the regex every match '
+              f'of the title; tokens also match whole description words and every word in any order')
+    finally:
+        appmod.tasks_collection.delete_many({'user_id': user_id})
+        appmod.users_collection.delete_one({'_id': appmod.ObjectId(user_id)})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import os
+import threading
+
+from pymongo import MongoClient
+
+
+class MongoConnection:
+    """One MongoClient per process, created on first use.
+
+    A MongoClient must not be shared across fork(): a client created at import time in
+    the gunicorn master would hand its pooled sockets to every worker. The client is only
+    created when a process first talks to MongoDB, and again in a forked child.
+    """
+
+    def __init__(self, uri=None, **options):
+        self.uri = uri
+        self.options = options
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def configure(self, uri, **options):
+        """Set the URI and MongoClient options, a client created with the old ones is closed"""
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self.uri = uri
+            self.options = options
+
+    @property
+    def client(self):
+        client = self._client
+        if client is None or self._pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    # The parent's client is left alone, closing it here would close its sockets
+                    self._client = MongoClient(self.uri, **self.options)
+                    self._pid = os.getpid()
+                client = self._client
+        return client
+
+    def database(self, name):
+        return DatabaseProxy(self, name)
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+
+
+class DatabaseProxy:
+    """Database of the current process' client, collections taken from it are proxies too"""
+
+    def __init__(self, connection, name):
+        self._connection = connection
+        self._name = name
+
+    def __getitem__(self, name):
+        return CollectionProxy(self._connection, self._name, name)
+
+    def __getattr__(self, attr):
+        return getattr(self._connection.client[self._name], attr)
+
+
+class CollectionProxy:
+    """Stands in for a Collection at module level, resolved against the current process' client"""
+
+    def __init__(self, connection, database_name, name, options=None):
+        self._connection = connection
+        self._database_name = database_name
+        self._name = name
+        self._options = options or {}
+        self._resolved = (None, None)
+
+    def _collection(self):
+        client = self._connection.client
+        resolved_client, collection = self._resolved
+        if resolved_client is not client:
+            collection = client[self._database_name][self._name]
+            if self._options:
+                collection = collection.with_options(**self._options)
+            self._resolved = (client, collection)
+        return collection
+
+    def with_options(self, **options):
+        return CollectionProxy(self._connection, self._database_name, self._name, {**self._options, **options})
+
+    def __getattr__(self, attr):
+        return getattr(self._collection(), attr)
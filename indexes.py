@@ -0,0 +1,111 @@
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from bson.objectid import ObjectId
+
+
+# Indexes required by the queries in app.py, per collection
+INDEXES = {
+    'tasks': [
+        # Keyset pages of a user's tasks, optionally filtered by status, in _id order
+        IndexModel([('user_id', ASCENDING), ('_id', ASCENDING)], name='user_id_id'),
+        IndexModel([('user_id', ASCENDING), ('status', ASCENDING), ('_id', ASCENDING)],
+                   name='user_status_id'),
+        # Same pages sorted by deadline, _id breaks ties between equal deadlines
+        IndexModel([('user_id', ASCENDING), ('deadline', ASCENDING), ('_id', ASCENDING)],
+                   name='user_deadline_id'),
+        IndexModel([('user_id', ASCENDING), ('status', ASCENDING), ('deadline', ASCENDING), ('_id', ASCENDING)],
+                   name='user_status_deadline_id'),
+        # Prefix search over title and description tokens
+        IndexModel([('user_id', ASCENDING), ('search_tokens', ASCENDING)], name='user_search_tokens'),
+        # Multikey index for pages of tasks shared with a user
+        IndexModel([('sharedWith', ASCENDING), ('_id', ASCENDING)], name='shared_with_id'),
+    ],
+    'notifications': [
+        # Latest notifications per user
+        IndexModel([('user_id', ASCENDING), ('created_at', DESCENDING)], name='user_created_at'),
+        # Mark all unread as read
+        IndexModel([('user_id', ASCENDING), ('is_read', ASCENDING)], name='user_is_read'),
+        # Read notifications are deleted once expire_at has passed
+        IndexModel([('expire_at', ASCENDING)], name='expire_at_ttl', expireAfterSeconds=0),
+        # prune-notifications archives read notifications by age, unread ones are never archived
+        IndexModel([('read_at', ASCENDING)], name='read_at_read', partialFilterExpression={'is_read': True}),
+    ],
+    'notifications_archive': [
+        IndexModel([('user_id', ASCENDING), ('created_at', DESCENDING)], name='user_created_at'),
+    ],
+    'attachments': [
+        # Download and delete look up one attachment of a task by filename
+        IndexModel([('task_id', ASCENDING), ('filename', ASCENDING)], name='task_filename_unique', unique=True),
+        # Account deletion
+        IndexModel([('owner_id', ASCENDING)], name='owner_id'),
+    ],
+    'users': [
+        # Login, register and share look users up by username
+        IndexModel([('username', ASCENDING)], name='username_unique', unique=True),
+    ],
+}
+
+# Representative query shapes from app.py as (collection, filter, sort)
+_user_id = str(ObjectId())
+QUERY_SHAPES = [
+    ('tasks', {'user_id': _user_id}, [('_id', ASCENDING)]),
+    ('tasks', {'user_id': _user_id, '_id': {'$gt': ObjectId()}}, [('_id', ASCENDING)]),
+    ('tasks', {'user_id': _user_id}, [('deadline', ASCENDING), ('_id', ASCENDING)]),
+    ('tasks', {'user_id': _user_id, 'status': 'Pending'}, [('_id', ASCENDING)]),
+    ('tasks', {'user_id': _user_id, 'status': 'Pending'}, [('deadline', ASCENDING), ('_id', ASCENDING)]),
+    ('tasks', {'user_id': _user_id, 'search_tokens': {'$all': ['rep', 'q']}}, None),
+    ('tasks', {'user_id': _user_id, 'status': 'Pending', 'search_tokens': {'$all': ['rep']}}, None),
+    ('tasks', {'_id': ObjectId(), 'user_id': _user_id}, None),
+    ('tasks', {'sharedWith': _user_id}, [('_id', ASCENDING)]),
+    ('tasks', {'_id': ObjectId(), 'sharedWith': _user_id}, None),
+    ('tasks', {'_id': ObjectId(), '$or': [{'user_id': _user_id}, {'sharedWith': _user_id}]}, None),
+    ('notifications', {'user_id': _user_id}, [('created_at', DESCENDING)]),
+    ('notifications', {'user_id': _user_id, 'is_read': False}, None),
+    ('notifications', {'_id': ObjectId(), 'user_id': _user_id}, None),
+    ('notifications', {'is_read': True, 'read_at': {'$lt': datetime(2024, 1, 1)}}, None),
+    ('attachments', {'task_id': _user_id, 'owner_id': _user_id}, [('uploaded_at', ASCENDING)]),
+    ('attachments', {'task_id': _user_id, 'filename': 'file.pdf', 'owner_id': _user_id}, None),
+    ('attachments', {'task_id': {'$in': [_user_id]}}, None),
+    ('attachments', {'owner_id': _user_id}, None),
+    ('users', {'username': 'username'}, None),
+    ('users', {'_id': ObjectId()}, None),
+    ('user_stats', {'_id': _user_id}, None),
+    # Trends read a range of "<user_id>:<YYYY-MM-DD>" ids, no secondary index needed
+    ('task_rollups', {'_id': {'$gte': f'{_user_id}:2024-01-01', '$lte': f'{_user_id}:2024-12-31'}},
+     [('_id', ASCENDING)]),
+    ('task_rollups', {'_id': {'$regex': f'^{_user_id}:'}}, None),
+]
+
+
+def ensure_indexes(db):
+    """Create all declared indexes, existing ones are left untouched"""
+    created = {}
+    for collection_name, indexes in INDEXES.items():
+        created[collection_name] = db[collection_name].create_indexes(indexes)
+    return created
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree"""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def find_collscans(db):
+    """Explain every query shape and return the ones that fall back to COLLSCAN"""
+    collscans = []
+    for collection_name, query, sort in QUERY_SHAPES:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain()['queryPlanner']['winningPlan']
+        if 'COLLSCAN' in _plan_stages(winning_plan):
+            collscans.append((collection_name, query, sort))
+    return collscans
@@ -0,0 +1,60 @@
+from datetime import date, datetime
+
+from bson.objectid import ObjectId
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:  # Optional, without it the standard library encoder is used
+    orjson = None
+
+
+if orjson is not None:
+    # Naive datetimes from MongoDB are UTC, written the same way as encode_value does
+    ORJSON_OPTIONS = (orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_OMIT_MICROSECONDS
+                      | orjson.OPT_NON_STR_KEYS)
+
+
+def encode_value(value):
+    """Encode the values JSON has no type for: ObjectId as its hex string, datetime as ISO 8601 UTC"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        text = value.replace(microsecond=0).isoformat()
+        if value.tzinfo is None:
+            return text + 'Z'
+        return text.replace('+00:00', 'Z')
+    if isinstance(value, date):
+        return value.isoformat()
+    # Decimal, UUID, dataclasses and __html__ as Flask encodes them
+    return _default(value)
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes MongoDB documents as they are read.
+
+    ObjectId and datetime values need no conversion in the routes. orjson is used when it
+    is installed, the output is the same with the standard library encoder.
+    """
+
+    default = staticmethod(encode_value)
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        # orjson output is always compact, which is all Socket.IO asks for with separators
+        if orjson is None or set(kwargs) - {'separators'}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=encode_value, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Pretty printed in debug mode like Flask does, otherwise encoded straight to bytes
+        if orjson is None or self.compact is False or self.compact is None and self._app.debug:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=encode_value, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,252 @@
+import bisect
+import threading
+
+from pymongo import monitoring
+
+
+# Seconds, the Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Round trips per request
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    metric_type = 'counter'
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}']
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(f'{self.name}{format_labels(self.label_names, label_values)} {format_value(value)}')
+        return lines
+
+
+class Gauge(Counter):
+    metric_type = 'gauge'
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # label values -> [count per bucket (the last one is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            values = sorted((label_values, (list(counts), total))
+                            for label_values, (counts, total) in self._values.items())
+        for label_values, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = format_labels(self.label_names, label_values, [('le', format_value(bound))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.label_names, label_values)
+            lines.append(f'{self.name}_sum{labels} {format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class CallbackMetric:
+    """Gauge or counter whose value is read from fn when the metrics are rendered"""
+
+    def __init__(self, name, documentation, metric_type, fn):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.fn = fn
+
+    def render(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}',
+                f'{self.name} {format_value(self.fn())}']
+
+
+class MetricsRegistry:
+    """Metrics of this process in the Prometheus text format.
+
+    Every worker process keeps its own values, scrape each of them (or their sum behind
+    a proxy) rather than one worker through a load balancer.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, label_names=()):
+        return self._add(Counter(name, documentation, label_names))
+
+    def gauge(self, name, documentation, label_names=()):
+        return self._add(Gauge(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, documentation, label_names, buckets))
+
+    def callback(self, name, documentation, metric_type, fn):
+        return self._add(CallbackMetric(name, documentation, metric_type, fn))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Counts and times MongoDB commands by command and collection.
+
+    Between begin_request() and end_request() the commands run by the same thread are
+    also summed up, giving the round trips and time in MongoDB of a single request.
+    """
+
+    def __init__(self, registry):
+        self.commands = registry.counter('mongo_commands_total', 'MongoDB commands run',
+                                         ['command', 'collection'])
+        self.failures = registry.counter('mongo_command_failures_total', 'MongoDB commands that failed',
+                                         ['command', 'collection'])
+        self.seconds = registry.histogram('mongo_command_duration_seconds', 'MongoDB command round trip time',
+                                          ['command', 'collection'])
+        self._pending = {}
+        self._local = threading.local()
+
+    def begin_request(self):
+        self._local.totals = [0, 0.0]
+
+    def end_request(self):
+        """Return (commands, seconds) run by this thread since begin_request()"""
+        totals = getattr(self._local, 'totals', None) or [0, 0.0]
+        self._local.totals = None
+        return totals[0], totals[1]
+
+    def started(self, event):
+        command = event.command_name
+        # getMore names its cursor id, the collection is in its own field
+        target = event.command.get('collection' if command == 'getMore' else command)
+        self._pending[(event.connection_id, event.request_id)] = (
+            command, target if isinstance(target, str) else '')
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        labels = self._finish(event)
+        self.failures.inc(*labels)
+
+    def _finish(self, event):
+        labels = self._pending.pop((event.connection_id, event.request_id), (event.command_name, ''))
+        seconds = event.duration_micros / 1e6
+        self.commands.inc(*labels)
+        self.seconds.observe(seconds, *labels)
+        # Callbacks run on the thread that sent the command
+        totals = getattr(self._local, 'totals', None)
+        if totals is not None:
+            totals[0] += 1
+            totals[1] += seconds
+        return labels
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Connection pool gauges per server: open, checked out and waiting connections.
+
+    checked_out close to maxPoolSize with waiting above 0 means the pool is saturated, and
+    requests queue for up to waitQueueTimeoutMS before failing with a timeout.
+    """
+
+    def __init__(self, registry):
+        self.connections = registry.gauge('mongo_pool_connections', 'Open pooled connections', ['address'])
+        self.checked_out = registry.gauge('mongo_pool_checked_out', 'Connections in use', ['address'])
+        self.waiting = registry.gauge('mongo_pool_waiting', 'Operations waiting for a connection', ['address'])
+        self.wait_seconds = registry.histogram('mongo_pool_checkout_wait_seconds',
+                                               'Time to check a connection out of the pool', ['address'])
+        self.failures = registry.counter('mongo_pool_checkout_failures_total', 'Connection checkouts that failed',
+                                         ['address', 'reason'])
+        self.clears = registry.counter('mongo_pool_cleared_total', 'Pools cleared after a network error',
+                                       ['address'])
+
+    @staticmethod
+    def _address(event):
+        host, port = event.address
+        return f'{host}:{port}'
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.clears.inc(self._address(event))
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.connections.inc(self._address(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.connections.dec(self._address(event))
+
+    def connection_check_out_started(self, event):
+        self.waiting.inc(self._address(event))
+
+    def connection_check_out_failed(self, event):
+        address = self._address(event)
+        self.waiting.dec(address)
+        self.failures.inc(address, event.reason)
+
+    def connection_checked_out(self, event):
+        address = self._address(event)
+        self.waiting.dec(address)
+        self.checked_out.inc(address)
+        self.wait_seconds.observe(event.duration, address)
+
+    def connection_checked_in(self, event):
+        self.checked_out.dec(self._address(event))
@@ -0,0 +1,137 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationQueue:
+    """Buffers notifications in memory and writes them in batches from a background thread.
+
+    put() blocks for up to put_timeout seconds when the queue is full (backpressure)
+    and then falls back to writing the notification synchronously, so nothing is
+    dropped under load. on_flush is called with every batch after it was written.
+    """
+
+    def __init__(self, collection, max_size=10000, batch_size=500, flush_interval=0.05,
+                 put_timeout=1.0, on_flush=None):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.on_flush = on_flush
+        self._queue = queue.Queue(maxsize=max_size)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'overflow_writes': 0,
+            'failed': 0,
+            'flushes': 0,
+            'flush_seconds_total': 0.0,
+            'flush_seconds_max': 0.0,
+            'last_flush_seconds': 0.0,
+        }
+
+    def start(self):
+        """Start the worker thread, again after a fork since threads do not survive it"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stopping.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='notification-queue', daemon=True)
+            self._thread.start()
+
+    def put(self, notification):
+        self.start()
+        try:
+            self._queue.put(notification, timeout=self.put_timeout)
+            self._count(enqueued=1)
+        except queue.Full:
+            self._count(overflow_writes=1)
+            self.write([notification])
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far has been written"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return not self._queue.unfinished_tasks
+
+    def stop(self, timeout=5.0):
+        """Flush pending notifications and stop the worker, used at shutdown"""
+        self._stopping.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+        # Whatever the worker could not drain is written from the calling thread
+        batch = self._drain(self._queue.qsize())
+        if batch:
+            self.write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def metrics(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['depth'] = self._queue.qsize()
+        stats['flush_seconds_avg'] = stats['flush_seconds_total'] / stats['flushes'] if stats['flushes'] else 0.0
+        return stats
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first] + self._drain(self.batch_size - 1)
+            try:
+                self.write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def write(self, batch):
+        """Write a batch straight away, bypassing the queue"""
+        started = time.monotonic()
+        try:
+            self.collection.insert_many(batch, ordered=False)
+        except Exception:
+            self._count(failed=len(batch))
+            logger.exception('Failed to write %d notification(s)', len(batch))
+            return
+        elapsed = time.monotonic() - started
+
+        with self._stats_lock:
+            self._stats['written'] += len(batch)
+            self._stats['flushes'] += 1
+            self._stats['flush_seconds_total'] += elapsed
+            self._stats['flush_seconds_max'] = max(self._stats['flush_seconds_max'], elapsed)
+            self._stats['last_flush_seconds'] = elapsed
+
+        if self.on_flush is not None:
+            try:
+                self.on_flush(batch)
+            except Exception:
+                logger.exception('Notification flush hook failed')
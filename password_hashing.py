@@ -0,0 +1,70 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(RuntimeError):
+    """Raised when max_pending hashes are already queued for the pool"""
+
+
+class PasswordHasher:
+    """Runs Werkzeug password hashing in a bounded process pool.
+
+    Hashing is CPU bound on purpose, so done inline a burst of logins pins the worker and
+    stalls every other request on it. With workers=0 hashes are computed inline.
+    """
+
+    def __init__(self, method='scrypt', workers=2, max_pending=64, wait_timeout=5.0):
+        self.method = method
+        self.workers = workers
+        self.wait_timeout = wait_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._method_prefix = None
+
+    def _executor(self):
+        # Pools do not survive a fork, every worker process starts its own on first use
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                # Forking a worker that runs threads (eventlet, Socket.IO, the notification
+                # writer) can copy a held lock into the child, start them from a clean process
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._mp_context())
+                self._pid = os.getpid()
+            return self._pool
+
+    @staticmethod
+    def _mp_context():
+        methods = multiprocessing.get_all_start_methods()
+        return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            raise HasherBusy('Too many password hashes in progress')
+        try:
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def check(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True when pwhash was made with other parameters than the configured method"""
+        if self._method_prefix is None:
+            # Werkzeug fills in default parameters, so compare against a real hash
+            self._method_prefix = self.hash('').split('$', 1)[0]
+        return pwhash.split('$', 1)[0] != self._method_prefix
+
+    def shutdown(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.shutdown(wait=False, cancel_futures=True)
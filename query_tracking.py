@@ -0,0 +1,93 @@
+import logging
+import threading
+from collections import Counter
+
+from pymongo import monitoring
+
+
+logger = logging.getLogger(__name__)
+
+# Where each command keeps the filter that identifies its shape
+FILTER_FIELDS = {
+    'find': 'filter',
+    'count': 'query',
+    'distinct': 'query',
+    'findAndModify': 'query',
+    'aggregate': 'pipeline',
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a request runs more MongoDB commands than its budget"""
+
+
+def value_shape(value):
+    """value with every literal replaced by '?', keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: value_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        # [1, 2, 3] for $in and friends is as much one shape as [1]
+        shapes = []
+        for item in map(value_shape, value):
+            if item not in shapes:
+                shapes.append(item)
+        return shapes
+    return '?'
+
+
+def command_shape(command_name, command):
+    """Command, collection and filter shape, equal for queries that only differ in their values"""
+    if command_name == 'getMore':
+        return f"getMore {command.get('collection')}"
+    collection = command.get(command_name)
+    if command_name in ('update', 'delete'):
+        statements = command.get('updates' if command_name == 'update' else 'deletes') or [{}]
+        shape = [value_shape(statement.get('q', {})) for statement in statements]
+    else:
+        shape = value_shape(command.get(FILTER_FIELDS.get(command_name), {}))
+    return f'{command_name} {collection} {shape}'
+
+
+class QueryTracker(monitoring.CommandListener):
+    """Records the shape of every MongoDB command a request runs, for development and tests.
+
+    check() logs shapes repeated n_plus_one_threshold times or more within one request
+    (a query per item of a loop), and a request that goes over its command budget either
+    logs a warning or, with strict=True, raises QueryBudgetExceeded.
+    """
+
+    def __init__(self, n_plus_one_threshold=3, strict=False):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.strict = strict
+        self._local = threading.local()
+
+    def begin_request(self):
+        self._local.shapes = []
+
+    def end_request(self):
+        """Return the shapes of the commands this thread ran since begin_request()"""
+        shapes = getattr(self._local, 'shapes', None) or []
+        self._local.shapes = None
+        return shapes
+
+    def started(self, event):
+        # Callbacks run on the thread that sent the command
+        shapes = getattr(self._local, 'shapes', None)
+        if shapes is not None:
+            shapes.append(command_shape(event.command_name, event.command))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def check(self, name, shapes, budget=None):
+        for shape, count in Counter(shapes).items():
+            if count >= self.n_plus_one_threshold:
+                logger.warning('Possible N+1 in %s: %d x %s', name, count, shape)
+        if budget is not None and len(shapes) > budget:
+            message = f'{name} ran {len(shapes)} MongoDB commands, its budget is {budget}:\n' + '\n'.join(shapes)
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
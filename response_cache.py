@@ -0,0 +1,80 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from pymongo import UpdateOne
+
+
+class DataVersions:
+    """Per-user version counters for each scope of data ('tasks', 'notifications').
+
+    Routes bump a scope after writing to it, read endpoints derive their ETag from the
+    versions of the scopes they depend on. Counters are kept in memory unless a collection
+    is given, which is needed when several worker processes serve the same users.
+    """
+
+    def __init__(self, collection=None):
+        self.collection = collection
+        # In-memory versions restart at 0, the epoch keeps them from matching an older process' ETags
+        self.epoch = os.urandom(4).hex()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, scope, user_ids):
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        if self.collection is not None:
+            # The epoch is the time of the first bump, a recreated document gets a new one
+            epoch = int(time.time() * 1000)
+            self.collection.bulk_write([
+                UpdateOne({'_id': user_id},
+                          {'$inc': {f'data_versions.{scope}': 1}, '$min': {'data_versions.epoch': epoch}},
+                          upsert=True)
+                for user_id in user_ids
+            ], ordered=False)
+            return
+        with self._lock:
+            for user_id in user_ids:
+                self._versions[(user_id, scope)] = self._versions.get((user_id, scope), 0) + 1
+
+    def get(self, user_id, scopes):
+        """Return one version string for the user covering all scopes"""
+        if self.collection is not None:
+            stats = self.collection.find_one({'_id': user_id}, {'data_versions': 1}) or {}
+            versions = stats.get('data_versions', {})
+            return '-'.join([str(versions.get('epoch', 0))] + [str(versions.get(scope, 0)) for scope in scopes])
+        with self._lock:
+            return '-'.join([self.epoch] + [str(self._versions.get((user_id, scope), 0)) for scope in scopes])
+
+
+class ResponseCache:
+    """In-process LRU cache of response bodies, each stored with the ETag it was built for"""
+
+    def __init__(self, max_size=2048, max_body_size=256 * 1024):
+        self.max_size = max_size
+        self.max_body_size = max_body_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, etag):
+        """Return (body, headers) if the entry was built for etag, stale entries are dropped"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != etag:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def set(self, key, etag, body, headers):
+        if len(body) > self.max_body_size:
+            return
+        with self._lock:
+            self._entries[key] = (etag, body, headers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
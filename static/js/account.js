@@ -0,0 +1,28 @@
+document.getElementById("deleteAccountForm").addEventListener("submit", async function(e) {
+    e.preventDefault(); // stop normal form POST
+
+    const formData = new FormData(this);
+
+    let response = await fetch("/delete_account", {
+        method: "POST",
+        body: formData
+    });
+
+    let result = await response.json();
+
+    if (response.ok) {
+        Swal.fire({
+            title: "Deleted!",
+            text: result.message,
+            icon: "success"
+        }).then(() => {
+            window.location.href = "/login";  // redirect after success
+        });
+    } else {
+        Swal.fire({
+            title: "Error",
+            text: result.error,
+            icon: "error"
+        });
+    }
+});
@@ -0,0 +1,505 @@
+// Analytics functionality
+let statusChart = null;
+let trendsChart = null;
+
+// Load analytics when modal opens
+document.getElementById('analyticsModal').addEventListener('show.bs.modal', function () {
+    loadAnalyticsData();
+});
+
+function loadAnalyticsData() {
+    loadOverviewStats();
+    loadStatusDistribution();
+    loadTrendsData('weekly');
+}
+
+function loadOverviewStats() {
+    fetch('/analytics/overview')
+    .then(response => response.json())
+    .then(data => {
+        const isDarkMode = document.body.classList.contains('dark-mode');
+        const textColor = isDarkMode ? '#e0e0e0' : '#333333';
+        const borderColors = [
+            isDarkMode ? '#0dc1fd' : '#007bff', // Primary
+            isDarkMode ? '#28a745' : '#28a745', // Success
+            isDarkMode ? '#ffc107' : '#ffc107', // Warning
+            isDarkMode ? '#17a2b8' : '#17a2b8', // Info
+            isDarkMode ? '#dc3545' : '#dc3545', // Danger
+            isDarkMode ? '#6c757d' : '#6c757d'  // Secondary
+        ];
+
+ const overviewHtml = `
+    <div class="row g-3">
+        <div class="col-6 col-md-4 col-lg-2 text-center">
+            <div class="card border-primary h-100" style="border-color: ${borderColors[0]} !important">
+                <div class="card-body d-flex flex-column justify-content-center align-items-center">
+                    <h2 class="fw-bold display-6 mb-1" style="color: ${borderColors[0]} !important; word-break: break-word;">${data.total_tasks}</h2>
+                    <small class="text-muted text-nowrap">Total Tasks</small>
+                </div>
+            </div>
+        </div>
+        <div class="col-6 col-md-4 col-lg-2 text-center">
+            <div class="card border-success h-100" style="border-color: ${borderColors[1]} !important">
+                <div class="card-body d-flex flex-column justify-content-center align-items-center">
+                    <h2 class="fw-bold display-6 mb-1" style="color: ${borderColors[1]} !important; word-break: break-word;">${data.completed_tasks}</h2>
+                    <small class="text-muted text-nowrap">Completed</small>
+                </div>
+            </div>
+        </div>
+        <div class="col-6 col-md-4 col-lg-2 text-center">
+            <div class="card border-warning h-100" style="border-color: ${borderColors[2]} !important">
+                <div class="card-body d-flex flex-column justify-content-center align-items-center">
+                    <h2 class="fw-bold display-6 mb-1" style="color: ${borderColors[2]} !important; word-break: break-word;">${data.pending_tasks}</h2>
+                    <small class="text-muted text-nowrap">Pending</small>
+                </div>
+            </div>
+        </div>
+        <div class="col-6 col-md-4 col-lg-2 text-center">
+            <div class="card border-info h-100" style="border-color: ${borderColors[3]} !important">
+                <div class="card-body d-flex flex-column justify-content-center align-items-center">
+                    <h2 class="fw-bold display-6 mb-1" style="color: ${borderColors[3]} !important; word-break: break-word;">${data.in_progress_tasks}</h2>
+                    <small class="text-muted text-nowrap">In Progress</small>
+                </div>
+            </div>
+        </div>
+        <div class="col-6 col-md-4 col-lg-2 text-center">
+            <div class="card border-danger h-100" style="border-color: ${borderColors[4]} !important">
+                <div class="card-body d-flex flex-column justify-content-center align-items-center">
+                    <h2 class="fw-bold display-6 mb-1" style="color: ${borderColors[4]} !important; word-break: break-word;">${data.overdue_tasks}</h2>
+                    <small class="text-muted text-nowrap">Overdue</small>
+                </div>
+            </div>
+        </div>
+        <div class="col-6 col-md-4 col-lg-2 text-center">
+             <div class="card border-secondary h-100" style="border-color: ${borderColors[5]} !important">
+                  <div class="card-body d-flex flex-column justify-content-center align-items-center">
+                    <h2 class="fw-bold display-6 mb-1" style="color: ${borderColors[5]} !important;">
+                         ${Math.round(data.completion_rate)}%
+                    </h2>
+                    <small class="text-muted text-center d-block">Completion<br>Rate</small>
+                  </div>
+             </div>
+        </div>
+    </div>
+ </div>
+`;
+
+        document.getElementById('analyticsOverview').innerHTML = overviewHtml;
+    })
+    .catch(error => {
+        console.error('Error loading overview stats:', error);
+        document.getElementById('analyticsOverview').innerHTML = `
+            <div class="col-12 text-center text-danger">
+                Error loading analytics data
+            </div>
+        `;
+    });
+}
+
+function loadStatusDistribution() {
+    fetch('/analytics/status-distribution')
+    .then(response => response.json())
+    .then(data => {
+        const ctx = document.getElementById('statusChart');
+        if (!ctx) return;
+
+        const isDarkMode = document.body.classList.contains('dark-mode');
+
+        // Define colors that work well in both light and dark modes
+        const backgroundColors = [
+            'rgba(255, 99, 132, 0.8)',      // Red - Pending
+            'rgba(54, 162, 235, 0.8)',      // Blue - In Progress
+            'rgba(75, 192, 192, 0.8)',      // Teal - Completed
+            'rgba(255, 206, 86, 0.8)',      // Yellow - Other statuses
+            'rgba(153, 102, 255, 0.8)',     // Purple
+            'rgba(255, 159, 64, 0.8)'       // Orange
+        ];
+
+        // Destroy previous chart if it exists
+        if (statusChart) {
+            statusChart.destroy();
+        }
+
+        // Prepare data for chart
+        const labels = Object.keys(data);
+        const values = Object.values(data);
+
+        // Get text colors based on mode
+        const textColor = isDarkMode ? '#e0e0e0' : '#666666';
+        const gridColor = isDarkMode ? 'rgba(255, 255, 255, 0.1)' : 'rgba(0, 0, 0, 0.1)';
+
+        statusChart = new Chart(ctx, {
+            type: 'doughnut',
+            data: {
+                labels: labels,
+                datasets: [{
+                    data: values,
+                    backgroundColor: backgroundColors.slice(0, labels.length),
+                    borderColor: isDarkMode ? 'rgba(255, 255, 255, 0.3)' : 'rgba(0, 0, 0, 0.1)',
+                    borderWidth: 2
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: true,
+                plugins: {
+                    legend: {
+                        position: 'bottom',
+                        labels: {
+                            color: textColor,
+                            font: {
+                                size: 12
+                            },
+                            padding: 20
+                        }
+                    },
+                    tooltip: {
+                        callbacks: {
+                            label: function(context) {
+                                const label = context.label || '';
+                                const value = context.raw || 0;
+                                const total = context.dataset.data.reduce((a, b) => a + b, 0);
+                                const percentage = Math.round((value / total) * 100);
+                                return `${label}: ${value} (${percentage}%)`;
+                            }
+                        },
+                        backgroundColor: isDarkMode ? '#2d2d2d' : '#ffffff',
+                        titleColor: isDarkMode ? '#e0e0e0' : '#333333',
+                        bodyColor: isDarkMode ? '#e0e0e0' : '#666666',
+                        borderColor: isDarkMode ? '#3d3d3d' : '#ddd'
+                    }
+                },
+                animation: {
+                    animateScale: true,
+                    animateRotate: true
+                }
+            }
+        });
+    })
+    .catch(error => {
+        console.error('Error loading status distribution:', error);
+    });
+}
+
+const TREND_TITLES = { weekly: 'Weekly', monthly: 'Monthly', quarterly: '90-Day', yearly: 'Yearly' };
+
+function loadTrendsData(timeframe) {
+    fetch(`/analytics/trends?timeframe=${timeframe}`)
+    .then(response => response.json())
+    .then(data => {
+        const ctx = document.getElementById('trendsChart');
+        if (!ctx) return;
+
+        const isDarkMode = document.body.classList.contains('dark-mode');
+
+        // Colors that work in both modes
+        const textColor = isDarkMode ? '#e0e0e0' : '#666666';
+        const gridColor = isDarkMode ? 'rgba(255, 255, 255, 0.1)' : 'rgba(0, 0, 0, 0.1)';
+        const createdColor = 'rgba(54, 162, 235, 1)';
+        const completedColor = 'rgba(75, 192, 192, 1)';
+
+        // Destroy previous chart if it exists
+        if (trendsChart) {
+            trendsChart.destroy();
+        }
+
+        // Prepare data for chart
+        const labels = data.trends.map(trend => {
+            const date = new Date(trend.date);
+            if (timeframe === 'weekly') return date.toLocaleDateString('en-US', { weekday: 'short' });
+            if (timeframe === 'yearly') return date.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: '2-digit' });
+            return date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
+        });
+
+        const createdData = data.trends.map(trend => trend.tasks_created);
+        const completedData = data.trends.map(trend => trend.tasks_completed);
+
+        trendsChart = new Chart(ctx, {
+            type: 'line',
+            data: {
+                labels: labels,
+                datasets: [
+                    {
+                        label: 'Tasks Created',
+                        data: createdData,
+                        borderColor: createdColor,
+                        backgroundColor: 'rgba(54, 162, 235, 0.2)',
+                        tension: 0.4,
+                        fill: true,
+                        pointBackgroundColor: createdColor,
+                        pointBorderColor: '#fff',
+                        pointBorderWidth: 2,
+                        pointRadius: 5,
+                        pointHoverRadius: 7
+                    },
+                    {
+                        label: 'Tasks Completed',
+                        data: completedData,
+                        borderColor: completedColor,
+                        backgroundColor: 'rgba(75, 192, 192, 0.2)',
+                        tension: 0.4,
+                        fill: true,
+                        pointBackgroundColor: completedColor,
+                        pointBorderColor: '#fff',
+                        pointBorderWidth: 2,
+                        pointRadius: 5,
+                        pointHoverRadius: 7
+                    }
+                ]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        position: 'bottom',
+                        labels: {
+                            color: textColor,
+                            font: {
+                                size: 12
+                            }
+                        }
+                    },
+                    title: {
+                        display: true,
+                        text: `Task ${TREND_TITLES[timeframe]} Trends`,
+                        color: textColor,
+                        font: {
+                            size: 16,
+                            weight: 'bold'
+                        }
+                    },
+                    tooltip: {
+                        backgroundColor: isDarkMode ? '#2d2d2d' : '#ffffff',
+                        titleColor: isDarkMode ? '#e0e0e0' : '#333333',
+                        bodyColor: isDarkMode ? '#e0e0e0' : '#666666',
+                        borderColor: isDarkMode ? '#3d3d3d' : '#ddd'
+                    }
+                },
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        ticks: {
+                            stepSize: 1,
+                            color: textColor,
+                            font: {
+                                size: 11
+                            }
+                        },
+                        grid: {
+                            color: gridColor
+                        }
+                    },
+                    x: {
+                        ticks: {
+                            color: textColor,
+                            font: {
+                                size: 11
+                            }
+                        },
+                        grid: {
+                            color: gridColor
+                        }
+                    }
+                },
+                animation: {
+                    duration: 1000,
+                    easing: 'easeOutQuart'
+                }
+            }
+        });
+
+        // Update active button state
+        document.querySelectorAll('[data-timeframe]').forEach(btn => {
+            if (btn.dataset.timeframe === timeframe) {
+                btn.classList.add('active');
+                btn.classList.remove('btn-outline-primary');
+                btn.classList.add('btn-primary');
+            } else {
+                btn.classList.remove('active');
+                btn.classList.remove('btn-primary');
+                btn.classList.add('btn-outline-primary');
+            }
+        });
+    })
+    .catch(error => {
+        console.error('Error loading trends data:', error);
+    });
+}
+
+// Enhanced Dark mode functionality with chart refresh
+document.addEventListener('DOMContentLoaded', function() {
+  const darkModeToggle = document.getElementById('darkModeToggle');
+  const prefersDarkScheme = window.matchMedia('(prefers-color-scheme: dark)');
+  const savedMode = localStorage.getItem('darkMode');
+
+  // Set initial mode based on saved preference or system preference
+  let isDarkMode = savedMode ? savedMode === 'true' : prefersDarkScheme.matches;
+
+  // Apply the mode
+  setDarkMode(isDarkMode);
+
+  // Update button icon
+  updateDarkModeIcon(isDarkMode);
+
+  // Toggle handler
+  darkModeToggle.addEventListener('click', function() {
+    isDarkMode = !isDarkMode;
+    setDarkMode(isDarkMode);
+    updateDarkModeIcon(isDarkMode);
+    localStorage.setItem('darkMode', isDarkMode);
+
+    // Refresh analytics charts if modal is open
+    const analyticsModal = document.getElementById('analyticsModal');
+    if (analyticsModal.classList.contains('show')) {
+        const currentTimeframe = document.querySelector('[data-timeframe].active')?.dataset.timeframe || 'weekly';
+        loadStatusDistribution();
+        loadTrendsData(currentTimeframe);
+        loadOverviewStats(); // Also refresh overview stats for color changes
+    }
+  });
+
+  // Listen for system preference changes
+  prefersDarkScheme.addEventListener('change', e => {
+    if (localStorage.getItem('darkMode') === null) {
+      isDarkMode = e.matches;
+      setDarkMode(isDarkMode);
+      updateDarkModeIcon(isDarkMode);
+    }
+  });
+
+  function setDarkMode(isDark) {
+    if (isDark) {
+      document.body.classList.add('dark-mode');
+    } else {
+      document.body.classList.remove('dark-mode');
+    }
+  }
+
+  function updateDarkModeIcon(isDark) {
+    const icon = darkModeToggle.querySelector('i');
+    if (isDark) {
+      icon.className = 'fas fa-sun';
+    } else {
+      icon.className = 'fas fa-moon';
+    }
+  }
+});
+
+// Add event listeners for timeframe buttons
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('[data-timeframe]').forEach(btn => {
+        btn.addEventListener('click', function() {
+            const timeframe = this.dataset.timeframe;
+            loadTrendsData(timeframe);
+        });
+    });
+});
+// Enhanced Dark mode functionality
+document.addEventListener('DOMContentLoaded', function() {
+  const darkModeToggle = document.getElementById('darkModeToggle');
+  const prefersDarkScheme = window.matchMedia('(prefers-color-scheme: dark)');
+  const savedMode = localStorage.getItem('darkMode');
+
+  // Set initial mode based on saved preference or system preference
+  let isDarkMode = savedMode ? savedMode === 'true' : prefersDarkScheme.matches;
+
+  // Apply the mode
+  setDarkMode(isDarkMode);
+
+  // Update button icon
+  updateDarkModeIcon(isDarkMode);
+
+  // Toggle handler
+  darkModeToggle.addEventListener('click', function() {
+    isDarkMode = !isDarkMode;
+    setDarkMode(isDarkMode);
+    updateDarkModeIcon(isDarkMode);
+    localStorage.setItem('darkMode', isDarkMode);
+  });
+
+  // Listen for system preference changes
+  prefersDarkScheme.addEventListener('change', e => {
+    if (localStorage.getItem('darkMode') === null) {
+      isDarkMode = e.matches;
+      setDarkMode(isDarkMode);
+      updateDarkModeIcon(isDarkMode);
+    }
+  });
+
+  function setDarkMode(isDark) {
+    if (isDark) {
+      document.body.classList.add('dark-mode');
+      // Update Chart.js charts if they exist
+      updateChartsForDarkMode();
+    } else {
+      document.body.classList.remove('dark-mode');
+      // Revert Chart.js charts to light mode
+      updateChartsForLightMode();
+    }
+  }
+
+  function updateDarkModeIcon(isDark) {
+    darkModeToggle.innerHTML = isDark ?
+      '<i class="fas fa-sun"></i>' :
+      '<i class="fas fa-moon"></i>';
+  }
+
+  function updateChartsForDarkMode() {
+    // This would update chart colors for dark mode
+    // You can implement this if you're using Chart.js
+  }
+
+  function updateChartsForLightMode() {
+    // This would revert chart colors for light mode
+  }
+});
+// Function to remove a shared task from user's view
+function removeSharedTask(taskId, taskTitle) {
+    // Confirmation dialog
+    Swal.fire({
+        title: 'Remove Shared Task?',
+        text: `Are you sure you want to remove "${taskTitle}" from your shared tasks? This will not delete the actual task.`,
+        icon: 'question',
+        showCancelButton: true,
+        confirmButtonColor: '#d33',
+        cancelButtonColor: '#3085d6',
+        confirmButtonText: 'Yes, remove it!'
+    }).then((result) => {
+        if (result.isConfirmed) {
+            // Get CSRF token
+            const csrfToken = document.querySelector('input[name="csrf_token"]')?.value;
+
+            fetch(`/tasks/shared/${taskId}/remove`, {
+                method: 'DELETE',
+                headers: {
+                    'X-CSRFToken': csrfToken,
+                    'Content-Type': 'application/json'
+                }
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.error) {
+                    Swal.fire('Error', data.error, 'error');
+                } else {
+                    // Show success message
+                    Swal.fire({
+                        toast: true,
+                        position: 'top-end',
+                        icon: 'success',
+                        title: 'Task removed from your shared list',
+                        showConfirmButton: false,
+                        timer: 3000
+                    });
+
+                    // Drop the row, other tabs get the same task_unshared event
+                    applyTaskEvent('task_unshared', [{ _id: taskId }]);
+                }
+            })
+            .catch(error => {
+                console.error('Error removing shared task:', error);
+                Swal.fire('Error', 'Failed to remove task: ' + error.message, 'error');
+            });
+        }
+    });
+}
@@ -0,0 +1,809 @@
+    function showDetails(task) {
+    const modalBody = document.getElementById("modalBody");
+
+    // Show loading state
+    modalBody.innerHTML = `
+        <div class="text-center py-4">
+            <div class="spinner-border" role="status">
+                <span class="visually-hidden">Loading...</span>
+            </div>
+            <p class="mt-2">Loading task details...</p>
+        </div>
+    `;
+
+    // Rows only carry the list fields, fetch the full task together with its attachments
+    Promise.all([
+        fetch(`/api/tasks/${task.id}`).then(response => response.json()),
+        fetch(`/tasks/${task.id}/attachments`).then(response => response.json())
+    ])
+    .then(([details, attachments]) => {
+        task = { ...task, ...details, id: task.id };
+        const attachmentsHtml = attachments.length > 0 ? `
+            <div class="mt-4">
+                <h6>Attachments (${attachments.length})</h6>
+                <div class="list-group">
+                    ${attachments.map(att => `
+                        <div class="list-group-item d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-file me-2"></i>
+                                <a href="/tasks/${task.id}/attachments/${att.filename}"
+                                   download="${att.original_name}"
+                                   class="text-decoration-none">
+                                    ${att.original_name}
+                                </a>
+                                <small class="d-block text-muted">${formatFileSize(att.size)} • ${new Date(att.uploaded_at).toLocaleDateString()}</small>
+                            </div>
+                            <button class="btn btn-sm btn-outline-danger" onclick="deleteAttachment('${task.id}', '${att.filename}', '${att.original_name}')">
+                                <i class="fas fa-trash"></i>
+                            </button>
+                        </div>
+                    `).join('')}
+                </div>
+            </div>
+        ` : `
+            <div class="mt-4">
+                <p class="text-muted">No attachments</p>
+            </div>
+        `;
+
+        // Create the main task details HTML
+        modalBody.innerHTML = `
+            <div class="task-details">
+                <div class="row">
+                    <div class="col-md-6">
+                        <p><strong>Title:</strong> ${task.title}</p>
+                        <p><strong>Status:</strong> <span class="badge bg-info">${task.status}</span></p>
+                        <p><strong>Deadline:</strong> ${task.deadline || 'No deadline'}</p>
+                    </div>
+                    <div class="col-md-6">
+                        <p><strong>Created At:</strong> ${task.created_at ? new Date(task.created_at).toLocaleString() : 'Unknown'}</p>
+                        ${task.updated_at ? `<p><strong>Last Updated:</strong> ${new Date(task.updated_at).toLocaleString()}</p>` : ''}
+                    </div>
+                </div>
+
+                <div class="mt-3">
+                    <strong>Description:</strong>
+                    <div class="border p-3 mt-1 rounded bg-light">
+                        ${task.description || 'No description'}
+                    </div>
+                </div>
+
+                ${attachmentsHtml}
+
+                <!-- File Upload Form -->
+<div class="mt-4">
+    <h6>Add Attachment</h6>
+    <form id="uploadForm" enctype="multipart/form-data">
+        <div class="input-group">
+            <input type="file" class="form-control" id="fileInput" name="file" required>
+            <button class="btn btn-primary" type="submit" id="uploadButton">
+                <i class="fas fa-upload"></i> Upload
+            </button>
+        </div>
+        <small class="form-text text-muted">
+            Max file size: 16MB. Allowed types: txt, pdf, png, jpg, jpeg, gif, doc, docx, zip
+        </small>
+
+        <!-- Progress Bar Container (Initially hidden) -->
+        <div id="uploadProgressContainer" class="mt-2" style="display: none;">
+            <div class="d-flex justify-content-between">
+                <small>Uploading...</small>
+                <small id="uploadPercentage">0%</small>
+            </div>
+            <div class="progress" style="height: 20px;">
+                <div id="uploadProgressBar" class="progress-bar progress-bar-striped progress-bar-animated"
+                     role="progressbar" style="width: 0%" aria-valuenow="0" aria-valuemin="0" aria-valuemax="100">
+                </div>
+            </div>
+        </div>
+    </form>
+</div>
+            </div>
+        `;
+
+        // Add event listener for file upload
+document.getElementById('uploadForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+    uploadAttachment(task.id);
+});
+    })
+    .catch(error => {
+        console.error('Error loading attachments:', error);
+        modalBody.innerHTML = `
+            <div class="alert alert-danger">
+                Error loading task details. Please try again.
+            </div>
+        `;
+    });
+
+    const myModal = new bootstrap.Modal(document.getElementById('taskModal'));
+    myModal.show();
+}
+
+// Helper function to format file size
+function formatFileSize(bytes) {
+    if (bytes === 0) return '0 Bytes';
+    const k = 1024;
+    const sizes = ['Bytes', 'KB', 'MB', 'GB'];
+    const i = Math.floor(Math.log(bytes) / Math.log(k));
+    return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
+}
+// Function to upload attachment
+// Function to upload attachment
+// Function to upload attachment with progress bar
+function uploadAttachment(taskId) {
+    const fileInput = document.getElementById('fileInput');
+    const file = fileInput.files[0];
+    const uploadBtn = document.getElementById('uploadButton');
+    const progressContainer = document.getElementById('uploadProgressContainer');
+    const progressBar = document.getElementById('uploadProgressBar');
+    const percentageText = document.getElementById('uploadPercentage');
+
+    if (!file) {
+        alert('Please select a file to upload');
+        return;
+    }
+
+    // Get CSRF token
+    const csrfToken = document.querySelector('input[name="csrf_token"]').value;
+
+    // Show progress bar, disable button
+    progressContainer.style.display = 'block';
+    uploadBtn.disabled = true;
+    const originalBtnText = uploadBtn.innerHTML;
+    uploadBtn.innerHTML = '<span class="spinner-border spinner-border-sm" role="status"></span> Uploading...';
+
+    // Reset progress bar
+    progressBar.style.width = '0%';
+    progressBar.setAttribute('aria-valuenow', 0);
+    percentageText.textContent = '0%';
+
+    // Create FormData and XMLHttpRequest for progress tracking
+    const formData = new FormData();
+    formData.append('file', file);
+
+    const xhr = new XMLHttpRequest();
+
+    // Progress event handler
+    xhr.upload.addEventListener('progress', function(e) {
+        if (e.lengthComputable) {
+            const percentComplete = (e.loaded / e.total) * 100;
+            const percentRounded = Math.round(percentComplete);
+
+            // Update progress bar
+            progressBar.style.width = percentComplete + '%';
+            progressBar.setAttribute('aria-valuenow', percentComplete);
+            percentageText.textContent = percentRounded + '%';
+
+            // Change color when complete
+            if (percentComplete === 100) {
+                progressBar.classList.remove('progress-bar-animated');
+            }
+        }
+    });
+
+    // Load event handler (when upload completes)
+    xhr.addEventListener('load', function() {
+        if (xhr.status === 200) {
+            const response = JSON.parse(xhr.responseText);
+
+            if (response.error) {
+                // Show error
+                progressBar.classList.add('bg-danger');
+                percentageText.textContent = 'Error!';
+                Swal.fire('Error', response.error, 'error');
+            } else {
+                // Show success
+                progressBar.classList.add('bg-success');
+                percentageText.textContent = 'Complete!';
+
+                // Close modal and show success message
+                const currentModal = bootstrap.Modal.getInstance(document.getElementById('taskModal'));
+                currentModal.hide();
+
+                Swal.fire({
+                    toast: true,
+                    position: 'top-end',
+                    icon: 'success',
+                    title: 'File uploaded successfully!',
+                    showConfirmButton: false,
+                    timer: 3000
+                });
+
+                // Reopen modal after delay to refresh content
+                setTimeout(() => {
+                    const task = { id: taskId };
+                    showDetails(task);
+                }, 1000);
+            }
+        } else {
+            // Handle HTTP errors
+            progressBar.classList.add('bg-danger');
+            percentageText.textContent = 'Upload failed!';
+            Swal.fire('Error', 'Upload failed: ' + xhr.statusText, 'error');
+        }
+
+        // Re-enable button after a delay
+        setTimeout(() => {
+            uploadBtn.disabled = false;
+            uploadBtn.innerHTML = originalBtnText;
+        }, 2000);
+    });
+
+    // Error event handler
+    xhr.addEventListener('error', function() {
+        progressBar.classList.add('bg-danger');
+        percentageText.textContent = 'Upload failed!';
+        Swal.fire('Error', 'Upload failed. Please try again.', 'error');
+
+        uploadBtn.disabled = false;
+        uploadBtn.innerHTML = originalBtnText;
+    });
+
+    // Open and send the request
+    xhr.open('POST', `/tasks/${taskId}/attachments`);
+    xhr.setRequestHeader('X-CSRFToken', csrfToken);
+    xhr.send(formData);
+}
+// Function to delete attachment
+function deleteAttachment(taskId, filename, originalName) {
+    if (!confirm(`Are you sure you want to delete "${originalName}"?`)) {
+        return;
+    }
+
+    // Get CSRF token
+    const csrfToken = document.querySelector('input[name="csrf_token"]').value;
+
+    fetch(`/tasks/${taskId}/attachments/${filename}`, {
+        method: 'DELETE',
+        headers: {
+            'X-CSRFToken': csrfToken,
+            'Content-Type': 'application/json'
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.error) {
+            alert('Error: ' + data.error);
+        } else {
+            // Refresh the task details
+            const task = { id: taskId };
+            showDetails(task);
+            // Show success message using Swal directly
+            Swal.fire({
+                toast: true,
+                position: 'top-end',
+                icon: 'success',
+                title: 'Attachment deleted successfully!',
+                showConfirmButton: false,
+                timer: 3000
+            });
+        }
+    })
+    .catch(error => {
+        console.error('Error deleting attachment:', error);
+        alert('Error deleting attachment: ' + error.message);
+    });
+}
+    function confirmDelete(taskTitle) {
+      return confirm(`Are you sure you want to delete "${taskTitle}"?`);
+    }
+
+    // Update the DOMContentLoaded event for task highlighting
+document.addEventListener('DOMContentLoaded', function() {
+    const rows = document.querySelectorAll("table tbody tr");
+    const now = new Date();
+
+    rows.forEach(row => {
+        const deadlineText = row.children[1].innerText.trim();
+        if (!deadlineText) return;
+
+        const deadline = new Date(deadlineText);
+        const timeDiff = deadline - now;
+        const daysDiff = Math.ceil(timeDiff / (1000 * 60 * 60 * 24));
+
+        // Add visual indicators based on urgency
+        if (daysDiff < 0) {
+            // Past due - most urgent
+            row.style.backgroundColor = "#ffcccc";
+            row.children[1].innerHTML += ' <span class="badge bg-danger">Overdue</span>';
+        } else if (daysDiff === 0) {
+            // Due today
+            row.style.backgroundColor = "#ffe6cc";
+            row.children[1].innerHTML += ' <span class="badge bg-warning text-dark">Due Today</span>';
+        } else if (daysDiff === 1) {
+            // Due tomorrow
+            row.style.backgroundColor = "#ffffcc";
+            row.children[1].innerHTML += ' <span class="badge bg-info">Tomorrow</span>';
+        } else if (daysDiff <= 3) {
+            // Due in 1-3 days
+            row.style.backgroundColor = "#f8f9fa";
+            row.children[1].innerHTML += ` <span class="badge bg-secondary">${daysDiff} days</span>`;
+        }
+
+        // Add tooltip with exact time remaining
+        row.children[1].title = `Due: ${deadline.toLocaleDateString()}`;
+    });
+});
+    function editTask(id) {
+      // Task rows do not carry the description, load the full task first
+      fetch(`/api/tasks/${id}`)
+      .then(response => response.json())
+      .then(task => {
+        if (task.error) {
+          alert('Error: ' + task.error);
+          return;
+        }
+        fillEditModal(id, task.title, task.description, task.deadline, task.status);
+      })
+      .catch(error => console.error('Error loading task:', error));
+    }
+
+    function fillEditModal(id, title, description, deadline, status) {
+      // Format date for input[type=date]
+      let formattedDeadline = '';
+      if (deadline) {
+        const dateParts = deadline.split('-');
+        if (dateParts.length === 3) {
+          formattedDeadline = deadline; // Already in YYYY-MM-DD format
+        } else {
+          // Handle other date formats if needed
+          const dateObj = new Date(deadline);
+          formattedDeadline = dateObj.toISOString().split('T')[0];
+        }
+      }
+
+      document.getElementById("editTaskId").value = id;
+      document.getElementById("editTaskTitle").value = title;
+      document.getElementById("editTaskDescription").value = description;
+      document.getElementById("editTaskDeadline").value = formattedDeadline;
+      document.getElementById("editTaskStatus").value = status;
+
+      new bootstrap.Modal(document.getElementById("editModal")).show();
+    }
+
+    function closePopup() {
+      document.getElementById('errorPopup').style.display = 'none';
+    }
+
+    document.addEventListener('DOMContentLoaded', function() {
+      document.querySelector('form[action="/add_task"]').addEventListener('submit', function(e) {
+        e.preventDefault(); // Always prevent default first
+
+        const form = e.target;
+        const title = form.querySelector('#title').value.trim();
+        const description = form.querySelector('#description').value.trim();
+        const deadline = form.querySelector('#deadline').value;
+        const submitBtn = form.querySelector('button[type="submit"]');
+
+        // Validate inputs
+        let isValid = true;
+
+        if (!title) {
+          showToast('error', 'Task title is required');
+          isValid = false;
+        }
+
+        if (!description) {
+          showToast('error', 'Task description is required');
+          isValid = false;
+        }
+
+        if (deadline) {
+          const today = new Date();
+          today.setHours(0, 0, 0, 0);
+          const deadlineDate = new Date(deadline);
+          deadlineDate.setHours(0, 0, 0, 0);
+
+          if (deadlineDate < today) {
+            showToast('error', 'Deadline cannot be in the past');
+            isValid = false;
+          }
+        }
+
+        // Only submit if valid
+        if (isValid) {
+          submitBtn.disabled = true;
+          submitBtn.innerHTML = '<span class="spinner-border spinner-border-sm" role="status" aria-hidden="true"></span> Submitting...';
+          form.submit(); // Manually submit if valid
+        }
+      });
+    });
+
+    function showToast(type, message) {
+      const Toast = Swal.mixin({
+        toast: true,
+        position: 'top-end',
+        showConfirmButton: false,
+        timer: 3000,
+        timerProgressBar: true,
+        didOpen: (toast) => {
+          toast.addEventListener('mouseenter', Swal.stopTimer);
+          toast.addEventListener('mouseleave', Swal.resumeTimer);
+        }
+      });
+
+      Toast.fire({
+        icon: type,
+        title: message
+      });
+    }
+
+    let currentTaskId = '';
+
+    function openShareModal(taskId, taskTitle) {
+      currentTaskId = taskId;
+      document.getElementById('shareTaskTitle').textContent = taskTitle;
+      document.getElementById('shareUsername').value = '';
+      new bootstrap.Modal(document.getElementById('shareModal')).show();
+    }
+
+    function shareTask() {
+    const username = document.getElementById('shareUsername').value.trim();
+
+    if (!username) {
+        alert('Please enter a username');
+        return;
+    }
+
+    console.log('Sharing task:', currentTaskId, 'with user:', username);
+
+    // Get CSRF token from the form - FIXED SELECTOR
+    const csrfToken = document.querySelector('input[name="csrf_token"]')?.value;
+
+    if (!csrfToken) {
+        alert('Error: CSRF token not found. Please try again.');
+        return;
+    }
+
+    console.log('CSRF Token found:', csrfToken ? 'Yes' : 'No');
+
+    // Create form data
+    const formData = new FormData();
+    formData.append('username', username);
+    formData.append('csrf_token', csrfToken);
+
+    fetch(`/tasks/${currentTaskId}/share`, {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': csrfToken
+        }
+    })
+    .then(response => {
+        console.log('Response status:', response.status);
+        if (!response.ok) {
+            throw new Error(`Server returned ${response.status}`);
+        }
+        return response.json();
+    })
+    .then(data => {
+        console.log('Response data:', data);
+        if (data.error) {
+            alert('Error: ' + data.error);
+        } else {
+            // Use SweetAlert for better notification
+            Swal.fire({
+                icon: 'success',
+                title: 'Success',
+                text: data.message,
+                timer: 3000,
+                showConfirmButton: false
+            });
+
+            // Close the modal
+            const shareModal = bootstrap.Modal.getInstance(document.getElementById('shareModal'));
+            if (shareModal) {
+                shareModal.hide();
+            }
+        }
+    })
+    .catch(error => {
+        console.error('Fetch error:', error);
+        alert('Error sharing task: ' + error.message);
+    });
+}
+    // Ids of the tasks shared with the user, kept current by task events
+    const sharedTaskIds = new Set();
+    let sharedTasksLoaded = false;
+
+    function sharedTaskRow(task) {
+      return `
+          <tr data-task-id="${task.id}">
+            <td><strong>${task.title}</strong></td>
+            <td>${task.deadline || 'No deadline'}</td>
+            <td><span class="badge bg-info">${task.status}</span></td>
+            <td>${task.owner}</td>
+            <td>
+  <div class="d-flex gap-2">  <!-- This creates spacing between buttons -->
+    <button class="btn btn-sm btn-info" onclick='showSharedTaskDetails(${JSON.stringify(task)})'>
+      <i class="fas fa-eye me-1"></i> View Details  <!-- me-1 adds space between icon and text -->
+    </button>
+    <button class="btn btn-sm btn-danger" onclick='removeSharedTask("${task.id}", "${task.title}")'>
+      <i class="fas fa-trash me-1"></i> Remove  <!-- me-1 adds space between icon and text -->
+    </button>
+  </div>
+</td>
+          </tr>
+        `;
+    }
+
+    function loadSharedTasks(cursor) {
+      const container = document.getElementById('sharedTasksList');
+      if (!cursor) {
+        // Show loading state
+        container.innerHTML = '<tr><td colspan="5" class="text-center"><div class="spinner-border spinner-border-sm" role="status"></div> Loading shared tasks...</td></tr>';
+      }
+
+      fetch(cursor ? `/tasks/shared?cursor=${encodeURIComponent(cursor)}` : '/tasks/shared')
+      .then(response => response.json().then(tasks => ({ tasks, nextCursor: response.headers.get('X-Next-Cursor') })))
+      .then(({ tasks, nextCursor }) => {
+        document.getElementById('sharedTasksLoadMore')?.remove();
+        sharedTasksLoaded = true;
+        tasks.forEach(task => sharedTaskIds.add(task.id));
+        if (!cursor && tasks.length === 0) {
+          container.innerHTML = '<tr><td colspan="5" class="text-center">No tasks shared with you yet.</td></tr>';
+          return;
+        }
+
+        const rows = tasks.map(sharedTaskRow).join('');
+
+        if (cursor) {
+          container.insertAdjacentHTML('beforeend', rows);
+        } else {
+          container.innerHTML = rows;
+        }
+        if (nextCursor) {
+          container.insertAdjacentHTML('beforeend', `
+            <tr id="sharedTasksLoadMore">
+              <td colspan="5" class="text-center">
+                <button class="btn btn-sm btn-outline-primary" onclick="loadSharedTasks('${nextCursor}')">Load more</button>
+              </td>
+            </tr>
+          `);
+        }
+      })
+      .catch(error => {
+        console.error('Error loading shared tasks:', error);
+        container.innerHTML = '<tr><td colspan="5" class="text-center text-danger">Error loading shared tasks</td></tr>';
+      });
+    }
+
+    // Load shared tasks the first time the modal opens, task events keep the list current afterwards
+document.getElementById('sharedTasksModal').addEventListener('show.bs.modal', function () {
+    if (!sharedTasksLoaded) {
+        loadSharedTasks();
+    }
+});
+
+    function showSharedTaskDetails(task) {
+    // First store the shared modal instance
+    const sharedModal = bootstrap.Modal.getInstance(document.getElementById('sharedTasksModal'));
+
+    // Hide the shared modal but don't dispose it
+    sharedModal.hide();
+
+    const modalBody = document.getElementById("modalBody");
+
+    // Show loading state
+    modalBody.innerHTML = `
+        <div class="text-center py-4">
+            <div class="spinner-border" role="status">
+                <span class="visually-hidden">Loading...</span>
+            </div>
+            <p class="mt-2">Loading task details...</p>
+        </div>
+    `;
+
+    // Fetch the full task together with the attachments for this shared task
+    Promise.all([
+        fetch(`/api/tasks/${task.id}`).then(response => response.json()),
+        fetch(`/shared/tasks/${task.id}/attachments`).then(response => response.json())
+    ])
+    .then(([details, attachments]) => {
+        task = { ...task, ...details, id: task.id };
+        const attachmentsHtml = attachments.length > 0 ? `
+            <div class="mt-4">
+                <h6>Attachments (${attachments.length})</h6>
+                <div class="list-group">
+                    ${attachments.map(att => `
+                        <div class="list-group-item d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-file me-2"></i>
+                                <a href="/shared/tasks/${task.id}/attachments/${att.filename}"
+                                   download="${att.original_name}"
+                                   class="text-decoration-none">
+                                    ${att.original_name}
+                                </a>
+                                <small class="d-block text-muted">${formatFileSize(att.size)} • ${new Date(att.uploaded_at).toLocaleDateString()}</small>
+                            </div>
+                            <!-- Shared users can only view, not delete -->
+                        </div>
+                    `).join('')}
+                </div>
+            </div>
+        ` : `
+            <div class="mt-4">
+                <p class="text-muted">No attachments</p>
+            </div>
+        `;
+
+        // Create the main task details HTML
+        modalBody.innerHTML = `
+            <div class="task-details">
+                <div class="row">
+                    <div class="col-md-6">
+                        <p><strong>Title:</strong> ${task.title}</p>
+                        <p><strong>Status:</strong> <span class="badge bg-info">${task.status}</span></p>
+                        <p><strong>Deadline:</strong> ${task.deadline || 'No deadline'}</p>
+                    </div>
+                    <div class="col-md-6">
+                        <p><strong>Created At:</strong> ${task.created_at ? new Date(task.created_at).toLocaleString() : 'Unknown'}</p>
+                        <p><strong>Shared by:</strong> ${task.owner}</p>
+                        ${task.updated_at ? `<p><strong>Last Updated:</strong> ${new Date(task.updated_at).toLocaleString()}</p>` : ''}
+                    </div>
+                </div>
+
+                <div class="mt-3">
+                    <strong>Description:</strong>
+                    <div class="border p-3 mt-1 rounded bg-light">
+                        ${task.description || 'No description'}
+                    </div>
+                </div>
+
+                ${attachmentsHtml}
+
+                <!-- Shared users cannot upload attachments -->
+                <div class="mt-4">
+                    <p class="text-muted small">
+                        <i class="fas fa-info-circle"></i> Only the task owner can add attachments.
+                    </p>
+                </div>
+            </div>
+        `;
+    })
+    .catch(error => {
+        console.error('Error loading shared task attachments:', error);
+        modalBody.innerHTML = `
+            <div class="alert alert-danger">
+                Error loading task details. Please try again.
+            </div>
+        `;
+    });
+
+    const detailsModal = new bootstrap.Modal(document.getElementById('taskModal'));
+    detailsModal.show();
+
+    // When details modal closes, reopen the shared modal
+    document.getElementById('taskModal').addEventListener('hidden.bs.modal', function () {
+        sharedModal.show();
+    }, { once: true });
+}
+    function updateSharedTasksBadge() {
+      fetch('/tasks/shared')
+      .then(response => response.json())
+      .then(tasks => {
+        tasks.forEach(task => sharedTaskIds.add(task.id));
+        renderSharedTasksBadge();
+      });
+    }
+
+    function renderSharedTasksBadge() {
+      const badge = document.getElementById('sharedTasksBadge');
+      if (sharedTaskIds.size > 0) {
+        badge.style.display = 'block';
+        badge.textContent = sharedTaskIds.size;
+      } else {
+        badge.style.display = 'none';
+      }
+    }
+
+    // Patch the dashboard rows and the shared tasks list from a task delta event
+    function applyTaskEvent(event, tasks) {
+      const userId = document.body.dataset.userId;
+      const statusFilter = new URL(window.location.href).searchParams.get('status');
+      const sharedList = document.getElementById('sharedTasksList');
+
+      tasks.forEach(task => {
+        const row = document.querySelector(`#taskTableBody tr[data-task-id="${task._id}"]`);
+        const sharedRow = sharedList.querySelector(`tr[data-task-id="${task._id}"]`);
+
+        if (event === 'task_updated') {
+          if (row) {
+            if (statusFilter && statusFilter !== 'all' && task.status !== undefined && task.status !== statusFilter) {
+              row.remove();
+            } else {
+              if (task.title !== undefined) row.cells[0].textContent = task.title;
+              if (task.deadline !== undefined) row.cells[1].textContent = task.deadline || '';
+              if (task.status !== undefined) row.cells[2].textContent = task.status;
+            }
+          }
+          if (sharedRow) {
+            if (task.title !== undefined) sharedRow.cells[0].querySelector('strong').textContent = task.title;
+            if (task.deadline !== undefined) sharedRow.cells[1].textContent = task.deadline || 'No deadline';
+            if (task.status !== undefined) sharedRow.cells[2].querySelector('.badge').textContent = task.status;
+          }
+        } else if (event === 'task_deleted' || event === 'task_unshared') {
+          row?.remove();
+          sharedRow?.remove();
+          sharedTaskIds.delete(task._id);
+        } else if (event === 'task_shared' && task.user_id !== userId) {
+          sharedTaskIds.add(task._id);
+          if (sharedTasksLoaded && !sharedRow) {
+            if (!sharedList.querySelector('tr[data-task-id]')) {
+              sharedList.innerHTML = '';
+            }
+            sharedList.insertAdjacentHTML('afterbegin', sharedTaskRow(task));
+          }
+        }
+        // task_created needs no patch, the dashboard is rendered by the server on the next load
+      });
+      renderSharedTasksBadge();
+    }
+
+    // Update badge when page loads
+    document.addEventListener('DOMContentLoaded', function() {
+      updateSharedTasksBadge();
+    });
+
+    document.getElementById('toggleTaskForm').addEventListener('click', function() {
+      const formContainer = document.getElementById('taskFormContainer');
+      const buttonText = document.getElementById('toggleButtonText');
+
+      if (formContainer.style.display === 'none' || !formContainer.style.display) {
+        formContainer.style.display = 'block';
+        buttonText.textContent = 'Hide Form';
+        this.querySelector('i').className = 'fas fa-minus';
+      } else {
+        formContainer.style.display = 'none';
+        buttonText.textContent = 'Add New Task';
+        this.querySelector('i').className = 'fas fa-plus';
+      }
+    });
+
+    document.addEventListener('DOMContentLoaded', function() {
+      // Store the selected filter in session when a filter button is clicked
+      document.querySelectorAll('.status-filters a').forEach(link => {
+        link.addEventListener('click', function(e) {
+          const filter = new URL(this.href).searchParams.get('status');
+          // Store in session storage
+          sessionStorage.setItem('lastFilter', filter);
+        });
+      });
+
+      // Highlight the active filter button
+      const currentFilter = new URL(window.location.href).searchParams.get('status');
+      if (currentFilter) {
+        const activeButton = document.querySelector(`.status-filters a[href*="status=${currentFilter}"]`);
+        if (activeButton) {
+          // Remove outline classes and add solid ones
+          activeButton.classList.remove('btn-outline-primary', 'btn-outline-warning', 'btn-outline-info', 'btn-outline-success');
+          if (currentFilter === 'all') activeButton.classList.add('btn-primary');
+          else if (currentFilter === 'Pending') activeButton.classList.add('btn-warning');
+          else if (currentFilter === 'In Progress') activeButton.classList.add('btn-info');
+          else if (currentFilter === 'Completed') activeButton.classList.add('btn-success');
+        }
+      }
+    });
+
+    document.addEventListener('DOMContentLoaded', function() {
+      // This is now handled server-side, so we can remove the client-side search
+      // or keep it for instant filtering of already loaded results
+
+      // Optional: Client-side filtering for better UX
+      const searchInput = document.querySelector('input[name="search"]');
+      if (searchInput) {
+        searchInput.addEventListener('input', function() {
+          const filter = this.value.toLowerCase();
+          const rows = document.querySelectorAll("tbody tr");
+
+          rows.forEach(row => {
+            const titleCell = row.querySelector("td:nth-child(1)");
+            if (titleCell) {
+              const titleText = titleCell.textContent.toLowerCase();
+              row.style.display = titleText.includes(filter) ? "" : "none";
+            }
+          });
+        });
+      }
+    });
@@ -0,0 +1,463 @@
+// Latest notifications, fetched once and then patched by Socket.IO delta events
+const NOTIFICATION_CACHE_SIZE = 50;
+let notificationsCache = null;
+let notificationsRequest = null;
+
+function getNotifications() {
+    if (notificationsCache) return Promise.resolve(notificationsCache);
+    if (!notificationsRequest) {
+        notificationsRequest = fetch('/notifications/all')
+        .then(response => {
+            if (!response.ok) throw new Error('Failed to load notifications');
+            return response.json();
+        })
+        .then(notifications => {
+            notificationsCache = notifications;
+            return notifications;
+        })
+        .finally(() => {
+            notificationsRequest = null;
+        });
+    }
+    return notificationsRequest;
+}
+
+// Apply a notification delta to the cache and redraw the dropdown and the management modal.
+// Events are idempotent, so the tab that made a change can apply it before its own event arrives.
+function applyNotificationEvent(event, data) {
+    // Nothing to patch until the list was first opened
+    if (!notificationsCache) return;
+
+    if (event === 'notification_created') {
+        if (!notificationsCache.some(notif => notif._id === data._id)) {
+            notificationsCache.unshift(data);
+            notificationsCache.length = Math.min(notificationsCache.length, NOTIFICATION_CACHE_SIZE);
+        }
+    } else if (event === 'notification_read') {
+        notificationsCache.forEach(notif => {
+            if (notif._id === data._id) notif.is_read = true;
+        });
+    } else if (event === 'notifications_read_all') {
+        notificationsCache.forEach(notif => { notif.is_read = true; });
+    } else if (event === 'notification_deleted') {
+        notificationsCache = notificationsCache.filter(notif => notif._id !== data._id);
+    } else if (event === 'notifications_cleared') {
+        notificationsCache = [];
+    }
+
+    loadNotifications();
+    if (document.getElementById('manageNotificationsModal').classList.contains('show')) {
+        loadAllNotificationsToModal();
+    }
+}
+
+// Load and display notifications
+function loadNotifications(limit = 4) {
+    getNotifications()
+    .then(notifications => {
+        const container = document.getElementById('notificationList');
+
+        // Display notifications (limited)
+        const displayNotifications = notifications.slice(0, limit);
+
+        if (displayNotifications.length === 0) {
+            container.innerHTML = '<div class="text-center py-3 text-muted">No notifications</div>';
+            return;
+        }
+
+        container.innerHTML = displayNotifications.map(notif => `
+            <div class="notification-item mb-2 p-2 border-start border-3 border-${notif.type} ${notif.is_read ? '' : 'bg-light'}">
+                <div class="d-flex justify-content-between align-items-start">
+                    <div class="flex-grow-1">
+                        <small class="d-block">${notif.message}</small>
+                        <small class="text-muted">${new Date(notif.created_at).toLocaleString()}</small>
+                    </div>
+                    ${!notif.is_read ? `
+<button class="btn btn-sm btn-outline-secondary ms-2" onclick="markAsRead('${notif._id}', this)">
+    <i class="fas fa-check"></i>
+</button>` : ''}
+                </div>
+            </div>
+        `).join('');
+    })
+    .catch(error => {
+        console.error('Error loading notifications:', error);
+        const container = document.getElementById('notificationList');
+        container.innerHTML = '<div class="text-center py-3 text-danger">Error loading notifications</div>';
+    });
+}
+
+// Load all notifications (for "View All" button)
+function loadAllNotifications() {
+    // Close the dropdown first
+    const dropdown = new bootstrap.Dropdown(document.getElementById('notificationDropdown'));
+    dropdown.hide();
+
+    // Show all notifications in a modal or separate page
+    getNotifications()
+    .then(notifications => {
+        if (notifications.length === 0) {
+            alert('No notifications');
+            return;
+        }
+
+        // Create a simple alert with all notifications
+        const notificationText = notifications.map(notif =>
+            `• ${notif.message} (${new Date(notif.created_at).toLocaleString()})`
+        ).join('\n');
+
+        Swal.fire({
+            title: 'All Notifications',
+            text: notificationText,
+            scrollbarPadding: false,
+            width: '80%',
+            customClass: {
+                popup: 'notification-popup'
+            }
+        });
+    })
+    .catch(error => {
+        console.error('Error loading all notifications:', error);
+        alert('Error loading notifications');
+    });
+}
+
+// Mark notification as read (updated for both views)
+function markAsRead(notificationId, element) {
+    // Get CSRF token
+    const csrfToken = document.querySelector('input[name="csrf_token"]')?.value;
+
+    if (!csrfToken) {
+        console.error('CSRF token not found');
+        return;
+    }
+
+    // Show loading state
+    let targetElement = element;
+    if (element && element.tagName === 'BUTTON') {
+        targetElement = element.parentNode.parentNode;
+    }
+
+    if (targetElement) {
+        const originalHtml = targetElement.innerHTML;
+        targetElement.innerHTML = '<td colspan="4" class="text-center"><div class="spinner-border spinner-border-sm"></div></td>';
+    }
+
+    fetch(`/notifications/${notificationId}/read`, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': csrfToken,
+            'Content-Type': 'application/json'
+        }
+    })
+    .then(response => {
+        if (!response.ok) throw new Error('Failed to mark as read');
+        return response.json();
+    })
+    .then(data => {
+        // Also when success is false, the notification was already read elsewhere
+        applyNotificationEvent('notification_read', { _id: notificationId });
+    })
+    .catch(error => {
+        console.error('Error marking notification as read:', error);
+        if (targetElement && targetElement.tagName === 'TR') {
+            // Reload the modal content on error
+            loadAllNotificationsToModal();
+        }
+    });
+}
+// Only the unread count is needed on page load, the list is fetched when the dropdown opens
+document.addEventListener('DOMContentLoaded', function() {
+    updateNotificationBadge();
+
+    // Load notifications when dropdown opens
+    document.getElementById('notificationDropdown').addEventListener('show.bs.dropdown', function () {
+        loadNotifications();
+    });
+});
+
+// Load all notifications (for "View All" button)
+function loadAllNotifications() {
+    // Close the dropdown first
+    const dropdown = new bootstrap.Dropdown(document.getElementById('notificationDropdown'));
+    dropdown.hide();
+
+    // Show all notifications in a modal
+    getNotifications()
+    .then(notifications => {
+        if (notifications.length === 0) {
+            Swal.fire({
+                title: 'All Notifications',
+                html: '<div class="text-center py-3 text-muted">No notifications found</div>',
+                confirmButtonText: 'Close'
+            });
+            return;
+        }
+
+        // Create formatted HTML for notifications
+        const notificationsHtml = `
+            <div class="notifications-container" style="max-height: 60vh; overflow-y: auto;">
+                ${notifications.map(notif => `
+                    <div class="notification-item p-3 border-bottom">
+                        <div class="d-flex justify-content-between align-items-start">
+                            <div class="flex-grow-1">
+                                <p class="mb-1">${notif.message}</p>
+                                <small class="text-muted">${new Date(notif.created_at).toLocaleString()}</small>
+                            </div>
+                            <span class="badge bg-${notif.type} ms-2">${notif.type}</span>
+                        </div>
+                    </div>
+                `).join('')}
+            </div>
+        `;
+
+        Swal.fire({
+            title: 'All Notifications',
+            html: notificationsHtml,
+            width: '600px',
+            showCloseButton: true,
+            showConfirmButton: false,
+            customClass: {
+                popup: 'notification-popup'
+            }
+        });
+    })
+    .catch(error => {
+        console.error('Error loading all notifications:', error);
+        Swal.fire({
+            title: 'Error',
+            text: 'Failed to load notifications',
+            icon: 'error',
+            confirmButtonText: 'Close'
+        });
+    });
+}
+// Function to delete a single notification (updated for both views)
+function deleteNotification(notificationId, element) {
+    // Get CSRF token
+    const csrfToken = document.querySelector('input[name="csrf_token"]')?.value;
+
+    if (!csrfToken) {
+        console.error('CSRF token not found');
+        return;
+    }
+
+    // Show loading state
+    let targetElement = element;
+    if (element && element.tagName === 'BUTTON') {
+        targetElement = element.parentNode.parentNode;
+    }
+
+    if (targetElement) {
+        const originalHtml = targetElement.innerHTML;
+        targetElement.innerHTML = '<td colspan="4" class="text-center"><div class="spinner-border spinner-border-sm"></div></td>';
+    }
+
+    fetch(`/notifications/${notificationId}`, {
+        method: 'DELETE',
+        headers: {
+            'X-CSRFToken': csrfToken,
+            'Content-Type': 'application/json'
+        }
+    })
+    .then(response => {
+        if (!response.ok) throw new Error('Failed to delete notification');
+        return response.json();
+    })
+    .then(data => {
+        if (data.error) {
+            alert('Error: ' + data.error);
+            return;
+        }
+
+        // Remove from the dropdown and the modal
+        applyNotificationEvent('notification_deleted', { _id: notificationId });
+
+        // Show success message
+        Swal.fire({
+            toast: true,
+            position: 'top-end',
+            icon: 'success',
+            title: 'Notification deleted successfully!',
+            showConfirmButton: false,
+            timer: 3000
+        });
+    })
+    .catch(error => {
+        console.error('Error deleting notification:', error);
+        alert('Error deleting notification: ' + error.message);
+        if (targetElement && targetElement.tagName === 'TR') {
+            // Reload the modal content on error
+            loadAllNotificationsToModal();
+        }
+    });
+}
+// Function to mark all notifications as read
+function markAllAsRead() {
+    // Get CSRF token
+    const csrfToken = document.querySelector('input[name="csrf_token"]')?.value;
+
+    // Show loading state
+    const markAllBtn = document.querySelector('#manageNotificationsModal .btn-success');
+    const originalHtml = markAllBtn.innerHTML;
+    markAllBtn.innerHTML = '<span class="spinner-border spinner-border-sm" role="status"></span> Processing...';
+    markAllBtn.disabled = true;
+
+    fetch('/notifications/read_all', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': csrfToken,
+            'Content-Type': 'application/json'
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.error) {
+            alert('Error: ' + data.error);
+        } else {
+            // Show success message
+            Swal.fire({
+                toast: true,
+                position: 'top-end',
+                icon: 'success',
+                title: `Marked ${data.modified_count || 0} notifications as read`,
+                showConfirmButton: false,
+                timer: 3000
+            });
+
+            // Update both dropdown and modal
+            applyNotificationEvent('notifications_read_all', {});
+        }
+    })
+    .catch(error => {
+        console.error('Error marking all as read:', error);
+        alert('Error marking all as read: ' + error.message);
+    })
+    .finally(() => {
+        // Restore button state
+        markAllBtn.innerHTML = originalHtml;
+        markAllBtn.disabled = false;
+    });
+}
+
+// Function to delete all notifications
+function deleteAllNotifications() {
+    // Confirmation dialog first
+    Swal.fire({
+        title: 'Are you sure?',
+        text: "This will delete all your notifications. This action cannot be undone.",
+        icon: 'warning',
+        showCancelButton: true,
+        confirmButtonColor: '#d33',
+        cancelButtonColor: '#3085d6',
+        confirmButtonText: 'Yes, delete all!'
+    }).then((result) => {
+        if (result.isConfirmed) {
+            // Get CSRF token
+            const csrfToken = document.querySelector('input[name="csrf_token"]')?.value;
+
+            // Show loading state
+            const deleteAllBtn = document.querySelector('#manageNotificationsModal .btn-danger');
+            const originalHtml = deleteAllBtn.innerHTML;
+            deleteAllBtn.innerHTML = '<span class="spinner-border spinner-border-sm" role="status"></span> Processing...';
+            deleteAllBtn.disabled = true;
+
+            fetch('/notifications/delete_all', {
+                method: 'DELETE',
+                headers: {
+                    'X-CSRFToken': csrfToken,
+                    'Content-Type': 'application/json'
+                }
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.error) {
+                    alert('Error: ' + data.error);
+                } else {
+                    // Show success message
+                    Swal.fire({
+                        toast: true,
+                        position: 'top-end',
+                        icon: 'success',
+                        title: `Deleted ${data.deleted_count || 0} notifications`,
+                        showConfirmButton: false,
+                        timer: 3000
+                    });
+
+                    // Update both dropdown and modal
+                    applyNotificationEvent('notifications_cleared', {});
+                }
+            })
+            .catch(error => {
+                console.error('Error deleting all notifications:', error);
+                alert('Error deleting all notifications: ' + error.message);
+            })
+            .finally(() => {
+                // Restore button state
+                deleteAllBtn.innerHTML = originalHtml;
+                deleteAllBtn.disabled = false;
+            });
+        }
+    });
+}
+// Helper function to update the notification badge count
+function updateNotificationBadge() {
+    fetch('/notifications/unread_count')
+    .then(response => {
+        if (!response.ok) throw new Error('Failed to load unread count');
+        return response.json();
+    })
+    .then(data => renderNotificationBadge(data.count))
+    .catch(error => console.error('Error loading unread count:', error));
+}
+
+// Pushed as unread_count events whenever the counter changes
+function renderNotificationBadge(unreadCount) {
+    const badge = document.getElementById('notificationBadge');
+    if (unreadCount > 0) {
+        badge.style.display = 'block';
+        badge.textContent = unreadCount > 99 ? '99+' : unreadCount;
+    } else {
+        badge.style.display = 'none';
+    }
+}
+  // Function to load all notifications into the management modal
+function loadAllNotificationsToModal() {
+    const container = document.getElementById('allNotificationsList');
+    if (!notificationsCache) {
+        container.innerHTML = '<tr><td colspan="4" class="text-center py-4"><div class="spinner-border" role="status"></div><p class="mt-2">Loading notifications...</p></td></tr>';
+    }
+
+    getNotifications()
+    .then(notifications => {
+        if (notifications.length === 0) {
+            container.innerHTML = '<tr><td colspan="4" class="text-center py-4 text-muted">No notifications found</td></tr>';
+            return;
+        }
+
+        container.innerHTML = notifications.map(notif => `
+            <tr class="${notif.is_read ? '' : 'table-info'}">
+                <td>${notif.message}</td>
+                <td><small class="text-muted">${new Date(notif.created_at).toLocaleString()}</small></td>
+                <td>
+                    <span class="badge bg-${notif.is_read ? 'secondary' : 'primary'}">
+                        ${notif.is_read ? 'Read' : 'Unread'}
+                    </span>
+                </td>
+                <td>
+                    ${!notif.is_read ? `
+                    <button class="btn btn-sm btn-outline-success" onclick="markAsRead('${notif._id}', this.parentNode.parentNode)">
+                        <i class="fas fa-check"></i>
+                    </button>` : ''}
+                    <button class="btn btn-sm btn-outline-danger" onclick="deleteNotification('${notif._id}', this.parentNode.parentNode)">
+                        <i class="fas fa-trash"></i>
+                    </button>
+                </td>
+            </tr>
+        `).join('');
+    })
+    .catch(error => {
+        console.error('Error loading all notifications:', error);
+        container.innerHTML = '<tr><td colspan="4" class="text-center py-4 text-danger">Error loading notifications</td></tr>';
+    });
+}
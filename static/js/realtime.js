@@ -0,0 +1,84 @@
+// Initialize Socket.IO connection only if user is logged in
+document.addEventListener('DOMContentLoaded', function() {
+    const userId = document.body.dataset.userId;
+
+    if (userId && typeof io !== 'undefined') {
+        try {
+            console.log('Initializing Socket.IO connection...');
+
+            // Initialize Socket.IO with proper configuration
+            const socket = io({
+                transports: ['websocket', 'polling'],
+                upgrade: true,
+                reconnection: true,
+                reconnectionAttempts: 5,
+                reconnectionDelay: 1000,
+                reconnectionDelayMax: 5000,
+                timeout: 20000
+            });
+
+            // Connection established
+            socket.on('connect', function() {
+                console.log('Socket.IO connected successfully');
+                // Send user ID to server to join user-specific room
+                socket.emit('join', { userId: userId });
+                // Catch up on changes missed while disconnected
+                updateNotificationBadge();
+            });
+
+            // Handle custom notification events
+            socket.on('notification', function(data) {
+                console.log('New real-time notification:', data);
+
+                // Show toast notification
+                Swal.fire({
+                    title: 'New Notification',
+                    text: data.message,
+                    icon: 'info',
+                    toast: true,
+                    position: 'top-end',
+                    showConfirmButton: false,
+                    timer: 3000
+                });
+
+                // The list is updated by notification_created and the badge by unread_count
+            });
+
+            socket.on('unread_count', data => renderNotificationBadge(data.count));
+
+            // Notification deltas patch the cached list instead of refetching it
+            ['notification_created', 'notification_read', 'notifications_read_all',
+             'notification_deleted', 'notifications_cleared'].forEach(event => {
+                socket.on(event, data => applyNotificationEvent(event, data));
+            });
+
+            // Task deltas patch the dashboard rows and the shared tasks list
+            ['task_created', 'task_updated', 'task_deleted', 'task_shared', 'task_unshared'].forEach(event => {
+                socket.on(event, data => applyTaskEvent(event, data.tasks));
+            });
+
+            socket.on('connected', function(data) {
+                console.log('Server connection confirmed:', data.message);
+            });
+
+            // Handle connection errors
+            socket.on('connect_error', function(error) {
+                console.error('Socket.IO connection error:', error);
+                // Don't fall back to polling to avoid spam
+            });
+
+            socket.on('disconnect', function(reason) {
+                console.log('Socket.IO disconnected:', reason);
+                if (reason === 'io server disconnect') {
+                    // The server has forcibly disconnected the socket, need to reconnect manually
+                    socket.connect();
+                }
+            });
+
+        } catch (error) {
+            console.error('Socket.IO initialization error:', error);
+        }
+    } else {
+        console.log('Socket.IO not initialized (user not logged in or library missing)');
+    }
+});
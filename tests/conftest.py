@@ -0,0 +1,227 @@
+"""The app on a fresh in-memory mongomock database per test.
+
+mongomock does not monitor commands, MongomockClient reports the command pymongo would
+send for each collection method to the app's event listeners, so tests can count round
+trips and run the query budgets.
+"""
+import itertools
+import threading
+import time
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+from bson.objectid import ObjectId
+from mongomock.collection import Collection
+from pymongo import DeleteMany, DeleteOne, InsertOne, monitoring
+
+import app as app_module
+import database
+
+
+def find_command(collection, filter=None, *args, **kwargs):
+    return 'find', {'find': collection.name, 'filter': filter or {}}
+
+
+def count_command(collection, filter=None, *args, **kwargs):
+    # count_documents runs as an aggregate
+    return 'aggregate', {'aggregate': collection.name, 'pipeline': [{'$match': filter or {}}]}
+
+
+def aggregate_command(collection, pipeline=(), *args, **kwargs):
+    return 'aggregate', {'aggregate': collection.name, 'pipeline': list(pipeline)}
+
+
+def distinct_command(collection, key=None, filter=None, *args, **kwargs):
+    return 'distinct', {'distinct': collection.name, 'key': key, 'query': filter or {}}
+
+
+def insert_command(collection, *args, **kwargs):
+    return 'insert', {'insert': collection.name}
+
+
+def update_command(collection, filter=None, *args, **kwargs):
+    return 'update', {'update': collection.name, 'updates': [{'q': filter or {}}]}
+
+
+def delete_command(collection, filter=None, *args, **kwargs):
+    return 'delete', {'delete': collection.name, 'deletes': [{'q': filter or {}}]}
+
+
+def find_and_modify_command(collection, filter=None, *args, **kwargs):
+    return 'findAndModify', {'findAndModify': collection.name, 'query': filter or {}}
+
+
+def bulk_write_commands(collection, requests, *args, **kwargs):
+    """One command per kind of write, the batching of an unordered bulk_write"""
+    commands = {}
+    for operation in requests:
+        if isinstance(operation, InsertOne):
+            commands.setdefault('insert', {'insert': collection.name})
+        elif isinstance(operation, (DeleteOne, DeleteMany)):
+            command = commands.setdefault('delete', {'delete': collection.name, 'deletes': []})
+            command['deletes'].append({'q': getattr(operation, '_filter', {})})
+        else:
+            command = commands.setdefault('update', {'update': collection.name, 'updates': []})
+            command['updates'].append({'q': getattr(operation, '_filter', {})})
+    return list(commands.items())
+
+
+COMMANDS = {
+    'find': find_command,
+    'find_one': find_command,
+    'count_documents': count_command,
+    'aggregate': aggregate_command,
+    'distinct': distinct_command,
+    'insert_one': insert_command,
+    'insert_many': insert_command,
+    'update_one': update_command,
+    'update_many': update_command,
+    'replace_one': update_command,
+    'delete_one': delete_command,
+    'delete_many': delete_command,
+    'find_one_and_update': find_and_modify_command,
+    'find_one_and_replace': find_and_modify_command,
+    'find_one_and_delete': find_and_modify_command,
+}
+
+
+class MongomockClient(mongomock.MongoClient):
+    """In memory whatever MONGO_URI and options the app passes, keeping its command listeners"""
+
+    def __init__(self, host=None, *args, event_listeners=(), **kwargs):
+        super().__init__()
+        self.command_listeners = [listener for listener in event_listeners
+                                  if isinstance(listener, monitoring.CommandListener)]
+
+
+_request_ids = itertools.count(1)
+_local = threading.local()
+
+
+def publish(collection, commands, run):
+    """Report commands to the client's listeners around run(), unless a monitored call is running it"""
+    listeners = getattr(collection.database.client, 'command_listeners', [])
+    if getattr(_local, 'running', False) or not listeners:
+        return run()
+    _local.running = True
+    events = []
+    try:
+        for command_name, command in commands:
+            event = SimpleNamespace(command_name=command_name, command=command, database_name=collection.database.name,
+                                    request_id=next(_request_ids), operation_id=None,
+                                    connection_id=('mongomock', 27017))
+            events.append(event)
+            for listener in listeners:
+                listener.started(event)
+        started = time.perf_counter()
+        try:
+            result = run()
+        except Exception as exc:
+            for event in events:
+                failed = SimpleNamespace(**vars(event), duration_micros=0, failure=str(exc))
+                for listener in listeners:
+                    listener.failed(failed)
+            raise
+        duration_micros = int((time.perf_counter() - started) * 1e6)
+        for event in events:
+            succeeded = SimpleNamespace(**vars(event), duration_micros=duration_micros, reply={})
+            for listener in listeners:
+                listener.succeeded(succeeded)
+        return result
+    finally:
+        _local.running = False
+
+
+def monitored(method, to_command):
+    def wrapper(self, *args, **kwargs):
+        return publish(self, [to_command(self, *args, **kwargs)], lambda: method(self, *args, **kwargs))
+    return wrapper
+
+
+def monitored_bulk_write(method):
+    def wrapper(self, requests, *args, **kwargs):
+        requests = list(requests)
+        return publish(self, bulk_write_commands(self, requests), lambda: method(self, requests, *args, **kwargs))
+    return wrapper
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """(command name, collection) of every command, in order"""
+
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        self.commands.append((event.command_name, event.command.get(event.command_name)))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def count(self, collection):
+        return sum(1 for _, name in self.commands if name == collection)
+
+    def clear(self):
+        self.commands = []
+
+
+@pytest.fixture
+def commands():
+    return CommandRecorder()
+
+
+@pytest.fixture
+def app_config():
+    """Settings passed to create_app(), override in a test module to change them"""
+    return {}
+
+
+@pytest.fixture
+def appmod(monkeypatch, commands, app_config):
+    """The app module, configured for tests and talking to an empty database"""
+    monkeypatch.setattr(database, 'MongoClient', MongomockClient)
+    for name, to_command in COMMANDS.items():
+        monkeypatch.setattr(Collection, name, monitored(getattr(Collection, name), to_command))
+    monkeypatch.setattr(Collection, 'bulk_write', monitored_bulk_write(Collection.bulk_write))
+
+    config = dict(app_module.app.config)
+    app_module.create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test',
+        'WTF_CSRF_ENABLED': False,
+        'AUTO_ENSURE_INDEXES': False,
+        # Hash inline and write notifications from the request, both run in the test's thread
+        'PASSWORD_HASH_WORKERS': 0,
+        'NOTIFICATION_QUEUE_ENABLED': False,
+        **app_config,
+    })
+    options = dict(app_module.mongo.options)
+    options['event_listeners'] = list(options.get('event_listeners', [])) + [commands]
+    app_module.mongo.configure(app_module.mongo.uri, **options)
+    yield app_module
+    app_module.mongo.close()
+    app_module.app.config.clear()
+    app_module.app.config.update(config)
+
+
+@pytest.fixture
+def add_user(appmod):
+    """Insert a user, returns their id"""
+    def add_user(username):
+        return str(appmod.users_collection.insert_one({'username': username, 'password': ''}).inserted_id)
+    return add_user
+
+
+@pytest.fixture
+def login(appmod):
+    """A test client with user_id's session"""
+    def login(user_id):
+        client = appmod.app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = user_id
+            session['username'] = appmod.users_collection.find_one({'_id': ObjectId(user_id)})['username']
+        return client
+    return login
@@ -0,0 +1,39 @@
+import io
+import os
+
+import mongomock
+
+from attachment_store import AttachmentStore
+
+
+def make_store(tmp_path):
+    return AttachmentStore(str(tmp_path), mongomock.MongoClient().db.attachment_blobs)
+
+
+def test_file_is_removed_with_its_last_reference(tmp_path):
+    store = make_store(tmp_path)
+    digest, size = store.save(io.BytesIO(b'report'))
+    assert store.save(io.BytesIO(b'report')) == (digest, size)
+    store.release(digest)
+    assert os.path.exists(store.path(digest))
+    store.release(digest)
+    assert not os.path.exists(store.path(digest))
+    assert store.blobs_collection.find_one({'_id': digest}) is None
+
+
+def test_save_racing_the_last_release_keeps_the_file(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    digest, _ = store.save(io.BytesIO(b'report'))
+    delete_one = store.blobs_collection.delete_one
+
+    def delete_then_save(*args, **kwargs):
+        # Another request uploads the same content between the delete and the unlink
+        result = delete_one(*args, **kwargs)
+        store.save(io.BytesIO(b'report'))
+        return result
+
+    monkeypatch.setattr(store.blobs_collection, 'delete_one', delete_then_save)
+    store.release(digest)
+    assert store.blobs_collection.find_one({'_id': digest})['refcount'] == 1
+    with open(store.path(digest), 'rb') as f:
+        assert f.read() == b'report'
@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.fixture
+def user(appmod, add_user, login):
+    user_id = add_user('alice')
+    client = login(user_id)
+    response = client.post('/api/tasks/bulk', json={'tasks': [{'title': 'Task', 'description': 'Text'}]})
+    assert response.status_code == 200
+    return client, response.get_json()['results'][0]['id']
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/api/tasks/bulk/status', {'status': 'Completed'}),
+    ('/api/tasks/bulk/delete', {}),
+])
+def test_ids_that_are_not_strings_are_not_found(user, path, body):
+    client, task_id = user
+    response = client.post(path, json={'task_ids': [['x'], {'$ne': None}, 7, task_id], **body})
+    assert response.status_code == 200
+    statuses = [result['status'] for result in response.get_json()['results']]
+    assert statuses[:3] == ['not_found'] * 3
+    assert statuses[3] in ('updated', 'deleted')
@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.fixture
+def app_config():
+    return {'COMPRESS_MIN_SIZE': 1}
+
+
+def test_json_is_compressed_and_html_is_not(add_user, login):
+    client = login(add_user('alice'))
+    headers = {'Accept-Encoding': 'gzip'}
+    assert client.get('/notifications', headers=headers).headers.get('Content-Encoding') == 'gzip'
+    # Pages hold the CSRF token next to reflected input, compressing them would expose it (BREACH)
+    response = client.get('/?search=token', headers=headers)
+    assert response.status_code == 200 and response.mimetype == 'text/html'
+    assert 'Content-Encoding' not in response.headers
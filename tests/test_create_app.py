@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture
+def app_config():
+    return {
+        'DATA_VERSION_STORE': 'memory',
+        'RESPONSE_CACHE_SIZE': 7,
+        'USERNAME_CACHE_SIZE': 5,
+        'USERNAME_CACHE_TTL': 60,
+        'NOTIFICATION_BATCH_SIZE': 3,
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+        'QUERY_TRACKING': 'warn',
+    }
+
+
+def test_settings_apply_to_what_is_built_from_them(appmod):
+    assert appmod.data_versions.collection is None
+    assert appmod.response_cache.max_size == 7
+    assert (appmod.username_cache.max_size, appmod.username_cache.ttl) == (5, 60)
+    assert appmod.notification_queue.batch_size == 3
+    assert appmod.password_hasher.method == 'pbkdf2:sha256:1000'
+    assert appmod.password_hasher.hash('secret').startswith('pbkdf2:sha256:1000$')
+    assert appmod.query_tracker is not None and not appmod.query_tracker.strict
+    assert appmod.query_tracker in appmod.mongo.options['event_listeners']
+
+
+def test_socketio_settings_are_rejected(appmod):
+    with pytest.raises(ValueError, match='SOCKETIO_MESSAGE_QUEUE'):
+        appmod.create_app({'SOCKETIO_MESSAGE_QUEUE': 'redis://localhost:6379/0'})
+
+
+@pytest.mark.parametrize('key, value', [('DATA_VERSION_STORE', 'redis'), ('QUERY_TRACKING', 'on')])
+def test_unknown_modes_are_rejected(appmod, key, value):
+    with pytest.raises(ValueError, match=key):
+        appmod.create_app({key: value})
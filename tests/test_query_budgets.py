@@ -0,0 +1,49 @@
+import pytest
+
+from query_tracking import QueryBudgetExceeded
+from tests.test_shared_tasks import share_tasks
+
+BUDGETS = {
+    # Data version, the page of tasks and one query for all owners
+    'get_shared_tasks': 3,
+    # Unshare and data versions, then the owner's notification: insert, unread count,
+    # notification cap and notifications version
+    'remove_shared_task': 6,
+}
+
+
+@pytest.fixture
+def app_config():
+    return {'QUERY_TRACKING': 'strict', 'QUERY_BUDGETS': dict(BUDGETS)}
+
+
+@pytest.fixture
+def recipient(appmod, add_user, login):
+    recipient_id = add_user('recipient')
+    share_tasks(appmod, add_user, recipient_id, 5)
+    # Budgets are for users whose counters exist, a first read rebuilds them
+    for user in appmod.users_collection.find({}, {'_id': 1}):
+        appmod.reconcile_task_stats(str(user['_id']))
+        appmod.reconcile_unread_count(str(user['_id']))
+    return login(recipient_id)
+
+
+def test_shared_tasks_within_budget(appmod, recipient):
+    assert appmod.query_tracker.strict
+    assert recipient.get('/tasks/shared').status_code == 200
+
+
+def test_remove_shared_task_within_budget(appmod, recipient):
+    task_id = recipient.get('/tasks/shared').get_json()[0]['id']
+    assert recipient.delete(f'/tasks/shared/{task_id}/remove').status_code == 200
+
+
+@pytest.mark.parametrize('endpoint', sorted(BUDGETS))
+def test_strict_mode_fails_a_request_over_budget(appmod, recipient, endpoint):
+    appmod.app.config['QUERY_BUDGETS'][endpoint] -= 1
+    task_id = str(appmod.tasks_collection.find_one({}, {'_id': 1})['_id'])
+    with pytest.raises(QueryBudgetExceeded):
+        if endpoint == 'get_shared_tasks':
+            recipient.get('/tasks/shared')
+        else:
+            recipient.delete(f'/tasks/shared/{task_id}/remove')
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import ConfigurationError, ServerSelectionTimeoutError
+
+from indexes import ensure_indexes, find_collscans
+
+# explain() needs a real server, mongomock has no query planner
+DATABASE_NAME = 'task_manager_query_plans'
+
+
+@pytest.fixture
+def db():
+    uri = os.getenv('MONGO_URI')
+    if not uri:
+        pytest.skip('MONGO_URI is not set')
+    try:
+        client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+        client.admin.command('ping')
+    except (ConfigurationError, ServerSelectionTimeoutError) as e:
+        pytest.skip(f'No MongoDB at MONGO_URI: {e}')
+    client.drop_database(DATABASE_NAME)
+    yield client[DATABASE_NAME]
+    client.drop_database(DATABASE_NAME)
+    client.close()
+
+
+def test_every_query_shape_uses_an_index(db):
+    ensure_indexes(db)
+    assert find_collscans(db) == []
@@ -0,0 +1,39 @@
+import pytest
+
+
+@pytest.fixture(params=['mongo', 'memory'])
+def app_config(request):
+    return {'DATA_VERSION_STORE': request.param}
+
+
+def test_users_never_share_an_etag(add_user, login):
+    alice = login(add_user('alice'))
+    bob = login(add_user('bob'))
+    for path in ('/notifications', '/tasks/shared'):
+        alice_etag = alice.get(path).headers['ETag']
+        bob_etag = bob.get(path).headers['ETag']
+        assert alice_etag != bob_etag
+
+        # Bob's browser sending an ETag it got for Alice must not be answered with a 304
+        response = bob.get(path, headers={'If-None-Match': alice_etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] == bob_etag
+
+
+def test_deleted_account_drops_its_shared_tasks_from_cached_responses(appmod, add_user, login):
+    owner_id = add_user('owner')
+    appmod.users_collection.update_one({'_id': appmod.ObjectId(owner_id)},
+                                       {'$set': {'password': appmod.password_hasher.hash('secret')}})
+    recipient = login(add_user('recipient'))
+    owner = login(owner_id)
+    task_id = str(appmod.tasks_collection.insert_one(
+        appmod.new_task(owner_id, 'Task', 'Shared', '2030-01-01')).inserted_id)
+    assert owner.post(f'/tasks/{task_id}/share', data={'username': 'recipient'}).status_code == 200
+
+    response = recipient.get('/tasks/shared')
+    assert [task['id'] for task in response.get_json()] == [task_id]
+
+    assert owner.post('/delete_account', data={'password': 'secret'}).status_code == 200
+    response = recipient.get('/tasks/shared', headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 200
+    assert response.get_json() == []
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+
+def share_tasks(appmod, add_user, recipient_id, owners):
+    """One task shared with recipient_id by each of owners new users"""
+    for n in range(owners):
+        owner_id = add_user(f'owner_{recipient_id}_{n}')
+        task = appmod.new_task(owner_id, f'Task {n}', 'Shared', '2030-01-01')
+        task['sharedWith'] = [recipient_id]
+        task['created_at'] = datetime.utcnow()
+        appmod.tasks_collection.insert_one(task)
+
+
+def test_shared_tasks_fetch_owners_in_one_query(appmod, add_user, login, commands):
+    users_queries = []
+    for owners in (1, 10):
+        recipient_id = add_user(f'recipient_{owners}')
+        share_tasks(appmod, add_user, recipient_id, owners)
+        client = login(recipient_id)
+
+        commands.clear()
+        response = client.get('/tasks/shared')
+        assert response.status_code == 200
+        assert len(response.get_json()) == owners
+        assert {task['owner'] for task in response.get_json()} == {
+            f'owner_{recipient_id}_{n}' for n in range(owners)}
+        users_queries.append(commands.count('users'))
+
+    assert users_queries == [1, 1]
+
+
+def test_sharing_changes_the_owners_etag(appmod, add_user, login):
+    owner_id = add_user('owner')
+    recipient_id = add_user('recipient')
+    task_id = str(appmod.tasks_collection.insert_one(
+        appmod.new_task(owner_id, 'Task', 'Shared', '2030-01-01')).inserted_id)
+    owner = login(owner_id)
+
+    def owner_etag():
+        return owner.get(f'/api/tasks/{task_id}').headers['ETag']
+
+    before_share = owner_etag()
+    assert owner.post(f'/tasks/{task_id}/share', data={'username': 'recipient'}).status_code == 200
+    before_remove = owner_etag()
+    assert before_remove != before_share
+
+    assert login(recipient_id).delete(f'/tasks/shared/{task_id}/remove').status_code == 200
+    assert owner_etag() != before_remove
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+pytest.importorskip('kombu')
+pytest.importorskip('requests')  # python-socketio's client
+
+# Worker A is the app with a memory:// message queue, served over HTTP (the Socket.IO test
+# client refuses a queue), worker B another Socket.IO server on the same queue. An emit on
+# either reaches the user's connection on A. Socket.IO is built when app is imported, so
+# this runs in its own process.
+SCRIPT = textwrap.dedent('''
+    import threading
+    import time
+    import socketio
+    from flask import Flask
+    from flask_socketio import SocketIO
+    from werkzeug.serving import make_server
+    import app as appmod
+
+    appmod.app.secret_key = 'test'
+    client = appmod.app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 'user-1'
+    cookie = client.get_cookie('session').value
+    server = make_server('127.0.0.1', 0, appmod.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    received = []
+    connection = socketio.Client()
+    connection.on('*', lambda event, data: received.append((event, data)))
+    connection.connect(f'http://127.0.0.1:{server.server_port}', headers={'Cookie': f'session={cookie}'},
+                       transports=['polling'], wait_timeout=10)
+
+    def wait_for(count):
+        deadline = time.monotonic() + 10
+        while len(received) < count and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    # Sent to the user's room by the connect handler, through the queue like every emit
+    wait_for(1)
+    other_worker = SocketIO(Flask('other_worker'), message_queue=appmod.app.config['SOCKETIO_MESSAGE_QUEUE'],
+                            channel=appmod.app.config['SOCKETIO_CHANNEL'])
+    other_worker.emit('task_created', {'from': 'other_worker'}, to='user-1')
+    other_worker.emit('task_created', {'from': 'other_user'}, to='user-2')
+    appmod.emit_to_user('unread_count', {'count': 3}, 'user-1')
+    wait_for(3)
+    connection.disconnect()
+    print(sorted((event, data) for event, data in received if event != 'connected'), flush=True)
+''')
+
+
+def test_emits_reach_users_through_the_message_queue():
+    env = dict(os.environ, SOCKETIO_MESSAGE_QUEUE='memory://', SOCKETIO_CHANNEL='test-socketio',
+               PASSWORD_HASH_WORKERS='0', NOTIFICATION_QUEUE_ENABLED='0', METRICS_ENABLED='0')
+    result = subprocess.run([sys.executable, '-c', SCRIPT], env=env, capture_output=True, text=True, timeout=60,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == str([
+        ('task_created', {'from': 'other_worker'}), ('unread_count', {'count': 3})])
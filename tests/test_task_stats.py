@@ -0,0 +1,51 @@
+import pytest
+
+
+@pytest.fixture
+def user(appmod, add_user, login):
+    user_id = add_user('alice')
+    client = login(user_id)
+    assert client.post('/add_task', data={'title': 'Task', 'description': 'Text',
+                                          'deadline': '2099-01-01'}).status_code == 302
+    # Build the stats document, updates only adjust a built one
+    assert client.get('/analytics/overview').status_code == 200
+    task_id = str(appmod.tasks_collection.find_one({'user_id': user_id})['_id'])
+    return user_id, client, task_id
+
+
+def update(client, task_id, **fields):
+    data = {'task_id': task_id, 'title': 'Task', 'description': 'Text', 'deadline': '2099-01-01',
+            'status': 'Pending', **fields}
+    return client.post('/update', data=data)
+
+
+@pytest.mark.parametrize('fields', [{'deadline': '2020.01.01'}, {'deadline': '$x'}, {'status': 'Done.now'}])
+def test_update_rejects_values_that_are_not_stats_keys(appmod, user, fields):
+    user_id, client, task_id = user
+    assert update(client, task_id, **fields).status_code == 400
+    stats = appmod.user_stats_collection.find_one({'_id': user_id})
+    assert stats['open_deadlines'] == {'2099-01-01': 1}
+    assert client.get('/analytics/overview').get_json()['total_tasks'] == 1
+
+
+def test_deadlines_without_open_tasks_are_removed(appmod, user):
+    user_id, client, task_id = user
+    assert update(client, task_id, deadline='2098-01-01').status_code == 302
+    assert appmod.user_stats_collection.find_one({'_id': user_id})['open_deadlines'] == {'2098-01-01': 1}
+    assert update(client, task_id, deadline='2098-01-01', status='Completed').status_code == 302
+    stats = appmod.user_stats_collection.find_one({'_id': user_id})
+    assert stats['open_deadlines'] == {}
+    assert stats['status_counts'] == {'Pending': 0, 'Completed': 1}
+
+
+def test_completed_at_is_written_with_the_status(appmod, user, commands):
+    user_id, client, task_id = user
+    commands.clear()
+    assert update(client, task_id, status='Completed').status_code == 302
+    assert [command for command in commands.commands if command[1] == 'tasks'] == [('findAndModify', 'tasks')]
+    completed_at = appmod.tasks_collection.find_one({'user_id': user_id})['completed_at']
+    # Saving a completed task again keeps the time it was completed
+    assert update(client, task_id, status='Completed', title='$renamed').status_code == 302
+    task = appmod.tasks_collection.find_one({'user_id': user_id})
+    assert task['completed_at'] == completed_at
+    assert task['title'] == '$renamed'